@@ -41,12 +41,12 @@ async def create_chunk(
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         )
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         )
 
 
@@ -73,12 +73,12 @@ async def create_chunks_bulk(
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         )
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         )
 
 
@@ -114,7 +114,7 @@ async def list_chunks(
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         )
 
 
@@ -169,12 +169,12 @@ async def update_chunk(
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         )
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         )
 
 
@@ -40,7 +40,7 @@ async def create_library(
     except ConflictError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         ) from e
     except Exception as e:
         raise HTTPException(
@@ -130,12 +130,12 @@ async def update_library(
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         ) from e
     except ConflictError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         ) from e
 
 
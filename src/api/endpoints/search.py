@@ -48,12 +48,12 @@ async def search_library(
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         ) from e
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         ) from e
 
 
@@ -98,10 +98,10 @@ async def multi_library_search(
     except NotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         ) from e
     except ValidationError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail={"error": {"code": e.error_code, "message": str(e), "details": e.details}}
+            detail={"error": {"code": e.error_code, "message": str(e), "details": dict(e.details)}}
         ) from e
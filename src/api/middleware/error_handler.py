@@ -22,7 +22,7 @@ async def vector_database_exception_handler(
     logger.error(
         f"VectorDatabaseError: {exc.message}",
         error_code=exc.error_code,
-        details=exc.details,
+        details=dict(exc.details),
         path=request.url.path
     )
 
@@ -41,7 +41,7 @@ async def vector_database_exception_handler(
             "error": {
                 "code": exc.error_code,
                 "message": exc.message,
-                "details": exc.details
+                "details": dict(exc.details)
             }
         }
     )
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -20,6 +21,8 @@ class Settings(BaseSettings):
     wal_directory: Path = Path("./data/wal")
     snapshot_directory: Path = Path("./data/snapshots")
     index_directory: Path = Path("./data/indexes")
+    # Lossy vector encoding in snapshots: None (float32), "fp16" or "int8"
+    snapshot_vector_quantization: Optional[str] = None
 
     # Index Configuration
     default_index_type: str = "HNSW"
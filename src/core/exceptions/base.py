@@ -1,9 +1,16 @@
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Any, Optional
 
+# Shared read-only placeholder so exceptions without details don't allocate a dict.
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
 
 class VectorDatabaseError(Exception):
     """Base exception for all vector database errors."""
 
+    __slots__ = ("message", "error_code", "details")
+
     def __init__(
         self,
         message: str,
@@ -12,58 +19,83 @@ class VectorDatabaseError(Exception):
     ):
         super().__init__(message)
         self.message = message
-        self.error_code = error_code or self.__class__.__name__
-        self.details = details or {}
+        self.error_code = error_code or type(self).__name__
+        self.details: Mapping[str, Any] = details if details is not None else _EMPTY
 
 
 class ValidationError(VectorDatabaseError):
     """Raised when validation fails."""
 
-    def __init__(self, message: str, field: Optional[str] = None, **kwargs):
-        super().__init__(message, **kwargs)
+    __slots__ = ()
+
+    def __init__(
+        self,
+        message: str,
+        field: Optional[str] = None,
+        details: Optional[dict[str, Any]] = None,
+        **kwargs
+    ):
         if field:
-            self.details["field"] = field
+            details = {**(details or _EMPTY), "field": field}
+        super().__init__(message, details=details, **kwargs)
 
 
 class NotFoundError(VectorDatabaseError):
     """Raised when a requested resource is not found."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         resource_type: str,
         resource_id: str,
         message: Optional[str] = None,
+        details: Optional[dict[str, Any]] = None,
         **kwargs
     ):
         message = message or f"{resource_type} with id '{resource_id}' not found"
-        super().__init__(message, **kwargs)
-        self.details.update({
+        details = {
+            **(details or _EMPTY),
             "resource_type": resource_type,
-            "resource_id": resource_id,
-        })
+            "resource_id": resource_id
+        }
+        super().__init__(message, details=details, **kwargs)
 
 
 class ConflictError(VectorDatabaseError):
     """Raised when there's a conflict in the operation."""
 
-    def __init__(self, message: str, conflict_type: Optional[str] = None, **kwargs):
-        super().__init__(message, **kwargs)
+    __slots__ = ()
+
+    def __init__(
+        self,
+        message: str,
+        conflict_type: Optional[str] = None,
+        details: Optional[dict[str, Any]] = None,
+        **kwargs
+    ):
         if conflict_type:
-            self.details["conflict_type"] = conflict_type
+            details = {**(details or _EMPTY), "conflict_type": conflict_type}
+        super().__init__(message, details=details, **kwargs)
 
 
 class IndexError(VectorDatabaseError):
     """Raised when there's an error with vector index operations."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str,
         index_type: Optional[str] = None,
         operation: Optional[str] = None,
+        details: Optional[dict[str, Any]] = None,
         **kwargs
     ):
-        super().__init__(message, **kwargs)
-        if index_type:
-            self.details["index_type"] = index_type
-        if operation:
-            self.details["operation"] = operation
+        if index_type or operation:
+            details = {**(details or _EMPTY)}
+            if index_type:
+                details["index_type"] = index_type
+            if operation:
+                details["operation"] = operation
+        super().__init__(message, details=details, **kwargs)
@@ -1,10 +1,14 @@
+import asyncio
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional, TypeVar
 from uuid import UUID
 
 import numpy as np
 
+T = TypeVar("T")
+
 
 @dataclass
 class IndexConfig:
@@ -16,6 +20,10 @@ class IndexConfig:
 class VectorIndex(ABC):
     """Abstract base class for vector indexes."""
 
+    # Indexes at least this large run searches and rebuilds off the event loop,
+    # where the NumPy kernels release the GIL and can use more cores
+    EXECUTOR_THRESHOLD = 10_000
+
     def __init__(self, config: IndexConfig):
         self.config = config
         self.dimension = config.dimension
@@ -52,6 +60,18 @@ class VectorIndex(ABC):
         """Clear all vectors from the index."""
         pass
 
+    async def _run_search(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a synchronous search body inline or in the default executor.
+
+        Small indexes are searched inline, since handing off to a thread costs
+        more than the search itself.
+        """
+        if self._size < self.EXECUTOR_THRESHOLD:
+            return func(*args)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
     @property
     def size(self) -> int:
         """Return the number of vectors in the index."""
@@ -73,3 +93,31 @@ class VectorIndex(ABC):
             return float(-np.dot(vec1, vec2))
         else:
             raise ValueError(f"Unknown metric: {self.metric}")
+
+    def _compute_distances_batch(
+        self,
+        query: np.ndarray,
+        vectors: np.ndarray,
+        norms: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Compute distances from a query to each row of a 2-D array of vectors.
+
+        ``norms`` may carry precomputed L2 norms of the rows; the cosine metric
+        then reduces to a single matrix-vector product.
+        """
+        if self.metric == "euclidean":
+            diff = vectors - query
+            return np.sqrt(np.einsum("ij,ij->i", diff, diff))
+        elif self.metric == "cosine":
+            dots = vectors @ query
+            if norms is None:
+                norms = np.linalg.norm(vectors, axis=1)
+            norms = norms * np.linalg.norm(query)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                distances = 1 - dots / norms
+            distances[norms == 0] = 1.0
+            return distances
+        elif self.metric == "dot":
+            return -(vectors @ query)
+        else:
+            raise ValueError(f"Unknown metric: {self.metric}")
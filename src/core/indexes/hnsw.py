@@ -6,7 +6,7 @@ from uuid import UUID
 
 import numpy as np
 
-from src.core.logging import get_logger
+from src.core.logging import get_logger, is_debug_enabled
 from src.infrastructure.locks import ReadWriteLock
 
 from .base import IndexConfig, VectorIndex
@@ -87,9 +87,14 @@ class HNSWIndex(VectorIndex):
         if vector_id in self._nodes:
             raise ValueError(f"Vector {vector_id} already exists in index")
 
-        # Create new node
+        # Create new node. The vector is kept as a float32 view without copying:
+        # the index never writes to it and callers hand over freshly built arrays
         level = self._get_random_level()
-        node = HNSWNode(vector_id=vector_id, vector=vector.copy(), level=level)
+        node = HNSWNode(
+            vector_id=vector_id,
+            vector=np.ascontiguousarray(vector, dtype=np.float32),
+            level=level
+        )
         self._nodes[vector_id] = node
         self._size = len(self._nodes)
 
@@ -192,15 +197,13 @@ class HNSWIndex(VectorIndex):
         node = self._nodes[node_id]
         neighbors = list(node.neighbors[layer])
 
-        # Calculate distances to all neighbors
-        neighbor_dists = []
-        for neighbor_id in neighbors:
-            dist = self._compute_distance(node.vector, self._nodes[neighbor_id].vector)
-            neighbor_dists.append((neighbor_id, dist))
+        # Distances to all neighbors in one vectorized call
+        neighbor_vectors = np.stack([self._nodes[n].vector for n in neighbors])
+        distances = self._compute_distances_batch(node.vector, neighbor_vectors)
 
-        # Sort by distance and keep only max_neighbors
-        neighbor_dists.sort(key=lambda x: x[1])
-        new_neighbors = set(n[0] for n in neighbor_dists[:max_neighbors])
+        # Keep the max_neighbors closest without fully sorting
+        keep = np.argpartition(distances, max_neighbors)[:max_neighbors]
+        new_neighbors = {neighbors[i] for i in keep}
 
         # Remove pruned connections
         for neighbor_id in neighbors:
@@ -213,7 +216,7 @@ class HNSWIndex(VectorIndex):
         async with self._lock.write():
             for vector_id, vector in vectors:
                 await self._add_internal(vector_id, vector)
-            logger.info(f"Added {len(vectors)} vectors to HNSW index")
+            logger.info("Added vectors to HNSW index", count=len(vectors))
 
     async def search(
         self,
@@ -245,7 +248,7 @@ class HNSWIndex(VectorIndex):
 
             # Apply filter if provided
             if filter_ids is not None:
-                filter_set = set(filter_ids)
+                filter_set = filter_ids if isinstance(filter_ids, (set, frozenset)) else frozenset(filter_ids)
                 current_nearest = [(id, dist) for id, dist in current_nearest if id in filter_set]
 
             # Sort and return top k
@@ -274,7 +277,8 @@ class HNSWIndex(VectorIndex):
             if vector_id == self._entry_point:
                 self._entry_point = next(iter(self._nodes.keys())) if self._nodes else None
 
-            logger.debug("Removed vector from HNSW index", vector_id=str(vector_id))
+            if is_debug_enabled(__name__):
+                logger.debug("Removed vector from HNSW index", vector_id=str(vector_id))
             return True
 
     async def clear(self) -> None:
@@ -1,6 +1,9 @@
-import heapq
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional
+from typing import ClassVar, Optional
 from uuid import UUID
 
 import numpy as np
@@ -9,6 +12,7 @@ from src.core.logging import get_logger
 from src.infrastructure.locks import ReadWriteLock
 
 from .base import IndexConfig, VectorIndex
+from .storage import VectorStore
 
 logger = get_logger(__name__)
 
@@ -18,30 +22,30 @@ class KDTreeConfig(IndexConfig):
     """Configuration for KD-Tree index."""
     leaf_size: int = 40  # Maximum points in a leaf
     projection_dim: int = 16  # Dimension after random projection
+    rebuild_threshold: float = 0.3  # Rebuild once dirty inserts/deletes exceed this fraction of size
     seed: int = 42
 
 
-@dataclass
-class KDNode:
-    """Node in the KD-Tree."""
-    # Leaf node attributes
-    is_leaf: bool = True
-    vector_ids: list[UUID] = None
-    vectors: np.ndarray = None
+class KDTreeIndex(VectorIndex):
+    """KD-Tree implementation with random projections for high dimensions.
 
-    # Internal node attributes
-    split_dim: int = -1
-    split_value: float = 0.0
-    left: 'KDNode' = None
-    right: 'KDNode' = None
+    The tree is stored in flat arrays in Eytzinger (heap) order: the children
+    of node ``i`` live at ``2i + 1`` and ``2i + 2``. Leaves are marked with a
+    split dimension of -1 and own the rows ``[leaf_start, leaf_end)`` of the
+    vector store, which a rebuild compacts into leaf order.
 
-    # Bounding box for pruning
-    min_bound: np.ndarray = None
-    max_bound: np.ndarray = None
+    Between rebuilds, inserts descend to their leaf and are appended to that
+    leaf's extra rows (splitting it once it holds ``2 * leaf_size`` points),
+    and removals only tombstone the row. The tree is rebuilt once these dirty
+    operations exceed ``rebuild_threshold`` of the index size.
+    """
 
+    # Number of frontier nodes popped and expanded together during search
+    FRONTIER_BATCH = 4
 
-class KDTreeIndex(VectorIndex):
-    """KD-Tree implementation with random projections for high dimensions."""
+    # Thread pool shared by all KD-Tree indexes for large rebuilds, so the
+    # event loop keeps serving other libraries while a tree is built
+    _build_executor: ClassVar[Optional[ThreadPoolExecutor]] = None
 
     def __init__(self, config: KDTreeConfig):
         super().__init__(config)
@@ -52,11 +56,20 @@ class KDTreeIndex(VectorIndex):
         np.random.seed(config.seed)
         self._projection_matrix = np.random.randn(config.projection_dim, config.dimension)
         self._projection_matrix /= np.linalg.norm(self._projection_matrix, axis=1, keepdims=True)
+        self._projection_matrix = self._projection_matrix.astype(np.float32)
+
+        # Contiguous transpose so projections read the matrix with unit stride
+        self._PT = np.ascontiguousarray(self._projection_matrix.T)
+
+        # Per-thread scratch for box distances; searches may run in the executor
+        self._scratch = threading.local()
 
-        # Storage
-        self._vectors: dict[UUID, np.ndarray] = {}
-        self._projected_vectors: dict[UUID, np.ndarray] = {}
-        self._root: Optional[KDNode] = None
+        # Storage: original vectors in one contiguous float32 matrix
+        self._store = VectorStore(config.dimension)
+        self._reset_tree()
+
+        # Inserts and deletes applied incrementally since the last rebuild
+        self._dirty = 0
 
         logger.info(
             "Initialized KD-Tree index",
@@ -67,7 +80,11 @@ class KDTreeIndex(VectorIndex):
 
     def _project_vector(self, vector: np.ndarray) -> np.ndarray:
         """Project high-dimensional vector to lower dimension."""
-        return np.dot(self._projection_matrix, vector)
+        return np.asarray(vector, dtype=np.float32) @ self._PT
+
+    def _project_batch(self, vectors: np.ndarray) -> np.ndarray:
+        """Project a stacked batch of vectors to lower dimension."""
+        return vectors @ self._PT
 
     async def add(self, vector_id: UUID, vector: np.ndarray) -> None:
         """Add a vector to the index."""
@@ -75,107 +92,216 @@ class KDTreeIndex(VectorIndex):
             raise ValueError(f"Vector dimension {vector.shape[0]} != index dimension {self.dimension}")
 
         async with self._lock.write():
-            # Store original and projected vectors
-            self._vectors[vector_id] = vector.copy()
-            self._projected_vectors[vector_id] = self._project_vector(vector)
-            self._size = len(self._vectors)
+            # Re-adding an id moves it, so retire the old row first
+            if self._store.tombstone(vector_id) is not None:
+                self._dirty += 1
 
-            # Rebuild tree (simple approach - in production, use incremental insertion)
-            await self._rebuild_tree()
+            row = self._store.add(vector_id, vector)
+            self._size = len(self._store)
+
+            if len(self._split_dim) == 0:
+                await self._rebuild_tree()
+            else:
+                self._insert_row(row)
+                self._dirty += 1
+                await self._maybe_rebuild()
 
             logger.debug("Added vector to KD-Tree index", vector_id=str(vector_id))
 
     async def add_batch(self, vectors: list[tuple[UUID, np.ndarray]]) -> None:
         """Add multiple vectors efficiently."""
-        async with self._lock.write():
-            for vector_id, vector in vectors:
-                if vector.shape[0] != self.dimension:
-                    raise ValueError(f"Vector dimension {vector.shape[0]} != index dimension {self.dimension}")
+        if not vectors:
+            return
 
-                self._vectors[vector_id] = vector.copy()
-                self._projected_vectors[vector_id] = self._project_vector(vector)
+        for _, vector in vectors:
+            if vector.shape[0] != self.dimension:
+                raise ValueError(f"Vector dimension {vector.shape[0]} != index dimension {self.dimension}")
 
-            self._size = len(self._vectors)
+        async with self._lock.write():
+            self._store.add_batch(
+                [vector_id for vector_id, _ in vectors],
+                np.stack([vector for _, vector in vectors])
+            )
+            self._size = len(self._store)
 
             # Rebuild tree with all vectors
             await self._rebuild_tree()
 
             logger.info(f"Added {len(vectors)} vectors to KD-Tree index")
 
+    def _reset_tree(self) -> None:
+        """Drop the flat tree arrays."""
+        proj_dim = self.config.projection_dim
+        self._split_dim = np.empty(0, dtype=np.int32)
+        self._split_val = np.empty(0, dtype=np.float32)
+        self._min_bound = np.empty((0, proj_dim), dtype=np.float32)
+        self._max_bound = np.empty((0, proj_dim), dtype=np.float32)
+        self._leaf_start = np.empty(0, dtype=np.int32)
+        self._leaf_end = np.empty(0, dtype=np.int32)
+        self._leaf_extra: dict[int, list[int]] = {}
+
     async def _rebuild_tree(self) -> None:
         """Rebuild the entire KD-Tree."""
-        if not self._projected_vectors:
-            self._root = None
+        self._dirty = 0
+        if not self._store:
+            self._reset_tree()
             return
 
-        # Prepare data for tree construction
-        vector_ids = list(self._projected_vectors.keys())
-        vectors = np.array([self._projected_vectors[vid] for vid in vector_ids])
-
-        # Build tree recursively
-        self._root = self._build_tree(vector_ids, vectors, 0)
-
-    def _build_tree(
-        self,
-        vector_ids: list[UUID],
-        vectors: np.ndarray,
-        depth: int
-    ) -> KDNode:
-        """Recursively build KD-Tree."""
-        n_points = len(vector_ids)
-
-        # Create leaf node if few enough points
-        if n_points <= self.config.leaf_size:
-            node = KDNode(
-                is_leaf=True,
-                vector_ids=vector_ids.copy(),
-                vectors=vectors.copy()
+        # Project all live vectors with a single matmul
+        live_rows = np.fromiter(self._store.id_to_row.values(), dtype=np.intp)
+        projected = self._project_batch(self._store.matrix[live_rows])
+
+        if self._size < self.EXECUTOR_THRESHOLD:
+            perm = self._build_flat(projected)
+        else:
+            loop = asyncio.get_running_loop()
+            perm = await loop.run_in_executor(self._get_build_executor(), self._build_flat, projected)
+
+        # Repack the store in leaf order so each leaf scans a contiguous slice
+        self._store.compact(live_rows[perm])
+
+    @classmethod
+    def _get_build_executor(cls) -> ThreadPoolExecutor:
+        """Return the shared rebuild thread pool, creating it on first use."""
+        if cls._build_executor is None:
+            cls._build_executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count(),
+                thread_name_prefix="kdtree-build"
             )
-            # Calculate bounds
-            node.min_bound = np.min(vectors, axis=0)
-            node.max_bound = np.max(vectors, axis=0)
-            return node
-
-        # Choose split dimension (cycle through dimensions)
-        split_dim = depth % self.config.projection_dim
+        return cls._build_executor
 
-        # Find median along split dimension
-        indices = np.argsort(vectors[:, split_dim])
-        median_idx = n_points // 2
-        split_value = vectors[indices[median_idx], split_dim]
-
-        # Partition data
-        left_mask = vectors[:, split_dim] < split_value
-        right_mask = ~left_mask
-
-        # Handle edge case where all points have same value
-        if np.sum(left_mask) == 0 or np.sum(right_mask) == 0:
-            # Force split in middle
-            left_mask[:median_idx] = True
-            left_mask[median_idx:] = False
-            right_mask = ~left_mask
-
-        # Create internal node
-        node = KDNode(
-            is_leaf=False,
-            split_dim=split_dim,
-            split_value=split_value
-        )
-
-        # Recursively build children
-        left_ids = [vector_ids[i] for i in range(n_points) if left_mask[i]]
-        left_vectors = vectors[left_mask]
-        node.left = self._build_tree(left_ids, left_vectors, depth + 1)
-
-        right_ids = [vector_ids[i] for i in range(n_points) if right_mask[i]]
-        right_vectors = vectors[right_mask]
-        node.right = self._build_tree(right_ids, right_vectors, depth + 1)
-
-        # Calculate bounds from children
-        node.min_bound = np.minimum(node.left.min_bound, node.right.min_bound)
-        node.max_bound = np.maximum(node.left.max_bound, node.right.max_bound)
+    async def _maybe_rebuild(self) -> None:
+        """Rebuild once incremental updates have degraded the tree enough."""
+        if self._dirty > self.config.rebuild_threshold * self._size:
+            await self._rebuild_tree()
 
-        return node
+    def _build_flat(self, projected: np.ndarray) -> np.ndarray:
+        """Build the flat tree arrays, returning the leaf-order permutation."""
+        n_points = len(projected)
+
+        # Median splits halve the point count per level, so the depth (and
+        # therefore the heap-ordered array size) is known up front
+        depth, count = 0, n_points
+        while count > self.config.leaf_size:
+            count -= count // 2
+            depth += 1
+        n_nodes = (1 << (depth + 1)) - 1
+
+        proj_dim = self.config.projection_dim
+        self._split_dim = np.full(n_nodes, -1, dtype=np.int32)
+        self._split_val = np.zeros(n_nodes, dtype=np.float32)
+        self._min_bound = np.zeros((n_nodes, proj_dim), dtype=np.float32)
+        self._max_bound = np.zeros((n_nodes, proj_dim), dtype=np.float32)
+        self._leaf_start = np.zeros(n_nodes, dtype=np.int32)
+        self._leaf_end = np.zeros(n_nodes, dtype=np.int32)
+        self._leaf_extra = {}
+
+        # perm is reordered in place so that every leaf owns a contiguous range
+        perm = np.arange(n_points)
+
+        # Top-down pass with an explicit stack of (node, start, end, depth)
+        stack = [(0, 0, n_points, 0)]
+        while stack:
+            node, start, end, node_depth = stack.pop()
+            n_node = end - start
+
+            # Create leaf node if few enough points
+            if n_node <= self.config.leaf_size:
+                points = projected[perm[start:end]]
+                self._leaf_start[node] = start
+                self._leaf_end[node] = end
+                self._min_bound[node] = points.min(axis=0)
+                self._max_bound[node] = points.max(axis=0)
+                continue
+
+            # Choose split dimension (cycle through dimensions)
+            split_dim = node_depth % proj_dim
+
+            # Partition around the median along the split dimension in O(n);
+            # points left of median_idx are <= the median, the rest are >= it
+            median_idx = n_node // 2
+            rows = perm[start:end]
+            order = np.argpartition(projected[rows, split_dim], median_idx)
+            perm[start:end] = rows[order]
+
+            self._split_dim[node] = split_dim
+            self._split_val[node] = projected[perm[start + median_idx], split_dim]
+
+            stack.append((2 * node + 2, start + median_idx, end, node_depth + 1))
+            stack.append((2 * node + 1, start, start + median_idx, node_depth + 1))
+
+        # Bottom-up pass: internal bounds are the union of their children's,
+        # one vectorized step per level (children always sit at higher indices)
+        for level in range(depth - 1, -1, -1):
+            nodes = np.arange((1 << level) - 1, (1 << (level + 1)) - 1)
+            nodes = nodes[self._split_dim[nodes] >= 0]
+            left, right = 2 * nodes + 1, 2 * nodes + 2
+            self._min_bound[nodes] = np.minimum(self._min_bound[left], self._min_bound[right])
+            self._max_bound[nodes] = np.maximum(self._max_bound[left], self._max_bound[right])
+
+        return perm
+
+    def _leaf_rows(self, node: int) -> np.ndarray:
+        """Return the live store rows held by a leaf."""
+        rows = np.arange(self._leaf_start[node], self._leaf_end[node])
+        extra = self._leaf_extra.get(node)
+        if extra:
+            rows = np.concatenate((rows, extra))
+        return rows[self._store.live[rows]]
+
+    def _insert_row(self, row: int) -> None:
+        """Descend to the leaf owning a stored row, widening bounds on the way."""
+        point = self._project_vector(self._store.matrix[row])
+
+        node = 0
+        while True:
+            np.minimum(self._min_bound[node], point, out=self._min_bound[node])
+            np.maximum(self._max_bound[node], point, out=self._max_bound[node])
+
+            split_dim = self._split_dim[node]
+            if split_dim < 0:
+                break
+            node = 2 * node + 1 if point[split_dim] < self._split_val[node] else 2 * node + 2
+
+        self._leaf_extra.setdefault(node, []).append(row)
+        if len(self._leaf_rows(node)) > 2 * self.config.leaf_size:
+            self._split_leaf(node)
+
+    def _split_leaf(self, node: int) -> None:
+        """Split an overfull leaf around its median into two child leaves."""
+        left, right = 2 * node + 1, 2 * node + 2
+        if right >= len(self._split_dim):
+            self._grow_tree()
+
+        rows = self._leaf_rows(node)
+        projected = self._project_batch(self._store.matrix[rows])
+
+        depth = (node + 1).bit_length() - 1
+        split_dim = depth % self.config.projection_dim
+        median_idx = len(rows) // 2
+        order = np.argpartition(projected[:, split_dim], median_idx)
+
+        self._split_dim[node] = split_dim
+        self._split_val[node] = projected[order[median_idx], split_dim]
+        self._leaf_start[node] = self._leaf_end[node] = 0
+        self._leaf_extra.pop(node, None)
+
+        for child, sel in ((left, order[:median_idx]), (right, order[median_idx:])):
+            self._leaf_start[child] = self._leaf_end[child] = 0
+            self._leaf_extra[child] = rows[sel].tolist()
+            self._min_bound[child] = projected[sel].min(axis=0)
+            self._max_bound[child] = projected[sel].max(axis=0)
+
+    def _grow_tree(self) -> None:
+        """Add one level of (leaf) slots to the flat tree arrays."""
+        extra = len(self._split_dim) + 1
+        proj_dim = self.config.projection_dim
+        self._split_dim = np.concatenate((self._split_dim, np.full(extra, -1, dtype=np.int32)))
+        self._split_val = np.concatenate((self._split_val, np.zeros(extra, dtype=np.float32)))
+        self._min_bound = np.vstack((self._min_bound, np.zeros((extra, proj_dim), dtype=np.float32)))
+        self._max_bound = np.vstack((self._max_bound, np.zeros((extra, proj_dim), dtype=np.float32)))
+        self._leaf_start = np.concatenate((self._leaf_start, np.zeros(extra, dtype=np.int32)))
+        self._leaf_end = np.concatenate((self._leaf_end, np.zeros(extra, dtype=np.int32)))
 
     async def search(
         self,
@@ -188,83 +314,139 @@ class KDTreeIndex(VectorIndex):
             raise ValueError(f"Query dimension {query_vector.shape[0]} != index dimension {self.dimension}")
 
         async with self._lock.read():
-            if self._root is None:
-                return []
-
-            # Project query vector
-            projected_query = self._project_vector(query_vector)
-
-            # Priority queue for nearest neighbors (max heap)
-            nearest = []
-
-            # Priority queue for nodes to explore (min heap by distance to bounding box)
-            to_explore = [(0.0, self._root)]
-
-            while to_explore and (len(nearest) < k or to_explore[0][0] < -nearest[0][0]):
-                _, node = heapq.heappop(to_explore)
+            return await self._run_search(self._search_sync, query_vector, k, filter_ids)
 
-                if node.is_leaf:
-                    # Check all points in leaf
-                    for i, vector_id in enumerate(node.vector_ids):
-                        # Apply filter if provided
-                        if filter_ids is not None and vector_id not in filter_ids:
-                            continue
-
-                        # Compute exact distance using original vectors
-                        distance = self._compute_distance(query_vector, self._vectors[vector_id])
-
-                        if len(nearest) < k:
-                            heapq.heappush(nearest, (-distance, vector_id))
-                        elif distance < -nearest[0][0]:
-                            heapq.heapreplace(nearest, (-distance, vector_id))
+    def _search_sync(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        filter_ids: Optional[list[UUID]]
+    ) -> list[tuple[UUID, float]]:
+        """Search body; runs with the read lock held, possibly off the event loop."""
+        if not self._store or k <= 0:
+            return []
+
+        matrix = self._store.matrix
+        row_to_id = self._store.row_to_id
+
+        # Filter as a bitmap over store rows, tested per leaf in one gather
+        filter_mask = self._store.mask(filter_ids) if filter_ids is not None else None
+
+        # Project query vector
+        projected_query = self._project_vector(query_vector)
+
+        # Best candidates so far as parallel arrays of distances and leaf
+        # positions, trimmed back to k with argpartition after every leaf
+        best_dist = np.empty(0, dtype=np.float64)
+        best_pos = np.empty(0, dtype=np.intp)
+        bound = np.inf  # distance of the current k-th best
+
+        # Frontier of nodes still to explore, as parallel arrays of node ids
+        # and box distances (a lower bound on any point inside)
+        front_nodes = np.zeros(1, dtype=np.intp)
+        front_dist = np.zeros(1, dtype=np.float32)
+
+        while len(front_nodes):
+            # Drop boxes that cannot beat the current k-th best
+            keep = front_dist < bound
+            front_nodes, front_dist = front_nodes[keep], front_dist[keep]
+            if len(front_nodes) == 0:
+                break
+
+            # Pop the closest few nodes (best-bin-first via a partial sort)
+            if len(front_nodes) > self.FRONTIER_BATCH:
+                sel = np.argpartition(front_dist, self.FRONTIER_BATCH - 1)[:self.FRONTIER_BATCH]
+            else:
+                sel = np.arange(len(front_nodes))
+            sel = sel[np.argsort(front_dist[sel])]
+            popped, popped_dist = front_nodes[sel], front_dist[sel]
+            rest = np.ones(len(front_nodes), dtype=bool)
+            rest[sel] = False
+            front_nodes, front_dist = front_nodes[rest], front_dist[rest]
+
+            is_leaf = self._split_dim[popped] < 0
+            for node, box_dist in zip(popped[is_leaf].tolist(), popped_dist[is_leaf].tolist()):
+                if box_dist >= bound:
+                    continue
+
+                if self._dirty or filter_mask is not None:
+                    rows = self._leaf_rows(node)
+
+                    # Apply filter if provided
+                    if filter_mask is not None:
+                        rows = rows[filter_mask[rows]]
+                    if len(rows) == 0:
+                        continue
+                    vectors = matrix[rows]
                 else:
-                    # Internal node - explore children
-                    # Determine which child to explore first
-                    if projected_query[node.split_dim] < node.split_value:
-                        first_child, second_child = node.left, node.right
-                    else:
-                        first_child, second_child = node.right, node.left
-
-                    # Always explore the closer child
-                    first_dist = self._min_distance_to_box(projected_query, first_child)
-                    heapq.heappush(to_explore, (first_dist, first_child))
-
-                    # Only explore second child if it could contain closer points
-                    if len(nearest) < k or self._min_distance_to_box(projected_query, second_child) < -nearest[0][0]:
-                        second_dist = self._min_distance_to_box(projected_query, second_child)
-                        heapq.heappush(to_explore, (second_dist, second_child))
-
-            # Convert to desired format and sort by distance
-            result = [(vector_id, -distance) for distance, vector_id in nearest]
-            result.sort(key=lambda x: x[1])
-            return result
-
-    def _min_distance_to_box(self, point: np.ndarray, node: KDNode) -> float:
-        """Calculate minimum distance from point to node's bounding box."""
-        # For each dimension, calculate distance to nearest edge of box
-        distances = np.zeros_like(point)
-
-        for i in range(len(point)):
-            if point[i] < node.min_bound[i]:
-                distances[i] = node.min_bound[i] - point[i]
-            elif point[i] > node.max_bound[i]:
-                distances[i] = point[i] - node.max_bound[i]
-
-        return np.linalg.norm(distances)
+                    # Clean tree: the leaf is a contiguous slice of the store
+                    start, end = self._leaf_start[node], self._leaf_end[node]
+                    rows = np.arange(start, end)
+                    vectors = matrix[start:end]
+
+                # Compute exact distances for the whole leaf in one pass
+                norms = self._store.norms[rows] if self.metric == "cosine" else None
+                distances = self._compute_distances_batch(query_vector, vectors, norms)
+
+                best_dist = np.concatenate((best_dist, distances))
+                best_pos = np.concatenate((best_pos, rows))
+                if len(best_dist) > k:
+                    top = np.argpartition(best_dist, k - 1)[:k]
+                    best_dist, best_pos = best_dist[top], best_pos[top]
+                if len(best_dist) == k:
+                    bound = best_dist.max()
+
+            # Expand every popped internal node, scoring all children at once
+            internal = popped[~is_leaf]
+            if len(internal):
+                children = np.concatenate((2 * internal + 1, 2 * internal + 2))
+                child_dist = self._min_distance_to_box(
+                    projected_query, self._min_bound[children], self._max_bound[children]
+                )
+                front_nodes = np.concatenate((front_nodes, children))
+                front_dist = np.concatenate((front_dist, child_dist))
+
+        # Sort only the surviving k candidates
+        order = np.argsort(best_dist, kind="stable")
+        return [(row_to_id[best_pos[i]], float(best_dist[i])) for i in order]
+
+    def _box_scratch(self, n_boxes: int) -> np.ndarray:
+        """Return a per-thread (2, n_boxes, projection_dim) float32 scratch buffer."""
+        scratch = getattr(self._scratch, "buffer", None)
+        if scratch is None or scratch.shape[1] < n_boxes:
+            capacity = max(n_boxes, 2 * self.FRONTIER_BATCH)
+            scratch = np.empty((2, capacity, self.config.projection_dim), dtype=np.float32)
+            self._scratch.buffer = scratch
+        return scratch[:, :n_boxes]
+
+    def _min_distance_to_box(
+        self,
+        point: np.ndarray,
+        min_bound: np.ndarray,
+        max_bound: np.ndarray
+    ) -> np.ndarray:
+        """Calculate minimum distance from point to each bounding box (one per row)."""
+        below, above = self._box_scratch(len(min_bound))
+
+        # Per dimension, the gap to the nearest box edge (zero when inside),
+        # computed branchlessly into reused scratch instead of temporaries
+        np.subtract(min_bound, point, out=below)
+        np.subtract(point, max_bound, out=above)
+        np.maximum(below, above, out=below)
+        np.maximum(below, 0, out=below)
+        return np.sqrt(np.einsum("ij,ij->i", below, below))
 
     async def remove(self, vector_id: UUID) -> bool:
         """Remove a vector from the index."""
         async with self._lock.write():
-            if vector_id not in self._vectors:
+            if vector_id not in self._store:
                 return False
 
-            # Remove from storage
-            del self._vectors[vector_id]
-            del self._projected_vectors[vector_id]
-            self._size = len(self._vectors)
-
-            # Rebuild tree (simple approach - in production, use lazy deletion)
-            await self._rebuild_tree()
+            # Tombstone the row; it is dropped from the tree on the next rebuild
+            self._store.tombstone(vector_id)
+            self._size = len(self._store)
+            self._dirty += 1
+            await self._maybe_rebuild()
 
             logger.debug("Removed vector from KD-Tree index", vector_id=str(vector_id))
             return True
@@ -272,8 +454,8 @@ class KDTreeIndex(VectorIndex):
     async def clear(self) -> None:
         """Clear all vectors from the index."""
         async with self._lock.write():
-            self._vectors.clear()
-            self._projected_vectors.clear()
-            self._root = None
+            self._store.clear()
+            self._reset_tree()
+            self._dirty = 0
             self._size = 0
             logger.info("Cleared KD-Tree index")
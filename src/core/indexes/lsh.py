@@ -1,4 +1,5 @@
 from collections import defaultdict
+from collections.abc import Hashable
 from dataclasses import dataclass
 from typing import Optional
 from uuid import UUID
@@ -9,6 +10,7 @@ from src.core.logging import get_logger
 from src.infrastructure.locks import ReadWriteLock
 
 from .base import IndexConfig, VectorIndex
+from .storage import VectorStore
 
 logger = get_logger(__name__)
 
@@ -18,6 +20,7 @@ class LSHConfig(IndexConfig):
     """Configuration for LSH index."""
     num_tables: int = 10
     key_size: int = 10
+    num_probes: int = 0  # Extra buckets probed per table at Hamming distance 1
     seed: int = 42
 
 
@@ -29,20 +32,33 @@ class LSHIndex(VectorIndex):
         self.config: LSHConfig = config
         self._lock = ReadWriteLock()
 
-        # Initialize random hyperplanes for each table
+        # Initialize random hyperplanes for each table, stacked into a single
+        # (num_tables * key_size, dimension) matrix so every table is hashed
+        # with one matmul
         np.random.seed(config.seed)
-        self._hyperplanes = [
+        self._H = np.vstack([
             np.random.randn(config.key_size, config.dimension)
             for _ in range(config.num_tables)
+        ]).astype(np.float32)
+
+        # Bit weights for packing up to 64 hash bits into one integer key;
+        # larger key sizes are split into 64-bit limbs and keyed by tuple
+        self._bit_weights = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+        self._limb_slices = [
+            slice(start, min(start + 64, config.key_size))
+            for start in range(0, config.key_size, 64)
         ]
 
-        # Hash tables: table_idx -> hash_key -> set of vector IDs
-        self._tables: list[dict[str, set[UUID]]] = [
-            defaultdict(set) for _ in range(config.num_tables)
+        # Hash tables: table_idx -> packed hash key -> list of store rows
+        self._tables: list[dict[Hashable, list[int]]] = [
+            defaultdict(list) for _ in range(config.num_tables)
         ]
 
-        # Vector storage
-        self._vectors: dict[UUID, np.ndarray] = {}
+        # Vector storage: one contiguous float32 matrix addressed by row
+        self._store = VectorStore(config.dimension)
+
+        # Per-vector bucket keys (one per table), so removal needs no re-projection
+        self._signatures: dict[UUID, list[Hashable]] = {}
 
         logger.info(
             "Initialized LSH index",
@@ -51,14 +67,55 @@ class LSHIndex(VectorIndex):
             key_size=config.key_size
         )
 
-    def _hash_vector(self, vector: np.ndarray, table_idx: int) -> str:
-        """Generate hash key for a vector in a specific table."""
-        # Project vector onto hyperplanes
-        projections = np.dot(self._hyperplanes[table_idx], vector)
-        # Convert to binary hash
-        binary_hash = (projections > 0).astype(int)
-        # Convert to string key
-        return ''.join(map(str, binary_hash))
+    def _project_all(self, vector: np.ndarray) -> np.ndarray:
+        """Project a vector onto every table's hyperplanes, shaped (tables, key_size)."""
+        # Cast the query so the float32 hyperplanes are never upcast to float64
+        projections = self._H @ np.asarray(vector, dtype=np.float32)
+        return projections.reshape(self.config.num_tables, self.config.key_size)
+
+    def _hash_all(self, vector: np.ndarray) -> list[Hashable]:
+        """Compute the bucket key of a vector for every table."""
+        return self._pack_keys(self._project_all(vector) > 0)
+
+    def _probe_keys(self, projections: np.ndarray) -> list[list[Hashable]]:
+        """Compute multi-probe bucket keys per table, indexed [table][probe].
+
+        Each probe flips one hash bit, starting with the bits whose projection
+        is closest to zero, i.e. the hyperplanes the query nearly fell across.
+        """
+        num_probes = min(self.config.num_probes, self.config.key_size)
+        bits = projections > 0
+
+        flip = np.argsort(np.abs(projections), axis=1)[:, :num_probes]
+        probe_bits = np.repeat(bits[:, np.newaxis, :], num_probes, axis=1)
+        table_idx = np.arange(self.config.num_tables)[:, np.newaxis]
+        probe_idx = np.arange(num_probes)[np.newaxis, :]
+        probe_bits[table_idx, probe_idx, flip] ^= True
+
+        return self._pack_keys(probe_bits)
+
+    def _hash_batch(self, vectors: np.ndarray) -> list[list[Hashable]]:
+        """Compute bucket keys for a batch of vectors, indexed [table][vector]."""
+        projections = self._H @ vectors.T
+        bits = (projections > 0).reshape(
+            self.config.num_tables, self.config.key_size, vectors.shape[0]
+        )
+        return self._pack_keys(bits.transpose(0, 2, 1))
+
+    def _pack_keys(self, bits: np.ndarray) -> list:
+        """Pack hash bits along the last axis into integer (or limb tuple) keys."""
+        limbs = [
+            bits[..., limb].astype(np.uint64) @ self._bit_weights[:limb.stop - limb.start]
+            for limb in self._limb_slices
+        ]
+        if len(limbs) == 1:
+            return limbs[0].tolist()
+
+        # key_size > 64: combine the per-limb integers into tuple keys
+        keys = np.empty(limbs[0].shape, dtype=object)
+        for i, key in enumerate(zip(*(limb.ravel().tolist() for limb in limbs))):
+            keys.flat[i] = key
+        return keys.tolist()
 
     async def add(self, vector_id: UUID, vector: np.ndarray) -> None:
         """Add a vector to the index."""
@@ -66,33 +123,48 @@ class LSHIndex(VectorIndex):
             raise ValueError(f"Vector dimension {vector.shape[0]} != index dimension {self.dimension}")
 
         async with self._lock.write():
-            # Store vector
-            self._vectors[vector_id] = vector.copy()
+            # Re-adding an id rehashes it, so drop its old bucket entries first
+            if vector_id in self._store:
+                self._unlink(vector_id)
 
-            # Add to hash tables
-            for table_idx in range(self.config.num_tables):
-                hash_key = self._hash_vector(vector, table_idx)
-                self._tables[table_idx][hash_key].add(vector_id)
+            row = self._store.add(vector_id, vector)
 
-            self._size = len(self._vectors)
+            # Add to hash tables, remembering the keys for remove()
+            signature = self._hash_all(self._store.matrix[row])
+            for table_idx, hash_key in enumerate(signature):
+                self._tables[table_idx][hash_key].append(row)
+            self._signatures[vector_id] = signature
+
+            self._size = len(self._store)
             logger.debug("Added vector to LSH index", vector_id=str(vector_id))
 
     async def add_batch(self, vectors: list[tuple[UUID, np.ndarray]]) -> None:
         """Add multiple vectors efficiently."""
+        if not vectors:
+            return
+
+        for _, vector in vectors:
+            if vector.shape[0] != self.dimension:
+                raise ValueError(f"Vector dimension {vector.shape[0]} != index dimension {self.dimension}")
+
         async with self._lock.write():
-            for vector_id, vector in vectors:
-                if vector.shape[0] != self.dimension:
-                    raise ValueError(f"Vector dimension {vector.shape[0]} != index dimension {self.dimension}")
+            vector_ids = [vector_id for vector_id, _ in vectors]
+            for vector_id in vector_ids:
+                if vector_id in self._store:
+                    self._unlink(vector_id)
+
+            rows = self._store.add_batch(vector_ids, np.stack([vector for _, vector in vectors]))
 
-                # Store vector
-                self._vectors[vector_id] = vector.copy()
+            # Hash every vector against every table in a single GEMM
+            keys = self._hash_batch(self._store.matrix[rows])
 
-                # Add to hash tables
-                for table_idx in range(self.config.num_tables):
-                    hash_key = self._hash_vector(vector, table_idx)
-                    self._tables[table_idx][hash_key].add(vector_id)
+            for i, (vector_id, row) in enumerate(zip(vector_ids, rows.tolist())):
+                signature = [table_keys[i] for table_keys in keys]
+                for table_idx, hash_key in enumerate(signature):
+                    self._tables[table_idx][hash_key].append(row)
+                self._signatures[vector_id] = signature
 
-            self._size = len(self._vectors)
+            self._size = len(self._store)
             logger.info(f"Added {len(vectors)} vectors to LSH index")
 
     async def search(
@@ -106,58 +178,88 @@ class LSHIndex(VectorIndex):
             raise ValueError(f"Query dimension {query_vector.shape[0]} != index dimension {self.dimension}")
 
         async with self._lock.read():
-            # Get candidate set from all tables
-            candidates: set[UUID] = set()
-
-            for table_idx in range(self.config.num_tables):
-                hash_key = self._hash_vector(query_vector, table_idx)
-                if hash_key in self._tables[table_idx]:
-                    candidates.update(self._tables[table_idx][hash_key])
-
-            # Apply filter if provided
-            if filter_ids is not None:
-                filter_set = set(filter_ids)
-                candidates = candidates.intersection(filter_set)
-
-            # Compute exact distances for candidates
-            distances = []
-            for candidate_id in candidates:
-                if candidate_id in self._vectors:
-                    distance = self._compute_distance(query_vector, self._vectors[candidate_id])
-                    distances.append((candidate_id, distance))
-
-            # Sort by distance and return top k
-            distances.sort(key=lambda x: x[1])
-            return distances[:k]
+            return await self._run_search(self._search_sync, query_vector, k, filter_ids)
+
+    def _search_sync(
+        self,
+        query_vector: np.ndarray,
+        k: int,
+        filter_ids: Optional[list[UUID]]
+    ) -> list[tuple[UUID, float]]:
+        """Search body; runs with the read lock held, possibly off the event loop."""
+        # Union the matching buckets of all tables into a bitmap over rows
+        n_rows = len(self._store.row_to_id)
+        mask = np.zeros(n_rows, dtype=bool)
+
+        projections = self._project_all(query_vector)
+        for table_idx, hash_key in enumerate(self._pack_keys(projections > 0)):
+            bucket = self._tables[table_idx].get(hash_key)
+            if bucket:
+                mask[bucket] = True
+
+        # Multi-probe: also visit the nearest neighbouring buckets per table
+        if self.config.num_probes > 0:
+            for table_idx, probe_keys in enumerate(self._probe_keys(projections)):
+                for hash_key in probe_keys:
+                    bucket = self._tables[table_idx].get(hash_key)
+                    if bucket:
+                        mask[bucket] = True
+
+        # Apply filter if provided, as a second bitmap
+        if filter_ids is not None:
+            mask &= self._store.mask(filter_ids)
+
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            return []
+
+        # Rerank the candidate rows with one vectorized pass;
+        # cosine reuses the stored row norms so it is a single GEMV
+        norms = self._store.norms[rows] if self.metric == "cosine" else None
+        distances = self._compute_distances_batch(query_vector, self._store.matrix[rows], norms)
+
+        # Select and sort only the top k
+        if len(distances) > k:
+            top = np.argpartition(distances, k)[:k]
+        else:
+            top = np.arange(len(distances))
+        top = top[np.argsort(distances[top])]
+
+        row_to_id = self._store.row_to_id
+        return [(row_to_id[rows[i]], float(distances[i])) for i in top]
 
     async def remove(self, vector_id: UUID) -> bool:
         """Remove a vector from the index."""
         async with self._lock.write():
-            if vector_id not in self._vectors:
+            if vector_id not in self._store:
                 return False
 
-            vector = self._vectors[vector_id]
-
             # Remove from hash tables
-            for table_idx in range(self.config.num_tables):
-                hash_key = self._hash_vector(vector, table_idx)
-                if hash_key in self._tables[table_idx]:
-                    self._tables[table_idx][hash_key].discard(vector_id)
-                    # Clean up empty buckets
-                    if not self._tables[table_idx][hash_key]:
-                        del self._tables[table_idx][hash_key]
-
-            # Remove vector
-            del self._vectors[vector_id]
-            self._size = len(self._vectors)
+            self._unlink(vector_id)
+
+            # Release the vector's row for reuse
+            self._store.remove(vector_id)
+            self._size = len(self._store)
 
             logger.debug("Removed vector from LSH index", vector_id=str(vector_id))
             return True
 
+    def _unlink(self, vector_id: UUID) -> None:
+        """Remove a stored vector's row from the buckets recorded in its signature."""
+        row = self._store.id_to_row[vector_id]
+        for table_idx, hash_key in enumerate(self._signatures.pop(vector_id)):
+            bucket = self._tables[table_idx].get(hash_key)
+            if bucket is not None and row in bucket:
+                bucket.remove(row)
+                # Clean up empty buckets
+                if not bucket:
+                    del self._tables[table_idx][hash_key]
+
     async def clear(self) -> None:
         """Clear all vectors from the index."""
         async with self._lock.write():
-            self._vectors.clear()
+            self._store.clear()
+            self._signatures.clear()
             for table in self._tables:
                 table.clear()
             self._size = 0
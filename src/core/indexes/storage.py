@@ -0,0 +1,151 @@
+from collections.abc import Iterable
+from typing import Optional
+from uuid import UUID
+
+import numpy as np
+
+
+class VectorStore:
+    """Contiguous row storage for the vectors held by an index.
+
+    Vectors live in a single ``float32[capacity, dimension]`` matrix addressed
+    by row number, alongside the L2 norm of every row and a mask of live
+    rows. Removed rows go on a free list and are reused by later inserts, so
+    removal never repacks the matrix; ``tombstone`` instead retires a row
+    without reuse, for callers that keep their own references to row numbers.
+    ``compact`` repacks explicitly when an index wants its live rows densely
+    ordered.
+    """
+
+    def __init__(self, dimension: int, initial_capacity: int = 64):
+        self.dimension = dimension
+        self.matrix = np.zeros((initial_capacity, dimension), dtype=np.float32)
+        self.norms = np.zeros(initial_capacity, dtype=np.float32)
+        self.live = np.zeros(initial_capacity, dtype=bool)
+        self.id_to_row: dict[UUID, int] = {}
+        self.row_to_id: list[Optional[UUID]] = []
+        self._free_rows: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self.id_to_row)
+
+    def __contains__(self, vector_id: UUID) -> bool:
+        return vector_id in self.id_to_row
+
+    def _reserve(self, count: int) -> None:
+        """Grow the matrix so ``count`` more rows can be appended."""
+        needed = len(self.row_to_id) + count
+        capacity = self.matrix.shape[0]
+        if needed <= capacity:
+            return
+
+        while capacity < needed:
+            capacity = max(2 * capacity, 1)
+        grown = np.zeros((capacity, self.dimension), dtype=np.float32)
+        grown[:len(self.row_to_id)] = self.matrix[:len(self.row_to_id)]
+        self.matrix = grown
+        self.norms = np.resize(self.norms, capacity)
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self.live)] = self.live
+        self.live = live
+
+    def add(self, vector_id: UUID, vector: np.ndarray) -> int:
+        """Store a vector and return its row; an existing id is overwritten.
+
+        The vector is cast straight into the float32 matrix, which is the
+        only copy the store keeps; callers need not copy it beforehand.
+        """
+        row = self.add_row(vector_id)
+        np.copyto(self.matrix[row], vector, casting="unsafe")
+        self.norms[row] = np.linalg.norm(self.matrix[row])
+        return row
+
+    def add_batch(self, vector_ids: list[UUID], vectors: np.ndarray) -> np.ndarray:
+        """Store a stacked batch of vectors and return their rows."""
+        self._reserve(len(vector_ids))
+        rows = np.fromiter(
+            (self.add_row(vector_id) for vector_id in vector_ids),
+            dtype=np.intp,
+            count=len(vector_ids)
+        )
+        self.matrix[rows] = vectors
+        self.norms[rows] = np.linalg.norm(self.matrix[rows], axis=1)
+        return rows
+
+    def add_row(self, vector_id: UUID) -> int:
+        """Allocate (or look up) the row for a vector id without writing it."""
+        row = self.id_to_row.get(vector_id)
+        if row is not None:
+            return row
+
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self.row_to_id[row] = vector_id
+        else:
+            self._reserve(1)
+            row = len(self.row_to_id)
+            self.row_to_id.append(vector_id)
+        self.id_to_row[vector_id] = row
+        self.live[row] = True
+        return row
+
+    def remove(self, vector_id: UUID) -> Optional[int]:
+        """Release the row of a vector, returning it (or None if absent)."""
+        row = self.id_to_row.pop(vector_id, None)
+        if row is None:
+            return None
+
+        self.row_to_id[row] = None
+        self.live[row] = False
+        self._free_rows.append(row)
+        return row
+
+    def tombstone(self, vector_id: UUID) -> Optional[int]:
+        """Retire the row of a vector without making it reusable until ``compact``."""
+        row = self.id_to_row.pop(vector_id, None)
+        if row is None:
+            return None
+
+        self.row_to_id[row] = None
+        self.live[row] = False
+        return row
+
+    def get(self, vector_id: UUID) -> np.ndarray:
+        """Return the stored vector for an id as a view into the matrix."""
+        return self.matrix[self.id_to_row[vector_id]]
+
+    def mask(self, vector_ids: Iterable[UUID]) -> np.ndarray:
+        """Build a boolean bitmap over rows marking the given (stored) ids."""
+        id_to_row = self.id_to_row
+        mask = np.zeros(len(self.row_to_id), dtype=bool)
+        mask[[id_to_row[vid] for vid in vector_ids if vid in id_to_row]] = True
+        return mask
+
+    def compact(self, order: Optional[np.ndarray] = None) -> None:
+        """Pack live rows into ``[0, len)``, optionally in the given row order."""
+        if order is None:
+            order = np.fromiter(self.id_to_row.values(), dtype=np.intp, count=len(self))
+
+        packed = np.zeros((max(len(order), 1), self.dimension), dtype=np.float32)
+        packed[:len(order)] = self.matrix[order]
+        norms = np.zeros(len(packed), dtype=np.float32)
+        norms[:len(order)] = self.norms[order]
+        live = np.zeros(len(packed), dtype=bool)
+        live[:len(order)] = True
+        row_to_id = [self.row_to_id[row] for row in order]
+
+        self.matrix = packed
+        self.norms = norms
+        self.live = live
+        self.row_to_id = row_to_id
+        self.id_to_row = {vector_id: row for row, vector_id in enumerate(row_to_id)}
+        self._free_rows = []
+
+    def clear(self) -> None:
+        """Drop all stored vectors."""
+        self.matrix = np.zeros((self.matrix.shape[0], self.dimension), dtype=np.float32)
+        self.norms = np.zeros(self.matrix.shape[0], dtype=np.float32)
+        self.live = np.zeros(self.matrix.shape[0], dtype=bool)
+        self.id_to_row.clear()
+        self.row_to_id.clear()
+        self._free_rows.clear()
@@ -46,4 +46,9 @@ def get_logger(name: str) -> structlog.BoundLogger:
     return structlog.get_logger(name)
 
 
+def is_debug_enabled(name: str) -> bool:
+    """Return True if debug records for the given logger would be emitted."""
+    return logging.getLogger(name).isEnabledFor(logging.DEBUG)
+
+
 setup_logging()
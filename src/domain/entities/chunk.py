@@ -4,10 +4,15 @@ from datetime import datetime
 from typing import Any, Optional
 from uuid import UUID
 
+import numpy as np
 
-@dataclass
+
+@dataclass(frozen=True)
 class Chunk:
-    """Represents a text chunk with embedding."""
+    """Represents a text chunk with embedding.
+
+    Chunks are immutable: changes are made with ``dataclasses.replace``.
+    """
     id: UUID
     library_id: UUID  # Este campo es necesario
     content: str
@@ -17,6 +22,9 @@ class Chunk:
     metadata: dict[str, Any] = field(default_factory=dict)
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
+    _embedding_cache: Optional[tuple[list[float], np.ndarray]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         """Validate chunk after initialization."""
@@ -26,3 +34,18 @@ class Chunk:
             raise ValueError("Embedding cannot be empty")
         if len(self.content) > 10000:
             raise ValueError("Content cannot exceed 10000 characters")
+
+    def to_numpy(self) -> np.ndarray:
+        """Return the embedding as a read-only float32 array.
+
+        The array is cached for as long as the chunk holds the same
+        embedding list; do not mutate that list in place.
+        """
+        cache = self._embedding_cache
+        if cache is None or cache[0] is not self.embedding:
+            array = np.array(self.embedding, dtype=np.float32)
+            array.flags.writeable = False
+            cache = (self.embedding, array)
+            # A cache, not state: set past the frozen dataclass's guard
+            object.__setattr__(self, "_embedding_cache", cache)
+        return cache[1]
@@ -29,6 +29,7 @@ class Document(BaseModel):
 
     class Config:
         """Pydantic model configuration."""
+        frozen = True
         json_encoders = {
             UUID: str,
             datetime: lambda v: v.isoformat(),
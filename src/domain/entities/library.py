@@ -14,7 +14,10 @@ class IndexType(str, Enum):
 
 
 class Library(BaseModel):
-    """Represents a library containing documents and vector index."""
+    """Represents a library containing documents and vector index.
+
+    Libraries are immutable: changes are made with ``model_copy(update=...)``.
+    """
 
     id: UUID = Field(default_factory=uuid4)
     name: str = Field(..., min_length=1, max_length=255)
@@ -42,6 +45,7 @@ class Library(BaseModel):
         return datetime.utcnow()
 
     model_config = {
+        "frozen": True,
         "json_encoders": {
             UUID: str,
             datetime: lambda v: v.isoformat(),
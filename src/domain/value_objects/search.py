@@ -2,7 +2,7 @@ from typing import Any, Optional
 from uuid import UUID
 
 import numpy as np
-from pydantic import BaseModel, Field, FieldValidationInfo, field_validator
+from pydantic import BaseModel, Field, FieldValidationInfo, PrivateAttr, field_validator, model_validator
 
 
 class SearchQuery(BaseModel):
@@ -13,16 +13,24 @@ class SearchQuery(BaseModel):
     library_id: UUID
     metadata_filters: Optional[dict[str, Any]] = None
 
-    @field_validator('embedding')
-    def validate_embedding(cls, v):
-        """Ensure embedding is valid."""
-        if not all(isinstance(x, (int, float)) for x in v):
-            raise ValueError("Embedding must contain only numbers")
-        return v
+    # float32 copy of the embedding, built once during validation
+    _embedding_array: np.ndarray = PrivateAttr()
+
+    @model_validator(mode='after')
+    def validate_embedding(self):
+        """Ensure embedding is valid and cache it as a float32 array."""
+        # A single C-level conversion rejects non-numeric data
+        try:
+            array = np.fromiter(self.embedding, dtype=np.float32, count=len(self.embedding))
+        except (TypeError, ValueError) as e:
+            raise ValueError("Embedding must contain only numbers") from e
+        array.flags.writeable = False
+        self._embedding_array = array
+        return self
 
     def to_numpy(self) -> np.ndarray:
-        """Convert embedding to numpy array."""
-        return np.array(self.embedding, dtype=np.float32)
+        """Return the embedding as a (read-only, cached) numpy array."""
+        return self._embedding_array
 
 
 class SearchResult(BaseModel):
@@ -47,14 +55,22 @@ class SearchResult(BaseModel):
 
         return 1.0 / (1.0 + distance)
 
-    @field_validator("score", mode="before")
-    def calc_score(cls, v, info: FieldValidationInfo) -> float:
-        if v is not None:
-            return v
-        distance = info.data.get("distance")
-        if distance is None:
-            raise ValueError("distance is required to compute score")
-        return 1.0 / (1.0 + distance)
+    @classmethod
+    def from_trusted(
+        cls,
+        chunk_id: UUID,
+        content: str,
+        distance: float,
+        metadata: dict[str, Any]
+    ) -> "SearchResult":
+        """Build a result from index data without running validation."""
+        return cls.model_construct(
+            chunk_id=chunk_id,
+            content=content,
+            distance=distance,
+            score=1.0 / (1.0 + distance),
+            metadata=metadata
+        )
 
     class Config:
         """Pydantic model configuration."""
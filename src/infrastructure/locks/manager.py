@@ -1,16 +1,17 @@
 import asyncio
 from contextlib import asynccontextmanager
-from enum import Enum
+from enum import IntEnum
+from operator import itemgetter
 from uuid import UUID
 
-from src.core.logging import get_logger
+from src.core.logging import get_logger, is_debug_enabled
 
 from .rwlock import ReadWriteLock
 
 logger = get_logger(__name__)
 
 
-class LockLevel(Enum):
+class LockLevel(IntEnum):
     """Lock hierarchy levels."""
     LIBRARY = 1
     DOCUMENT = 2
@@ -19,11 +20,18 @@ class LockLevel(Enum):
 
 
 class LockManager:
-    """Manages hierarchical locks for different resource types."""
+    """Manages hierarchical locks for different resource types.
+
+    The lock table is split into independent shards, each with its own
+    creation lock, so lookups and creations for unrelated resources do not
+    contend on one dict and one mutex.
+    """
+
+    SHARD_COUNT = 16  # Must be a power of two
 
     def __init__(self):
-        self._locks: dict[str, ReadWriteLock] = {}
-        self._lock_creation_lock = asyncio.Lock()
+        self._shards: list[dict[str, ReadWriteLock]] = [{} for _ in range(self.SHARD_COUNT)]
+        self._shard_locks = [asyncio.Lock() for _ in range(self.SHARD_COUNT)]
 
     def _get_lock_key(self, level: LockLevel, resource_id: UUID) -> str:
         """Generate unique lock key for resource."""
@@ -31,14 +39,22 @@ class LockManager:
 
     async def _get_or_create_lock(self, key: str) -> ReadWriteLock:
         """Get existing lock or create new one."""
-        if key not in self._locks:
-            async with self._lock_creation_lock:
-                # Double-check pattern
-                if key not in self._locks:
-                    self._locks[key] = ReadWriteLock()
+        shard_idx = hash(key) & (self.SHARD_COUNT - 1)
+        shard = self._shards[shard_idx]
+
+        # Hot path: a single dict probe, no creation lock
+        lock = shard.get(key)
+        if lock is not None:
+            return lock
+
+        async with self._shard_locks[shard_idx]:
+            # Double-check pattern
+            lock = shard.get(key)
+            if lock is None:
+                lock = shard[key] = ReadWriteLock()
+                if is_debug_enabled(__name__):
                     logger.debug(f"Created lock for {key}")
-
-        return self._locks[key]
+            return lock
 
     @asynccontextmanager
     async def acquire_read(self, level: LockLevel, resource_id: UUID):
@@ -47,7 +63,8 @@ class LockManager:
         lock = await self._get_or_create_lock(key)
 
         async with lock.read():
-            logger.debug(f"Acquired read lock for {key}")
+            if is_debug_enabled(__name__):
+                logger.debug(f"Acquired read lock for {key}")
             yield
 
     @asynccontextmanager
@@ -57,7 +74,8 @@ class LockManager:
         lock = await self._get_or_create_lock(key)
 
         async with lock.write():
-            logger.debug(f"Acquired write lock for {key}")
+            if is_debug_enabled(__name__):
+                logger.debug(f"Acquired write lock for {key}")
             yield
 
     @asynccontextmanager
@@ -66,14 +84,21 @@ class LockManager:
         locks: list[tuple[LockLevel, UUID, str]]  # (level, id, "read" or "write")
     ):
         """Acquire multiple locks in hierarchical order to prevent deadlocks."""
-        # Sort by level to ensure consistent ordering
-        sorted_locks = sorted(locks, key=lambda x: x[0].value)
+        # Deduplicate resources (a lock requested twice would deadlock on
+        # itself), upgrading to write if any request for it is a write
+        modes: dict[tuple[LockLevel, UUID], str] = {}
+        for level, resource_id, lock_type in locks:
+            if modes.get((level, resource_id)) != "write":
+                modes[(level, resource_id)] = lock_type
+
+        # Sort by (level, resource id) to ensure consistent ordering
+        sorted_locks = sorted(modes.items(), key=itemgetter(0))
+        keys = [self._get_lock_key(level, resource_id) for (level, resource_id), _ in sorted_locks]
 
         acquired_locks = []
         try:
             # Acquire locks in order
-            for level, resource_id, lock_type in sorted_locks:
-                key = self._get_lock_key(level, resource_id)
+            for key, (_, lock_type) in zip(keys, sorted_locks):
                 lock = await self._get_or_create_lock(key)
 
                 if lock_type == "read":
@@ -83,7 +108,8 @@ class LockManager:
 
                 await ctx.__aenter__()
                 acquired_locks.append(ctx)
-                logger.debug(f"Acquired {lock_type} lock for {key}")
+                if is_debug_enabled(__name__):
+                    logger.debug(f"Acquired {lock_type} lock for {key}")
 
             yield
 
@@ -94,9 +120,10 @@ class LockManager:
 
     def cleanup_unused_locks(self, threshold: int = 1000):
         """Remove unused locks to prevent memory leaks."""
-        if len(self._locks) > threshold:
+        lock_count = sum(len(shard) for shard in self._shards)
+        if lock_count > threshold:
             # In a production system, would implement LRU or time-based cleanup
-            logger.warning(f"Lock count exceeded threshold: {len(self._locks)}")
+            logger.warning(f"Lock count exceeded threshold: {lock_count}")
 
 
 lock_manager = LockManager()
@@ -1,79 +1,147 @@
 import asyncio
-from contextlib import asynccontextmanager
+from collections import deque
 
-from src.core.logging import get_logger
+# Lock state is one int: bit 0 is the writer flag, the bits above count readers
+_WRITER = 1
+_READER = 2
 
-logger = get_logger(__name__)
+
+class _ReadGuard:
+    """Reusable ``async with`` guard taking a lock's read side."""
+
+    __slots__ = ('_lock',)
+
+    def __init__(self, lock: "ReadWriteLock"):
+        self._lock = lock
+
+    async def __aenter__(self):
+        lock = self._lock
+        # Uncontended fast path inline: no extra coroutine, no queueing
+        if not lock._state & _WRITER and not lock._waiters:
+            lock._state += _READER
+        else:
+            await lock._wait(is_writer=False)
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._lock._release_read()
+
+
+class _WriteGuard:
+    """Reusable ``async with`` guard taking a lock's write side."""
+
+    __slots__ = ('_lock',)
+
+    def __init__(self, lock: "ReadWriteLock"):
+        self._lock = lock
+
+    async def __aenter__(self):
+        await self._lock._acquire_write()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._lock._release_write()
 
 
 class ReadWriteLock:
-    """Async read-write lock for managing concurrent access."""
+    """Async read-write lock for managing concurrent access.
+
+    Waiters queue in FIFO order and are woken individually: a release grants
+    ownership directly to either the single writer at the head of the queue
+    or every reader up to the next writer. A reader that arrives while
+    anyone is queued waits its turn, so writers cannot be starved.
+    """
 
     def __init__(self):
-        self._read_count = 0
-        self._write_locked = False
-        self._pending_writers = 0
-        self._read_ready = asyncio.Condition()
-        self._write_ready = asyncio.Condition()
-
-    @asynccontextmanager
-    async def read(self):
+        # Packed writer flag and reader count (see _WRITER/_READER); state
+        # changes never await, so they are atomic on the event loop
+        self._state = 0
+        # (is_writer, future) per waiting task
+        self._waiters: deque[tuple[bool, asyncio.Future]] = deque()
+        # Guards hold no per-use state, so one of each serves every caller
+        self._read_guard = _ReadGuard(self)
+        self._write_guard = _WriteGuard(self)
+
+    @property
+    def _read_count(self) -> int:
+        """Number of readers currently holding the lock."""
+        return self._state >> 1
+
+    @property
+    def _write_locked(self) -> bool:
+        """Whether a writer currently holds the lock."""
+        return bool(self._state & _WRITER)
+
+    def read(self) -> _ReadGuard:
         """Acquire read lock."""
-        await self._acquire_read()
-        try:
-            yield
-        finally:
-            await self._release_read()
+        return self._read_guard
 
-    @asynccontextmanager
-    async def write(self):
+    def write(self) -> _WriteGuard:
         """Acquire write lock."""
-        await self._acquire_write()
-        try:
-            yield
-        finally:
-            await self._release_write()
+        return self._write_guard
 
     async def _acquire_read(self):
         """Acquire read lock implementation."""
-        async with self._read_ready:
-            # Wait while there's a writer or pending writers
-            while self._write_locked or self._pending_writers > 0:
-                await self._read_ready.wait()
+        if not self._state & _WRITER and not self._waiters:
+            self._state += _READER
+        else:
+            await self._wait(is_writer=False)
 
-            self._read_count += 1
-            logger.debug(f"Read lock acquired, readers: {self._read_count}")
-
-    async def _release_read(self):
+    def _release_read(self):
         """Release read lock implementation."""
-        async with self._read_ready:
-            self._read_count -= 1
-            logger.debug(f"Read lock released, readers: {self._read_count}")
+        self._state -= _READER
 
-            # Notify writers if no more readers
-            if self._read_count == 0:
-                self._read_ready.notify_all()
+        # Hand over to the next waiter if no more readers
+        if not self._state and self._waiters:
+            self._wake_waiters()
 
     async def _acquire_write(self):
         """Acquire write lock implementation."""
-        async with self._write_ready:
-            self._pending_writers += 1
-
-            # Wait for exclusive access
-            while self._write_locked or self._read_count > 0:
-                await self._write_ready.wait()
+        if not self._state and not self._waiters:
+            self._state = _WRITER
+        else:
+            await self._wait(is_writer=True)
 
-            self._pending_writers -= 1
-            self._write_locked = True
-            logger.debug("Write lock acquired")
-
-    async def _release_write(self):
+    def _release_write(self):
         """Release write lock implementation."""
-        async with self._write_ready:
-            self._write_locked = False
-            logger.debug("Write lock released")
-
-            # Notify all waiting readers and writers
-            self._write_ready.notify_all()
-            async with self._read_ready:
-                self._read_ready.notify_all()
+        self._state = 0
+        if self._waiters:
+            self._wake_waiters()
+
+    async def _wait(self, is_writer: bool):
+        """Queue the current task and wait until ownership is handed to it."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((is_writer, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Ownership was granted just before the cancellation landed
+                if is_writer:
+                    self._release_write()
+                else:
+                    self._release_read()
+            else:
+                # A cancelled head waiter may have been blocking others
+                self._wake_waiters()
+            raise
+
+    def _wake_waiters(self):
+        """Grant the lock to the writer or leading readers at the queue head."""
+        while self._waiters:
+            is_writer, future = self._waiters[0]
+            if future.done():
+                # Cancelled while waiting
+                self._waiters.popleft()
+                continue
+
+            if is_writer:
+                if not self._state:
+                    self._waiters.popleft()
+                    self._state = _WRITER
+                    future.set_result(None)
+                return
+
+            if self._state & _WRITER:
+                return
+            self._waiters.popleft()
+            self._state += _READER
+            future.set_result(None)
@@ -1,7 +1,8 @@
 """Persistence manager that coordinates WAL and snapshots."""
 import asyncio
+import time
 import uuid
-from datetime import UTC, datetime, timedelta
+from datetime import timedelta
 from typing import Any, Optional
 
 from src.core.config import settings
@@ -18,6 +19,9 @@ logger = get_logger(__name__)
 class PersistenceManager:
     """Manages persistence operations including WAL and snapshots."""
 
+    # Maximum number of queued operations written by one group commit
+    WAL_BATCH_SIZE = 256
+
     def __init__(
         self,
         wal: Optional[IWriteAheadLog] = None,
@@ -35,19 +39,34 @@ class PersistenceManager:
         """
         self.wal = wal or FileWAL(settings.wal_directory)
         self.snapshot_manager = snapshot_manager or FileSnapshotManager(
-            settings.snapshot_directory
+            settings.snapshot_directory,
+            vector_quantization=settings.snapshot_vector_quantization
         )
 
         self.auto_checkpoint_interval = auto_checkpoint_interval
         self.auto_snapshot_interval = auto_snapshot_interval
+        self._auto_snapshot_seconds = auto_snapshot_interval.total_seconds()
 
         self.operations_since_checkpoint = 0
-        self.last_snapshot_time = datetime.now(UTC)  # Fixed deprecation
+        # Monotonic seconds, immune to wall-clock jumps
+        self.last_snapshot_time = time.monotonic()
         self.is_recovering = False
 
         # Background tasks
         self._checkpoint_task: Optional[asyncio.Task] = None
         self._snapshot_task: Optional[asyncio.Task] = None
+        self._wal_flusher_task: Optional[asyncio.Task] = None
+
+        # Pending (operation_type, resource_id, data, future) appends; once
+        # closed, appends go to the WAL directly instead
+        self._wal_queue: asyncio.Queue = asyncio.Queue()
+        self._wal_queue_closed = False
+
+        # Wake the checkpoint and snapshot loops early; repeated signals
+        # coalesce, and the lock keeps at most one checkpoint in flight
+        self._ckpt_event = asyncio.Event()
+        self._snapshot_trigger = asyncio.Event()
+        self._ckpt_lock = asyncio.Lock()
 
     async def initialize(self) -> None:
         """Initialize persistence manager and recover state."""
@@ -58,6 +77,7 @@ class PersistenceManager:
             await self.wal.initialize()
 
         # Start background tasks
+        self._wal_flusher_task = asyncio.create_task(self._wal_flusher())
         self._checkpoint_task = asyncio.create_task(self._auto_checkpoint_loop())
         self._snapshot_task = asyncio.create_task(self._auto_snapshot_loop())
 
@@ -67,6 +87,13 @@ class PersistenceManager:
         """Shutdown persistence manager."""
         logger.info("Shutting down persistence manager")
 
+        # Let queued operations reach the WAL before stopping the flusher;
+        # nothing new is queued meanwhile
+        if self._wal_flusher_task:
+            self._wal_queue_closed = True
+            await self._wal_queue.join()
+            self._wal_flusher_task.cancel()
+
         # Cancel background tasks
         if self._checkpoint_task:
             self._checkpoint_task.cancel()
@@ -91,19 +118,32 @@ class PersistenceManager:
         if self.is_recovering:
             return -1
 
-        sequence = await self.wal.append(operation_type, resource_id, data)
+        if (self._wal_queue_closed or self._wal_flusher_task is None
+                or self._wal_flusher_task.done()):
+            sequence = await self.wal.append(operation_type, resource_id, data)
+        else:
+            # Group commit: the flusher writes everything queued meanwhile
+            # in one batch and resolves each caller with its sequence
+            future = asyncio.get_running_loop().create_future()
+            self._wal_queue.put_nowait((operation_type, resource_id, data, future))
+            sequence = await future
         self.operations_since_checkpoint += 1
 
-        # Check if we need to checkpoint
+        # Signal the checkpoint loop; repeated signals coalesce
         if self.operations_since_checkpoint >= self.auto_checkpoint_interval:
-            asyncio.create_task(self.create_checkpoint())
+            self._ckpt_event.set()
 
         return sequence
 
     async def create_checkpoint(self) -> int:
         """Create a WAL checkpoint."""
-        sequence = await self.wal.checkpoint()
-        self.operations_since_checkpoint = 0
+        async with self._ckpt_lock:
+            # Operations logged while the checkpoint is written stay counted
+            covered = self.operations_since_checkpoint
+            sequence = await self.wal.checkpoint()
+            self.operations_since_checkpoint = max(
+                self.operations_since_checkpoint - covered, 0
+            )
 
         logger.info(f"Checkpoint created at sequence {sequence}")
         return sequence
@@ -111,23 +151,38 @@ class PersistenceManager:
     async def create_snapshot(
         self,
         state: dict[str, Any],
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        base_snapshot_id: Optional[str] = None,
+        deleted_keys: Optional[list[str]] = None
     ) -> str:
-        """Create a snapshot of current state."""
+        """Create a snapshot of current state.
+
+        With ``base_snapshot_id``, ``state`` holds only the top-level keys
+        changed since that snapshot (and ``deleted_keys`` those removed), and
+        an incremental snapshot is written on top of it.
+        """
         # Get current WAL sequence
         current_sequence = await self.create_checkpoint()
 
-        # Serialize state
-        serialized_state = StateSerializer.serialize_state(state)
-
-        # Create snapshot
-        metadata = await self.snapshot_manager.create_snapshot(
-            sequence_number=current_sequence,
-            state={'serialized': serialized_state},
-            description=description
-        )
-
-        self.last_snapshot_time = datetime.now(UTC)  # Fixed deprecation
+        # Create snapshot; the snapshot manager serializes the state, keeping
+        # vector entries in their own file
+        if base_snapshot_id:
+            metadata = await self.snapshot_manager.create_incremental_snapshot(
+                base_id=base_snapshot_id,
+                sequence_number=current_sequence,
+                state_subset=state,
+                deleted_keys=deleted_keys,
+                description=description
+            )
+        else:
+            metadata = await self.snapshot_manager.create_snapshot(
+                sequence_number=current_sequence,
+                state=state,
+                description=description
+            )
+
+        self.last_snapshot_time = time.monotonic()
+        self._snapshot_trigger.set()
 
         # Cleanup old snapshots
         await self.snapshot_manager.cleanup_old_snapshots()
@@ -158,7 +213,7 @@ class PersistenceManager:
 
                 # Deserialize state
                 if 'serialized' in snapshot_data:
-                    # New format with serialized field
+                    # Snapshots written as a pre-serialized blob
                     state = StateSerializer.deserialize_state(
                         snapshot_data['serialized']
                     )
@@ -174,17 +229,23 @@ class PersistenceManager:
                 state = {'operations': []}
                 replay_from = 0
 
-            # Ensure operations list exists
-            if 'operations' not in state:
-                state['operations'] = []
-
             # Replay WAL entries
             entries = await self.wal.read(replay_from)
             logger.info(f"Replaying {len(entries)} WAL entries")
 
-            for entry in entries:
-                # Apply operation to state
-                await self._apply_wal_entry(state, entry)
+            # Record the operations in one bulk extend. Resource ids stay
+            # UUIDs and timestamps are integer microseconds since the epoch;
+            # formatting them for display is left to the consumer
+            state.setdefault('operations', []).extend(
+                {
+                    'sequence': entry.sequence_number,
+                    'type': entry.operation_type.value,
+                    'resource_id': entry.resource_id,
+                    'data': entry.data,
+                    'timestamp': int(entry.timestamp.timestamp() * 1_000_000)
+                }
+                for entry in entries
+            )
 
             logger.info("State recovery complete")
             return state
@@ -192,26 +253,19 @@ class PersistenceManager:
         finally:
             self.is_recovering = False
 
-    async def _apply_wal_entry(self, state: dict[str, Any], entry) -> None:
-        """Apply a WAL entry to the state."""
-        # This would be implemented based on your specific operations
-        # For now, we'll just store the operations
-        if 'operations' not in state:
-            state['operations'] = []
-
-        state['operations'].append({
-            'sequence': entry.sequence_number,
-            'type': entry.operation_type.value,
-            'resource_id': str(entry.resource_id),
-            'data': entry.data,
-            'timestamp': entry.timestamp.isoformat()
-        })
-
     async def _auto_checkpoint_loop(self) -> None:
-        """Background task for automatic checkpoints."""
+        """Background task for automatic checkpoints.
+
+        Runs as soon as ``log_operation`` crosses the checkpoint interval, and
+        at least once a minute while operations are pending.
+        """
         while True:
             try:
-                await asyncio.sleep(60)  # Check every minute
+                try:
+                    await asyncio.wait_for(self._ckpt_event.wait(), timeout=60)
+                except asyncio.TimeoutError:
+                    pass
+                self._ckpt_event.clear()
 
                 if self.operations_since_checkpoint > 0:
                     await self.create_checkpoint()
@@ -221,17 +275,75 @@ class PersistenceManager:
             except Exception as e:
                 logger.error(f"Error in checkpoint loop: {e}")
 
+    async def _wal_flusher(self) -> None:
+        """Background task that group-commits queued operations to the WAL."""
+        batch: list = []
+        while True:
+            try:
+                # Everything queued while the previous batch was being
+                # written goes out together in the next one
+                batch = [await self._wal_queue.get()]
+                while len(batch) < self.WAL_BATCH_SIZE and not self._wal_queue.empty():
+                    batch.append(self._wal_queue.get_nowait())
+
+                try:
+                    sequences = await self.wal.append_batch(
+                        [(op_type, rid, data) for op_type, rid, data, _ in batch]
+                    )
+                except Exception as e:
+                    for *_, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for (*_, future), sequence in zip(batch, sequences):
+                        if not future.done():
+                            future.set_result(sequence)
+                finally:
+                    for _ in batch:
+                        self._wal_queue.task_done()
+
+            except asyncio.CancelledError:
+                self._fail_pending_appends(batch)
+                break
+
+    def _fail_pending_appends(self, batch: list) -> None:
+        """Fail every append the stopped flusher will no longer write."""
+        self._wal_queue_closed = True
+        error = RuntimeError("WAL flusher stopped before the operation was written")
+        while not self._wal_queue.empty():
+            batch.append(self._wal_queue.get_nowait())
+            self._wal_queue.task_done()
+        for *_, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
     async def _auto_snapshot_loop(self) -> None:
-        """Background task for automatic snapshots."""
+        """Background task for automatic snapshots.
+
+        Sleeps until the snapshot interval is due, waking early when a
+        snapshot is taken so the deadline moves with it.
+        """
+        next_check = self.last_snapshot_time + self._auto_snapshot_seconds
         while True:
             try:
-                await asyncio.sleep(300)  # Check every 5 minutes
+                try:
+                    await asyncio.wait_for(
+                        self._snapshot_trigger.wait(),
+                        timeout=max(next_check - time.monotonic(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._snapshot_trigger.clear()
 
-                time_since_snapshot = datetime.now(UTC) - self.last_snapshot_time
-                if time_since_snapshot >= self.auto_snapshot_interval:
+                now = time.monotonic()
+                due = self.last_snapshot_time + self._auto_snapshot_seconds
+                if now >= due:
                     # This would need access to current state
                     # In real implementation, this would be passed in
                     logger.info("Auto-snapshot triggered (implementation needed)")
+                    next_check = now + self._auto_snapshot_seconds
+                else:
+                    next_check = due
 
             except asyncio.CancelledError:
                 break
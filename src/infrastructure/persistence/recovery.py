@@ -1,4 +1,6 @@
 """Recovery service for system state restoration with proper WAL replay."""
+import asyncio
+import time
 import uuid
 from datetime import datetime
 from typing import Any, Optional
@@ -6,6 +8,7 @@ from typing import Any, Optional
 from src.core.logging import get_logger
 from src.domain.entities.library import Library
 from src.infrastructure.persistence.manager import PersistenceManager
+from src.infrastructure.persistence.wal.interface import OperationType
 from src.infrastructure.repositories.persistent_library_repository import (
     PersistentLibraryRepository,
 )
@@ -34,42 +37,54 @@ class RecoveryService:
         if library_repository:
             self.repositories.append(('libraries', library_repository))
 
+        # WAL replay handlers keyed by operation type value
+        self._handlers = {
+            OperationType.CREATE_LIBRARY.value: self._replay_create_library,
+            OperationType.UPDATE_LIBRARY.value: self._replay_update_library,
+            OperationType.DELETE_LIBRARY.value: self._replay_delete_library,
+        }
+
     async def recover_system(self) -> dict[str, Any]:
         """Recover complete system state."""
-        start_time = datetime.utcnow()
+        start_time = time.perf_counter()
         logger.info("Starting system recovery")
 
         try:
             # Recover state from persistence
             state = await self.persistence_manager.recover_state()
 
-            # First restore from snapshot
+            # First restore from snapshot; repositories are independent, so
+            # they are restored concurrently
             recovery_stats = {}
 
-            for repo_name, repository in self.repositories:
-                if repo_name in state:
-                    logger.info(f"Restoring {repo_name} repository from snapshot")
-                    await repository.restore_state(state[repo_name])
-
-                    if hasattr(repository, 'count'):
-                        count = await repository.count()
-                        recovery_stats[f"{repo_name}_count"] = count
+            restored = [
+                (repo_name, repository) for repo_name, repository in self.repositories
+                if repo_name in state
+            ]
+            counts = await asyncio.gather(*(
+                self._restore_repository(repo_name, repository, state[repo_name])
+                for repo_name, repository in restored
+            ))
+            for (repo_name, _), count in zip(restored, counts):
+                if count is not None:
+                    recovery_stats[f"{repo_name}_count"] = count
 
             # Then replay WAL operations to apply changes after snapshot
             if 'operations' in state and state['operations']:
                 logger.info(f"Replaying {len(state['operations'])} WAL operations")
-
-                for operation in state['operations']:
-                    await self._replay_operation(operation)
+                await self._replay_batch(state['operations'])
 
             # Get final counts after WAL replay
-            for repo_name, repository in self.repositories:
-                if hasattr(repository, 'count'):
-                    count = await repository.count()
-                    recovery_stats[f"{repo_name}_count_after_wal"] = count
+            counted = [
+                (repo_name, repository) for repo_name, repository in self.repositories
+                if hasattr(repository, 'count')
+            ]
+            counts = await asyncio.gather(*(repository.count() for _, repository in counted))
+            for (repo_name, _), count in zip(counted, counts):
+                recovery_stats[f"{repo_name}_count_after_wal"] = count
 
             # Calculate recovery time
-            recovery_time = (datetime.utcnow() - start_time).total_seconds()
+            recovery_time = time.perf_counter() - start_time
 
             recovery_stats.update({
                 'recovery_time_seconds': recovery_time,
@@ -89,10 +104,38 @@ class RecoveryService:
             logger.error(f"Recovery failed: {e}")
             raise
 
-    async def _replay_operation(self, operation: dict[str, Any]) -> None:
-        """Replay a single WAL operation."""
-        op_type = operation['type']
-        resource_id = uuid.UUID(operation['resource_id'])
+    async def _restore_repository(
+        self,
+        repo_name: str,
+        repository: Any,
+        repo_state: Any
+    ) -> Optional[int]:
+        """Restore one repository from snapshot state and return its count."""
+        logger.info(f"Restoring {repo_name} repository from snapshot")
+        await repository.restore_state(repo_state)
+
+        if hasattr(repository, 'count'):
+            return await repository.count()
+        return None
+
+    async def _replay_batch(self, operations: list[dict[str, Any]]) -> None:
+        """Replay WAL operations under a single acquisition of the repository lock."""
+        if not self.library_repository:
+            return
+
+        async with self.library_repository._lock:
+            for operation in operations:
+                self._replay_operation(operation)
+
+    def _replay_operation(self, operation: dict[str, Any]) -> None:
+        """Replay a single WAL operation (assumes the repository lock is held)."""
+        handler = self._handlers.get(operation['type'])
+        if handler is None:
+            return
+
+        resource_id = operation['resource_id']
+        if not isinstance(resource_id, uuid.UUID):
+            resource_id = uuid.UUID(resource_id)
         data = operation['data']
 
         # Handle encoded entity format from MessagePackSerializer
@@ -102,51 +145,57 @@ class RecoveryService:
         else:
             actual_data = data
 
-        if op_type == 'CREATE_LIBRARY' and self.library_repository:
-            # Ensure ID is set
-            if 'id' not in actual_data:
-                actual_data['id'] = str(resource_id)
-
-            # Check if library already exists (from snapshot)
-            existing = await self.library_repository.get(resource_id)
-            if not existing:
-                library = Library(**actual_data)
-                # Directly add to repository without logging again
-                async with self.library_repository._lock:
-                    self.library_repository._libraries[library.id] = library
-                    self.library_repository._name_index[library.name] = library.id
-                logger.debug(f"Replayed CREATE_LIBRARY for {resource_id}")
-
-        elif op_type == 'UPDATE_LIBRARY' and self.library_repository:
-            # Apply update to existing library
-            library = await self.library_repository.get(resource_id)
-            if library:
-                # Update library fields from data
-                for key, value in actual_data.items():
-                    if hasattr(library, key):
-                        setattr(library, key, value)
-                logger.debug(f"Replayed UPDATE_LIBRARY for {resource_id}")
-
-        elif op_type == 'DELETE_LIBRARY' and self.library_repository:
-            # Remove library
-            async with self.library_repository._lock:
-                if resource_id in self.library_repository._libraries:
-                    library = self.library_repository._libraries[resource_id]
-                    del self.library_repository._libraries[resource_id]
-                    if library.name in self.library_repository._name_index:
-                        del self.library_repository._name_index[library.name]
-                logger.debug(f"Replayed DELETE_LIBRARY for {resource_id}")
+        handler(resource_id, actual_data)
+
+    def _replay_create_library(self, resource_id: uuid.UUID, data: dict[str, Any]) -> None:
+        """Replay a CREATE_LIBRARY operation."""
+        libraries = self.library_repository._libraries
+
+        # Ensure ID is set
+        if 'id' not in data:
+            data['id'] = str(resource_id)
+
+        # Check if library already exists (from snapshot)
+        if resource_id not in libraries:
+            library = Library(**data)
+            # Directly add to repository without logging again
+            libraries[library.id] = library
+            self.library_repository._name_index[library.name] = library.id
+            logger.debug(f"Replayed CREATE_LIBRARY for {resource_id}")
+
+    def _replay_update_library(self, resource_id: uuid.UUID, data: dict[str, Any]) -> None:
+        """Replay an UPDATE_LIBRARY operation."""
+        libraries = self.library_repository._libraries
+        library = libraries.get(resource_id)
+        if library:
+            # Update library fields from data, on a new instance (libraries
+            # are frozen)
+            libraries[resource_id] = library.model_copy(update={
+                key: value for key, value in data.items() if hasattr(library, key)
+            })
+            logger.debug(f"Replayed UPDATE_LIBRARY for {resource_id}")
+
+    def _replay_delete_library(self, resource_id: uuid.UUID, data: dict[str, Any]) -> None:
+        """Replay a DELETE_LIBRARY operation."""
+        name_index = self.library_repository._name_index
+        library = self.library_repository._libraries.pop(resource_id, None)
+        if library is not None and library.name in name_index:
+            del name_index[library.name]
+        logger.debug(f"Replayed DELETE_LIBRARY for {resource_id}")
 
     async def create_backup(self, description: Optional[str] = None) -> str:
         """Create a system backup."""
         logger.info("Creating system backup")
 
-        # Collect state from all repositories
-        state = {}
-
-        for repo_name, repository in self.repositories:
-            if hasattr(repository, 'get_state'):
-                state[repo_name] = await repository.get_state()
+        # Collect state from all repositories concurrently
+        with_state = [
+            (repo_name, repository) for repo_name, repository in self.repositories
+            if hasattr(repository, 'get_state')
+        ]
+        repo_states = await asyncio.gather(*(
+            repository.get_state() for _, repository in with_state
+        ))
+        state = {repo_name: repo_state for (repo_name, _), repo_state in zip(with_state, repo_states)}
 
         # Create snapshot
         snapshot_id = await self.persistence_manager.create_snapshot(
@@ -157,6 +206,18 @@ class RecoveryService:
         logger.info(f"Backup created: {snapshot_id}")
         return snapshot_id
 
+    async def _check_repository(self, repository: Any) -> tuple[Optional[list], Optional[int]]:
+        """Return a repository's consistency issues and entity count."""
+        repo_issues = None
+        if hasattr(repository, 'verify_consistency'):
+            repo_issues = await repository.verify_consistency()
+
+        count = None
+        if hasattr(repository, 'count'):
+            count = await repository.count()
+
+        return repo_issues, count
+
     async def verify_consistency(self) -> dict[str, Any]:
         """Verify system consistency."""
         logger.info("Verifying system consistency")
@@ -164,15 +225,15 @@ class RecoveryService:
         issues = []
         stats = {}
 
-        # Check each repository
-        for repo_name, repository in self.repositories:
-            if hasattr(repository, 'verify_consistency'):
-                repo_issues = await repository.verify_consistency()
-                if repo_issues:
-                    issues.extend(repo_issues)
-
-            if hasattr(repository, 'count'):
-                stats[f"{repo_name}_count"] = await repository.count()
+        # Check each repository concurrently
+        reports = await asyncio.gather(*(
+            self._check_repository(repository) for _, repository in self.repositories
+        ))
+        for (repo_name, _), (repo_issues, count) in zip(self.repositories, reports):
+            if repo_issues:
+                issues.extend(repo_issues)
+            if count is not None:
+                stats[f"{repo_name}_count"] = count
 
         # Check WAL status
         wal_status = {
@@ -1,8 +1,10 @@
 """Serialization utilities for various data types."""
+import base64
 import json
+import sys
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
 from uuid import UUID
 
 import msgpack
@@ -24,24 +26,107 @@ class ExtendedJSONEncoder(json.JSONEncoder):
         elif isinstance(obj, Enum):
             return obj.value
         elif isinstance(obj, np.ndarray):
-            return obj.tolist()
+            if obj.dtype.hasobject:
+                return obj.tolist()
+            obj = np.ascontiguousarray(obj)
+            return {
+                '__ndarray__': True,
+                'data': base64.b64encode(obj).decode('ascii'),
+                'dtype': obj.dtype.str,
+                'shape': obj.shape
+            }
         elif hasattr(obj, '__dict__'):
-            return obj.__dict__
+            return {k: v for k, v in obj.__dict__.items() if not k.startswith('_')}
         return super().default(obj)
 
+    @staticmethod
+    def object_hook(obj: dict) -> Any:
+        """``json.loads`` hook restoring arrays written by this encoder."""
+        if '__ndarray__' in obj:
+            return np.frombuffer(
+                base64.b64decode(obj['data']), dtype=np.dtype(obj['dtype'])
+            ).reshape(obj['shape'])
+        return obj
+
 
 class MessagePackSerializer:
     """MessagePack serializer with custom type support."""
 
+    # Idle packers are pooled rather than built per call. A packer keeps
+    # its internal buffer at the largest size it has produced, so one that
+    # encoded more than this is dropped instead of pooled
+    MAX_POOLED_BUFFER = 1024 * 1024
+    MAX_POOLED_PACKERS = 16
+    # list.pop/append are atomic, so the pool needs no lock
+    _packer_pool: list[msgpack.Packer] = []
+
+    # Entity reconstruction by encoded class name. Pydantic entities skip
+    # validation: they were validated when created and are restored verbatim
+    # (validators would also reset fields such as ``updated_at``)
+    _ENTITY_FACTORIES = {
+        # str-valued enums such as IndexType are packed as plain strings
+        'Library': lambda data: Library.model_construct(
+            **{**data, 'index_type': IndexType(data.get('index_type', IndexType.HNSW))}
+        ),
+        'Document': lambda data: Document.model_construct(**data),
+        'Chunk': lambda data: Chunk(**data),
+    }
+
     @staticmethod
     def encode(obj: Any) -> bytes:
         """Encode object to MessagePack bytes."""
-        return msgpack.packb(obj, default=MessagePackSerializer._encode_custom, use_bin_type=True)
+        pool = MessagePackSerializer._packer_pool
+        try:
+            packer = pool.pop()
+        except IndexError:
+            packer = MessagePackSerializer.packer()
+
+        # autoreset clears the packer after each pack (and after a failed one)
+        data = packer.pack(obj)
+
+        if (len(data) <= MessagePackSerializer.MAX_POOLED_BUFFER
+                and len(pool) < MessagePackSerializer.MAX_POOLED_PACKERS):
+            pool.append(packer)
+        return data
+
+    @staticmethod
+    def packer(autoreset: bool = True) -> msgpack.Packer:
+        """Return a new packer encoding like ``encode``.
+
+        With ``autoreset=False`` output accumulates in the packer until
+        ``reset``, readable through ``getbuffer`` without a copy to bytes.
+        """
+        return msgpack.Packer(
+            default=MessagePackSerializer._encode_custom,
+            use_bin_type=True,
+            autoreset=autoreset
+        )
 
     @staticmethod
-    def decode(data: bytes) -> Any:
-        """Decode MessagePack bytes to object."""
-        return msgpack.unpackb(data, object_hook=MessagePackSerializer._decode_custom, raw=False)
+    def decode(data: bytes, restore_entities: bool = True) -> Any:
+        """Decode MessagePack bytes (or any buffer, e.g. an mmap) to object.
+
+        With ``restore_entities=False`` entity records are left as the
+        ``__entity__`` dicts they were encoded as (other types still decode).
+        """
+        object_hook = (
+            MessagePackSerializer._decode_custom if restore_entities
+            else MessagePackSerializer._decode_value
+        )
+        return msgpack.unpackb(data, object_hook=object_hook, raw=False)
+
+    @staticmethod
+    def streaming_decoder() -> msgpack.Unpacker:
+        """Return an unpacker to ``feed`` chunk by chunk, decoding like ``decode``.
+
+        Fed chunks are consumed into the unpacker's own buffer, so a payload
+        produced in pieces never has to be joined into one copy first.
+        """
+        return msgpack.Unpacker(
+            object_hook=MessagePackSerializer._decode_custom,
+            raw=False,
+            max_buffer_size=sys.maxsize
+        )
 
     @staticmethod
     def _encode_custom(obj):
@@ -51,10 +136,14 @@ class MessagePackSerializer:
         elif isinstance(obj, UUID):
             return {'__uuid__': True, 'data': str(obj)}
         elif isinstance(obj, np.ndarray):
+            if obj.dtype.hasobject:
+                return obj.tolist()
+            # Raw buffer bytes: one memcpy instead of a Python object per element
+            obj = np.ascontiguousarray(obj)
             return {
                 '__ndarray__': True,
-                'data': obj.tolist(),
-                'dtype': str(obj.dtype),
+                'data': obj.tobytes(),
+                'dtype': obj.dtype.str,
                 'shape': obj.shape
             }
         elif isinstance(obj, Enum):
@@ -63,10 +152,18 @@ class MessagePackSerializer:
             return {
                 '__entity__': True,
                 'class': obj.__class__.__name__,
-                'data': obj.__dict__
+                # Private attributes are caches, not state
+                'data': {k: v for k, v in obj.__dict__.items() if not k.startswith('_')}
             }
         return obj
 
+    @staticmethod
+    def _decode_value(obj):
+        """Decode custom types, except entities, from MessagePack."""
+        if '__entity__' in obj:
+            return obj
+        return MessagePackSerializer._decode_custom(obj)
+
     @staticmethod
     def _decode_custom(obj):
         """Decode custom types from MessagePack."""
@@ -75,72 +172,231 @@ class MessagePackSerializer:
         elif '__uuid__' in obj:
             return UUID(obj['data'])
         elif '__ndarray__' in obj:
-            return np.array(obj['data'], dtype=obj['dtype']).reshape(obj['shape'])
+            if isinstance(obj['data'], list):
+                # Element-list encoding written by older versions
+                return np.array(obj['data'], dtype=obj['dtype']).reshape(obj['shape'])
+            # Read-only view over the decoded payload
+            return np.frombuffer(obj['data'], dtype=np.dtype(obj['dtype'])).reshape(obj['shape'])
         elif '__enum__' in obj:
             # Simple mapping for IndexType
             if obj['class'] == 'IndexType':
                 return IndexType(obj['value'])
             return obj['value']
         elif '__entity__' in obj:
-            # Entity reconstruction would need proper factory
-            # For now, return the data dict
-            return obj['data']
+            factory = MessagePackSerializer._ENTITY_FACTORIES.get(obj['class'])
+            if factory is None:
+                return obj['data']
+            return factory(obj['data'])
         return obj
 
 
 class VectorSerializer:
-    """Specialized serializer for vector embeddings."""
+    """Specialized serializer for vector embeddings.
+
+    Float32 blobs are an int32 ``(count, dim)`` header followed by the rows.
+    Quantized blobs start with a negative int32 tag (see ``QUANTIZATION_TAGS``)
+    ahead of the same header; int8 rows are preceded by one float32 scale per
+    row. Vectors are given as a list of rows or a 2-D array, and always come
+    back as a float32 ``(count, dim)`` matrix.
+    """
+
+    QUANTIZATION_TAGS = {'fp16': -1, 'int8': -2}
 
     @staticmethod
-    def serialize_vectors(vectors: list[np.ndarray]) -> bytes:
+    def serialize_vectors(
+        vectors: list[np.ndarray] | np.ndarray,
+        quantization: Optional[str] = None
+    ) -> bytes:
         """Serialize multiple vectors efficiently."""
-        if not vectors:
-            return b''
+        return bytes(VectorSerializer.serialize_vectors_buffer(vectors, quantization))
 
-        # Assume all vectors have same dimension
-        dim = vectors[0].shape[0]
-        num_vectors = len(vectors)
-
-        # Stack vectors into single array
-        stacked = np.vstack(vectors).astype(np.float32)
+    @staticmethod
+    def serialize_vectors_buffer(
+        vectors: list[np.ndarray] | np.ndarray,
+        quantization: Optional[str] = None
+    ) -> memoryview:
+        """Serialize vectors into a byte view over a freshly built buffer.
+
+        Same layout as ``serialize_vectors`` but without the final copy out,
+        for callers such as msgpack that accept any buffer.
+        """
+        if isinstance(vectors, np.ndarray) and vectors.ndim == 2:
+            # A matrix carries its dimension even without rows
+            num_vectors, dim = vectors.shape
+        elif len(vectors):
+            # Assume all vectors have same dimension
+            num_vectors, dim = len(vectors), vectors[0].shape[0]
+        else:
+            return memoryview(b'')
+        if quantization is not None and num_vectors:
+            return VectorSerializer._serialize_quantized(vectors, quantization)
+
+        # One float32 buffer laid out as header + rows, so the vectors are
+        # cast and stacked in a single pass and the result is handed out as is
+        out = np.empty(2 + num_vectors * dim, dtype=np.float32)
 
         # Create header: num_vectors (4 bytes) + dimension (4 bytes)
-        header = np.array([num_vectors, dim], dtype=np.int32)
+        out[:2].view(np.int32)[:] = (num_vectors, dim)
+
+        # Stack vectors straight into the payload area
+        payload = out[2:].reshape(num_vectors, dim)
+        if isinstance(vectors, np.ndarray):
+            np.copyto(payload, vectors, casting='unsafe')
+        else:
+            np.stack(vectors, out=payload, casting='unsafe')
 
-        # Concatenate header and data
-        return header.tobytes() + stacked.tobytes()
+        return out.view(np.uint8).data
 
     @staticmethod
-    def deserialize_vectors(data: bytes) -> list[np.ndarray]:
-        """Deserialize vectors from bytes."""
+    def _serialize_quantized(
+        vectors: list[np.ndarray] | np.ndarray,
+        quantization: str
+    ) -> memoryview:
+        """Serialize vectors as float16 or per-row scaled int8."""
+        if quantization not in VectorSerializer.QUANTIZATION_TAGS:
+            raise ValueError(f"Unknown vector quantization: {quantization}")
+
+        dim = vectors[0].shape[0]
+        num_vectors = len(vectors)
+        header = np.array(
+            [VectorSerializer.QUANTIZATION_TAGS[quantization], num_vectors, dim], dtype=np.int32
+        )
+
+        if quantization == 'fp16':
+            out = np.empty(6 + num_vectors * dim, dtype=np.float16)
+            out[:6].view(np.int32)[:] = header
+            np.copyto(out[6:].reshape(num_vectors, dim), np.asarray(vectors), casting='unsafe')
+            return out.view(np.uint8).data
+
+        stacked = np.asarray(vectors, dtype=np.float32)
+        scales = np.abs(stacked).max(axis=1) / 127
+        scales[scales == 0] = 1  # All-zero rows
+
+        out = np.empty(12 + 4 * num_vectors + num_vectors * dim, dtype=np.uint8)
+        out[:12] = header.view(np.uint8)
+        out[12:12 + 4 * num_vectors] = scales.astype(np.float32).view(np.uint8)
+        np.rint(
+            stacked / scales[:, None],
+            out=out[12 + 4 * num_vectors:].view(np.int8).reshape(num_vectors, dim),
+            casting='unsafe'
+        )
+        return out.data
+
+    @staticmethod
+    def deserialize_vectors(data: bytes) -> np.ndarray | list[np.ndarray]:
+        """Deserialize vectors from bytes into a ``(count, dim)`` matrix.
+
+        An empty blob (no vectors, dimension unknown) gives an empty list.
+        """
         if not data:
             return []
 
         # Read header
-        header = np.frombuffer(data[:8], dtype=np.int32)
-        num_vectors, dim = header
+        tag = int(np.frombuffer(data, dtype=np.int32, count=1)[0])
+        if tag < 0:
+            return VectorSerializer._deserialize_quantized(data, tag)
+        num_vectors, dim = np.frombuffer(data, dtype=np.int32, count=2)
+
+        # Read vectors as a view over the payload, without slicing a copy
+        return np.frombuffer(
+            data, dtype=np.float32, count=num_vectors * dim, offset=8
+        ).reshape((num_vectors, dim))
+
+    @staticmethod
+    def deserialize_vectors_as_list(data: bytes) -> list[np.ndarray]:
+        """Deserialize vectors from bytes as a list of row views."""
+        return list(VectorSerializer.deserialize_vectors(data))
+
+    @staticmethod
+    def shuffle_bytes(data, itemsize: int = 4) -> np.ndarray:
+        """Regroup bytes by position within each ``itemsize`` item (byte planes).
+
+        The high bytes of neighbouring floats (sign, exponent) are highly
+        correlated; laid out contiguously they compress far better. Trailing
+        bytes that do not fill an item are kept in place.
+        """
+        raw = np.frombuffer(data, dtype=np.uint8)
+        whole = len(raw) // itemsize * itemsize
+        out = np.empty_like(raw)
+        out[:whole].reshape(itemsize, -1)[:] = raw[:whole].reshape(-1, itemsize).T
+        out[whole:] = raw[whole:]
+        return out
 
-        # Read vectors
-        vectors_data = np.frombuffer(data[8:], dtype=np.float32)
-        vectors_array = vectors_data.reshape((num_vectors, dim))
+    @staticmethod
+    def unshuffle_bytes(data, itemsize: int = 4) -> np.ndarray:
+        """Invert ``shuffle_bytes``."""
+        raw = np.frombuffer(data, dtype=np.uint8)
+        whole = len(raw) // itemsize * itemsize
+        out = np.empty_like(raw)
+        out[:whole].reshape(-1, itemsize)[:] = raw[:whole].reshape(itemsize, -1).T
+        out[whole:] = raw[whole:]
+        return out
 
-        # Convert to list of arrays
-        return [vectors_array[i] for i in range(num_vectors)]
+    @staticmethod
+    def _deserialize_quantized(data: bytes, tag: int) -> np.ndarray:
+        """Decode a float16 or int8 blob back to float32 vectors."""
+        num_vectors, dim = (int(v) for v in np.frombuffer(data, dtype=np.int32, count=2, offset=4))
+
+        if tag == VectorSerializer.QUANTIZATION_TAGS['fp16']:
+            vectors_array = np.frombuffer(
+                data, dtype=np.float16, count=num_vectors * dim, offset=12
+            ).reshape((num_vectors, dim)).astype(np.float32)
+        elif tag == VectorSerializer.QUANTIZATION_TAGS['int8']:
+            scales = np.frombuffer(data, dtype=np.float32, count=num_vectors, offset=12)
+            quantized = np.frombuffer(
+                data, dtype=np.int8, count=num_vectors * dim, offset=12 + 4 * num_vectors
+            ).reshape((num_vectors, dim))
+            vectors_array = quantized * scales[:, None]
+        else:
+            raise ValueError(f"Unknown vector encoding tag: {tag}")
+
+        return vectors_array
 
 
 class StateSerializer:
     """Serializer for complete system state."""
 
     @staticmethod
-    def serialize_state(state: dict[str, Any]) -> bytes:
-        """Serialize complete system state."""
+    def serialize_state(state: dict[str, Any], quantization: Optional[str] = None) -> bytes:
+        """Serialize complete system state.
+
+        ``quantization`` ("fp16" or "int8") stores the ``*_vectors`` entries
+        lossily to shrink the output; they still load as float32.
+        """
+        other_data, serialized_vectors = StateSerializer._split_state(state, quantization)
+
+        # Combine everything; vector blobs travel as msgpack binary
+        return StateSerializer._encode_complete_state(other_data, serialized_vectors)
+
+    @staticmethod
+    def serialize_state_parts(
+        state: dict[str, Any],
+        quantization: Optional[str] = None
+    ) -> tuple[bytes, dict[str, memoryview]]:
+        """Serialize the state without its vectors, and each vector entry as a blob.
+
+        Lets callers store the bulky ``*_vectors`` entries apart from the
+        rest of the state; ``deserialize_state`` of the first part plus
+        ``VectorSerializer.deserialize_vectors`` of each blob rebuilds it.
+        """
+        other_data, serialized_vectors = StateSerializer._split_state(state, quantization)
+        return StateSerializer._encode_complete_state(other_data, {}), serialized_vectors
+
+    @staticmethod
+    def _split_state(
+        state: dict[str, Any],
+        quantization: Optional[str]
+    ) -> tuple[dict[str, Any], dict[str, memoryview]]:
+        """Separate the ``*_vectors`` entries, serialized, from the rest of the state."""
         # Separate vectors from other data
         vectors_data = {}
         other_data = {}
 
         for key, value in state.items():
-            if key.endswith('_vectors') and isinstance(value, list):
-                # Assume it's a list of vectors
+            if key.endswith('_vectors') and (
+                isinstance(value, list) or (isinstance(value, np.ndarray) and value.ndim == 2)
+            ):
+                # Assume it's a list (or matrix) of vectors
                 vectors_data[key] = value
             else:
                 other_data[key] = value
@@ -148,16 +404,20 @@ class StateSerializer:
         # Serialize vectors separately for efficiency
         serialized_vectors = {}
         for key, vectors in vectors_data.items():
-            if vectors and isinstance(vectors[0], np.ndarray):
-                serialized_vectors[key] = VectorSerializer.serialize_vectors(vectors)
+            if isinstance(vectors, np.ndarray) or (len(vectors) and isinstance(vectors[0], np.ndarray)):
+                serialized_vectors[key] = VectorSerializer.serialize_vectors_buffer(vectors, quantization)
             else:
-                serialized_vectors[key] = b''
+                serialized_vectors[key] = memoryview(b'')
+
+        return other_data, serialized_vectors
 
-        # Combine everything
+    @staticmethod
+    def _encode_complete_state(other_data: dict[str, Any], serialized_vectors: dict[str, Any]) -> bytes:
+        """Encode the versioned state envelope."""
         complete_state = {
             'data': other_data,
-            'vectors': {k: v.hex() for k, v in serialized_vectors.items()},
-            'version': '1.0'
+            'vectors': serialized_vectors,
+            'version': '1.1'
         }
 
         return MessagePackSerializer.encode(complete_state)
@@ -165,9 +425,12 @@ class StateSerializer:
     @staticmethod
     def deserialize_state(data: bytes) -> dict[str, Any]:
         """Deserialize complete system state."""
-        complete_state = MessagePackSerializer.decode(data)
+        return StateSerializer.restore_state(MessagePackSerializer.decode(data))
 
-        if 'version' not in complete_state:
+    @staticmethod
+    def restore_state(complete_state: dict[str, Any]) -> dict[str, Any]:
+        """Rebuild the state from an already decoded ``serialize_state`` payload."""
+        if not isinstance(complete_state, dict) or 'version' not in complete_state:
             raise ValueError("Invalid state format: missing version")
 
         # Restore other data
@@ -175,11 +438,10 @@ class StateSerializer:
 
         # Restore vectors
         if 'vectors' in complete_state:
-            for key, hex_data in complete_state['vectors'].items():
-                if hex_data:
-                    vector_bytes = bytes.fromhex(hex_data)
-                    state[key] = VectorSerializer.deserialize_vectors(vector_bytes)
-                else:
-                    state[key] = []
+            for key, vector_bytes in complete_state['vectors'].items():
+                if isinstance(vector_bytes, str):
+                    # Hex-encoded blobs written by version 1.0
+                    vector_bytes = bytes.fromhex(vector_bytes)
+                state[key] = VectorSerializer.deserialize_vectors(vector_bytes)
 
         return state
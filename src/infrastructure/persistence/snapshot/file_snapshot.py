@@ -1,18 +1,28 @@
 """File-based snapshot implementation."""
-import gzip
+import asyncio
+import bisect
 import hashlib
+import itertools
 import json
-import uuid
+import mmap
+import os
+import zlib
 from asyncio import Lock
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, ClassVar, Optional
 
 import aiofiles
 import msgpack
+import numpy as np
 
 from src.core.logging import get_logger
-from src.infrastructure.persistence.serialization.serializers import StateSerializer
+from src.infrastructure.persistence.serialization.serializers import (
+    MessagePackSerializer,
+    StateSerializer,
+    VectorSerializer,
+)
 
 from .interface import ISnapshotManager, SnapshotMetadata
 
@@ -22,22 +32,56 @@ logger = get_logger(__name__)
 class FileSnapshotManager(ISnapshotManager):
     """File-based snapshot manager with compression."""
 
-    def __init__(self, snapshot_directory: Path, use_compression: bool = True):
+    # Bytes processed per step when compressing/decompressing snapshots
+    WRITE_CHUNK_SIZE = 1024 * 1024
+
+    # Uncompressed bytes per independent gzip member; members are compressed
+    # in parallel and concatenated, which is still a valid gzip stream
+    COMPRESS_FRAME_SIZE = 4 * 1024 * 1024
+    COMPRESS_LEVEL = 6
+
+    # Vector entries go to a sibling "<id>.vec" file: magic, little-endian
+    # uint32 header length, msgpack header listing the frames, then one
+    # independently decodable frame per entry (byte-shuffled and deflated
+    # at a fast level when compression is on, raw otherwise)
+    VECTOR_FILE_MAGIC = b'VVEC'
+    VECTOR_COMPRESS_LEVEL = 1
+
+    # Thread pool shared by all snapshot managers for compression (zlib
+    # releases the GIL, so frames compress on all cores)
+    _compress_executor: ClassVar[Optional[ThreadPoolExecutor]] = None
+
+    def __init__(
+        self,
+        snapshot_directory: Path,
+        use_compression: bool = True,
+        vector_quantization: Optional[str] = None
+    ):
         """Initialize snapshot manager.
 
         Args:
             snapshot_directory: Directory to store snapshots
             use_compression: Whether to compress snapshots
+            vector_quantization: Lossy encoding for vector entries ("fp16" or "int8")
         """
         self.snapshot_directory = Path(snapshot_directory)
         self.use_compression = use_compression
+        self.vector_quantization = vector_quantization
         self.write_lock = Lock()
 
         # Create directory if it doesn't exist
         self.snapshot_directory.mkdir(parents=True, exist_ok=True)
 
-        # Metadata cache
+        # Metadata of all snapshots, persisted as a single index file and
+        # mirrored in memory
+        self._index_path = self.snapshot_directory / "index.msgpack"
         self._metadata_cache: Optional[list[SnapshotMetadata]] = None
+        self._metadata_by_id: dict[str, SnapshotMetadata] = {}
+
+        # Snapshot id suffixes: a per-manager random prefix drawn once, so
+        # ids stay unique across restarts, plus a cheap in-process counter
+        self._id_prefix = os.urandom(4).hex()
+        self._id_counter = itertools.count()
 
     async def create_snapshot(
         self,
@@ -47,71 +91,289 @@ class FileSnapshotManager(ISnapshotManager):
     ) -> SnapshotMetadata:
         """Create a new snapshot."""
         async with self.write_lock:
-            snapshot_id = f"snapshot_{sequence_number}_{uuid.uuid4().hex[:8]}"
-            timestamp = datetime.now(UTC)  # Fixed deprecation warning
+            snapshot_id = f"snapshot_{sequence_number}_{self._next_id_suffix()}"
+            return await self._write_snapshot(
+                snapshot_id, sequence_number, state, description
+            )
 
-            # Serialize state using StateSerializer for proper handling of numpy arrays
-            try:
-                # If state contains serialized data already, use it directly
-                if 'serialized' in state and isinstance(state['serialized'], bytes):
-                    serialized = state['serialized']
-                else:
-                    # Otherwise, serialize the state
-                    serialized = StateSerializer.serialize_state(state)
-            except Exception:
-                # Fallback to msgpack if StateSerializer fails
-                serialized = msgpack.packb(state, use_bin_type=True)
-
-            # Compress if enabled
+    async def create_incremental_snapshot(
+        self,
+        base_id: str,
+        sequence_number: int,
+        state_subset: dict[str, Any],
+        deleted_keys: Optional[list[str]] = None,
+        description: Optional[str] = None
+    ) -> SnapshotMetadata:
+        """Create a delta snapshot holding only the state keys changed since ``base_id``.
+
+        Loading the delta loads its parent chain first, then drops
+        ``deleted_keys`` and applies ``state_subset`` key by key, so the
+        written size is proportional to the change rather than the state.
+        """
+        await self._get_metadata(base_id)  # The parent must exist
+
+        async with self.write_lock:
+            snapshot_id = f"{base_id}_inc_{sequence_number}_{self._next_id_suffix()}"
+            return await self._write_snapshot(
+                snapshot_id,
+                sequence_number,
+                state_subset,
+                description,
+                parent_id=base_id,
+                deleted_keys=list(deleted_keys or [])
+            )
+
+    def _next_id_suffix(self) -> str:
+        """Return a suffix that disambiguates snapshots sharing a sequence number."""
+        return f"{self._id_prefix}{next(self._id_counter):x}"
+
+    async def _write_snapshot(
+        self,
+        snapshot_id: str,
+        sequence_number: int,
+        state: dict[str, Any],
+        description: Optional[str],
+        parent_id: Optional[str] = None,
+        deleted_keys: Optional[list[str]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> SnapshotMetadata:
+        """Serialize and write a snapshot and its metadata (write lock held)."""
+        timestamp = timestamp or datetime.now(UTC)  # Fixed deprecation warning
+
+        # Serialize state using StateSerializer for proper handling of numpy arrays
+        vector_blobs: dict[str, memoryview] = {}
+        try:
+            # If state contains serialized data already, use it directly
+            if 'serialized' in state and isinstance(state['serialized'], bytes):
+                serialized = state['serialized']
+            else:
+                # Otherwise, serialize the state, vectors kept apart
+                serialized, vector_blobs = StateSerializer.serialize_state_parts(
+                    state, self.vector_quantization
+                )
+        except Exception:
+            # Fallback to msgpack if StateSerializer fails
+            serialized = msgpack.packb(state, use_bin_type=True)
+
+        # Compress (if enabled), hash and write frame by frame, so no full
+        # compressed copy of the state is ever held in memory
+        if self.use_compression:
+            snapshot_file = self.snapshot_directory / f"{snapshot_id}.msgpack.gz"
+            frame_size = self.COMPRESS_FRAME_SIZE
+        else:
+            snapshot_file = self.snapshot_directory / f"{snapshot_id}.msgpack"
+            frame_size = self.WRITE_CHUNK_SIZE
+
+        hasher = hashlib.sha256()
+        size_bytes = 0
+        view = memoryview(serialized)
+        frames = [view[start:start + frame_size] for start in range(0, len(view), frame_size)]
+
+        # Write beside the final name and rename, so rewriting a snapshot in
+        # place (compaction) never leaves a half-written file under its id
+        temp_file = snapshot_file.with_name(snapshot_file.name + '.tmp')
+        async with aiofiles.open(temp_file, 'wb') as f:
             if self.use_compression:
-                serialized = gzip.compress(serialized, compresslevel=6)
-                snapshot_file = self.snapshot_directory / f"{snapshot_id}.msgpack.gz"
+                # Keep one frame in flight per worker, written back in order
+                loop = asyncio.get_running_loop()
+                executor = self._get_compress_executor()
+                window = os.cpu_count() or 1
+                for start in range(0, max(len(frames), 1), window):
+                    batch = frames[start:start + window] or [b'']
+                    chunks = await asyncio.gather(*(
+                        loop.run_in_executor(executor, self._compress_frame, frame)
+                        for frame in batch
+                    ))
+                    for chunk in chunks:
+                        hasher.update(chunk)
+                        size_bytes += len(chunk)
+                        await f.write(chunk)
             else:
-                snapshot_file = self.snapshot_directory / f"{snapshot_id}.msgpack"
-
-            # Calculate checksum
-            checksum = hashlib.sha256(serialized).hexdigest()
-
-            # Write snapshot
-            async with aiofiles.open(snapshot_file, 'wb') as f:
-                await f.write(serialized)
-
-            # Create metadata
-            metadata = SnapshotMetadata(
-                snapshot_id=snapshot_id,
-                sequence_number=sequence_number,
-                timestamp=timestamp,
-                size_bytes=len(serialized),
-                checksum=checksum,
-                description=description
-            )
+                for chunk in frames:
+                    hasher.update(chunk)
+                    size_bytes += len(chunk)
+                    await f.write(chunk)
+
+        os.replace(temp_file, snapshot_file)
+        checksum = hasher.hexdigest()
+
+        vector_file = self.snapshot_directory / f"{snapshot_id}.vec"
+        vectors_checksum = None
+        if vector_blobs:
+            vectors_checksum, vector_bytes = await self._write_vector_file(vector_file, vector_blobs)
+            size_bytes += vector_bytes
+        elif vector_file.exists():
+            # Rewritten in place without vectors
+            vector_file.unlink()
+
+        # Create metadata
+        metadata = SnapshotMetadata(
+            snapshot_id=snapshot_id,
+            sequence_number=sequence_number,
+            timestamp=timestamp,
+            size_bytes=size_bytes,
+            checksum=checksum,
+            description=description,
+            parent_id=parent_id,
+            deleted_keys=list(deleted_keys or []),
+            vectors_checksum=vectors_checksum
+        )
 
-            # Write metadata
-            metadata_file = self.snapshot_directory / f"{snapshot_id}.meta"
-            async with aiofiles.open(metadata_file, 'w') as f:
-                await f.write(json.dumps({
-                    "snapshot_id": metadata.snapshot_id,
-                    "sequence_number": metadata.sequence_number,
-                    "timestamp": metadata.timestamp.isoformat(),
-                    "size_bytes": metadata.size_bytes,
-                    "checksum": metadata.checksum,
-                    "description": metadata.description
-                }, indent=2))
-
-            # Invalidate cache
-            self._metadata_cache = None
-
-            logger.info(
-                "Snapshot created",
-                snapshot_id=snapshot_id,
-                sequence=sequence_number,
-                size_mb=metadata.size_bytes / 1024 / 1024
-            )
+        # Write metadata
+        metadata_file = self.snapshot_directory / f"{snapshot_id}.meta"
+        async with aiofiles.open(metadata_file, 'w') as f:
+            await f.write(json.dumps(self._metadata_to_dict(metadata), separators=(',', ':')))
+
+        # Record it in the index (replacing the entry of a compacted snapshot),
+        # keeping the newest-first order without re-sorting
+        snapshots = list(await self.list_snapshots())
+        if snapshot_id in self._metadata_by_id:
+            snapshots.remove(self._metadata_by_id[snapshot_id])
+        bisect.insort(snapshots, metadata, key=self._newest_first)
+        await self._write_index(snapshots)
+
+        logger.info(
+            "Snapshot created",
+            snapshot_id=snapshot_id,
+            sequence=sequence_number,
+            size_mb=metadata.size_bytes / 1024 / 1024
+        )
 
-            return metadata
+        return metadata
+
+    async def _write_vector_file(
+        self,
+        vector_file: Path,
+        vector_blobs: dict[str, memoryview]
+    ) -> tuple[str, int]:
+        """Write vector blobs as independent frames; return (checksum, size)."""
+        keys = list(vector_blobs)
+        if self.use_compression:
+            loop = asyncio.get_running_loop()
+            executor = self._get_compress_executor()
+            frames = await asyncio.gather(*(
+                loop.run_in_executor(executor, self._pack_vector_frame, vector_blobs[key])
+                for key in keys
+            ))
+        else:
+            frames = [vector_blobs[key] for key in keys]
+
+        header = msgpack.packb({
+            'compressed': self.use_compression,
+            'frames': [[key, len(frame), len(vector_blobs[key])] for key, frame in zip(keys, frames)]
+        })
+
+        hasher = hashlib.sha256()
+        size_bytes = 0
+        temp_file = vector_file.with_name(vector_file.name + '.tmp')
+        async with aiofiles.open(temp_file, 'wb') as f:
+            for chunk in [self.VECTOR_FILE_MAGIC, len(header).to_bytes(4, 'little'), header, *frames]:
+                hasher.update(chunk)
+                size_bytes += len(chunk)
+                await f.write(chunk)
+        os.replace(temp_file, vector_file)
+
+        return hasher.hexdigest(), size_bytes
+
+    @classmethod
+    def _pack_vector_frame(cls, blob: memoryview) -> bytes:
+        """Byte-shuffle and deflate one vector blob."""
+        return zlib.compress(VectorSerializer.shuffle_bytes(blob), cls.VECTOR_COMPRESS_LEVEL)
+
+    @staticmethod
+    def _unpack_vector_frame(data, start: int, end: int, compressed: bool) -> np.ndarray:
+        """Decode the vector frame at ``data[start:end]`` back to a matrix."""
+        # Sliced as bytes so the matrix never views the mapping
+        frame = data[start:end]
+        if compressed:
+            frame = VectorSerializer.unshuffle_bytes(zlib.decompress(frame))
+        return VectorSerializer.deserialize_vectors(memoryview(frame))
+
+    async def _load_vector_file(self, metadata: SnapshotMetadata) -> dict[str, np.ndarray]:
+        """Load and verify the vector entries stored beside a snapshot."""
+        vector_file = self.snapshot_directory / f"{metadata.snapshot_id}.vec"
+        if not vector_file.exists():
+            raise FileNotFoundError(f"Vector file for snapshot {metadata.snapshot_id} not found")
+
+        # Mapped like the snapshot file; hashing and decoding read the mapping
+        # on the worker pool
+        with open(vector_file, 'rb') as f:
+            if vector_file.stat().st_size == 0:
+                return await self._decode_vector_file(b'', metadata)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return await self._decode_vector_file(data, metadata)
+
+    async def _decode_vector_file(self, data, metadata: SnapshotMetadata) -> dict[str, np.ndarray]:
+        """Verify and decode raw vector file contents (bytes or a mapping)."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_compress_executor()
+
+        # Verify checksum before trusting the contents
+        checksum = await loop.run_in_executor(executor, self._hash_contents, data)
+        if checksum != metadata.vectors_checksum:
+            raise ValueError(f"Snapshot checksum mismatch for {metadata.snapshot_id}")
+
+        magic_size = len(self.VECTOR_FILE_MAGIC)
+        header_size = int.from_bytes(data[magic_size:magic_size + 4], 'little')
+        offset = magic_size + 4 + header_size
+        header = msgpack.unpackb(data[magic_size + 4:offset], raw=False)
+
+        # Frames are independent, so they decode concurrently
+        frames = []
+        for key, frame_size, _ in header['frames']:
+            frames.append((key, offset, offset + frame_size))
+            offset += frame_size
+
+        # Wait for every frame even if one fails: none may still be reading
+        # the mapping when the caller closes it
+        matrices = await asyncio.gather(*(
+            loop.run_in_executor(
+                executor, self._unpack_vector_frame, data, start, end, header['compressed']
+            )
+            for _, start, end in frames
+        ), return_exceptions=True)
+        for matrix in matrices:
+            if isinstance(matrix, BaseException):
+                raise matrix
+        return {key: matrix for (key, _, _), matrix in zip(frames, matrices)}
+
+    @classmethod
+    def _compress_frame(cls, frame: bytes) -> bytes:
+        """Compress one frame into a self-contained gzip member."""
+        compressor = zlib.compressobj(cls.COMPRESS_LEVEL, zlib.DEFLATED, 31)
+        return compressor.compress(frame) + compressor.flush()
+
+    @classmethod
+    def _get_compress_executor(cls) -> ThreadPoolExecutor:
+        """Return the shared compression thread pool, creating it on first use."""
+        if cls._compress_executor is None:
+            cls._compress_executor = ThreadPoolExecutor(
+                max_workers=os.cpu_count(),
+                thread_name_prefix="snapshot-compress"
+            )
+        return cls._compress_executor
 
     async def load_snapshot(self, snapshot_id: str) -> dict[str, Any]:
-        """Load a snapshot by ID."""
+        """Load a snapshot by ID, applying incremental snapshots over their base."""
+        # Walk parent links back to the full base snapshot
+        chain = [await self._get_metadata(snapshot_id)]
+        while chain[-1].parent_id:
+            chain.append(await self._get_metadata(chain[-1].parent_id))
+
+        state = await self._load_snapshot_file(chain[-1])
+        for delta in reversed(chain[:-1]):
+            delta_state = await self._load_snapshot_file(delta)
+            for key in delta.deleted_keys:
+                state.pop(key, None)
+            state.update(delta_state)
+
+        logger.info("Snapshot loaded", snapshot_id=snapshot_id, chain_length=len(chain))
+        return state
+
+    async def _load_snapshot_file(self, metadata: SnapshotMetadata) -> dict[str, Any]:
+        """Load and verify the contents of a single snapshot file."""
+        snapshot_id = metadata.snapshot_id
+
         # Find snapshot file
         snapshot_file = None
         for ext in ['.msgpack.gz', '.msgpack']:
@@ -123,51 +385,126 @@ class FileSnapshotManager(ISnapshotManager):
         if not snapshot_file:
             raise FileNotFoundError(f"Snapshot {snapshot_id} not found")
 
-        # Read snapshot
-        async with aiofiles.open(snapshot_file, 'rb') as f:
-            data = await f.read()
+        # Map the file instead of reading it into a bytes copy; checksum,
+        # decompression and unpacking all consume the mapping directly
+        with open(snapshot_file, 'rb') as f:
+            if snapshot_file.stat().st_size == 0:
+                state = await self._decode_snapshot(snapshot_id, snapshot_file, b'', metadata)
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    # The contents are scanned front to back
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        data.madvise(mmap.MADV_SEQUENTIAL)
+                    state = await self._decode_snapshot(snapshot_id, snapshot_file, data, metadata)
 
-        # Verify checksum
-        metadata = await self._load_metadata(snapshot_id)
-        actual_checksum = hashlib.sha256(data).hexdigest()
-        if actual_checksum != metadata.checksum:
+        if metadata.vectors_checksum:
+            state.update(await self._load_vector_file(metadata))
+
+        return state
+
+    async def _decode_snapshot(
+        self,
+        snapshot_id: str,
+        snapshot_file: Path,
+        data,
+        metadata: SnapshotMetadata
+    ) -> dict[str, Any]:
+        """Verify and deserialize raw snapshot contents (bytes or a mapping).
+
+        The checksum is computed on the worker pool and verified before any
+        of the contents are unpacked. Decompression, unpacking and restoring
+        then run on the pool as well, so large loads do not stall other
+        requests. Uncompressed contents are unpacked straight from the
+        mapping; compressed ones are unpacked as they inflate, never joined
+        into a second full-size copy.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_compress_executor()
+
+        # Verify checksum before trusting the contents
+        checksum = await loop.run_in_executor(executor, self._hash_contents, data)
+        if checksum != metadata.checksum:
             raise ValueError(f"Snapshot checksum mismatch for {snapshot_id}")
 
-        # Decompress if needed
         if snapshot_file.suffix == '.gz':
-            data = gzip.decompress(data)
+            return await loop.run_in_executor(executor, self._inflate_and_restore, data)
+        return await loop.run_in_executor(executor, self._deserialize_contents, data)
+
+    @staticmethod
+    def _hash_contents(data) -> str:
+        """SHA-256 of the raw file contents."""
+        return hashlib.sha256(data).hexdigest()
+
+    def _inflate_and_unpack(self, data) -> Any:
+        """Inflate gzip contents (possibly several concatenated members) into an unpacker."""
+        # Chunks are sliced as bytes so no buffer export outlives the mapping
+        decompressor = zlib.decompressobj(31)  # gzip container
+        unpacker = MessagePackSerializer.streaming_decoder()
+        for start in range(0, len(data), self.WRITE_CHUNK_SIZE):
+            chunk = data[start:start + self.WRITE_CHUNK_SIZE]
+            unpacker.feed(decompressor.decompress(chunk))
+            # Frames are separate gzip members: continue with the next one
+            while decompressor.eof and decompressor.unused_data:
+                rest = decompressor.unused_data
+                decompressor = zlib.decompressobj(31)
+                unpacker.feed(decompressor.decompress(rest))
+        unpacker.feed(decompressor.flush())
+        return unpacker.unpack()
+
+    def _inflate_and_restore(self, data) -> dict[str, Any]:
+        """Inflate, unpack and restore verified compressed contents."""
+        return self._restore_contents(self._inflate_and_unpack(data))
+
+    @staticmethod
+    def _restore_contents(complete_state: Any) -> dict[str, Any]:
+        """Rebuild the state from unpacked contents."""
+        try:
+            # Try StateSerializer first
+            return StateSerializer.restore_state(complete_state)
+        except Exception:
+            # Plain msgpack state
+            return complete_state
 
-        # Deserialize
+    @staticmethod
+    def _deserialize_contents(data) -> dict[str, Any]:
+        """Unpack verified snapshot contents."""
         try:
             # Try StateSerializer first
-            state = StateSerializer.deserialize_state(data)
+            return StateSerializer.deserialize_state(data)
         except Exception:
             # Fallback to msgpack
-            state = msgpack.unpackb(data, raw=False)
-
-        logger.info("Snapshot loaded", snapshot_id=snapshot_id)
-        return state
+            return msgpack.unpackb(data, raw=False)
 
     async def list_snapshots(self) -> list[SnapshotMetadata]:
         """list all available snapshots."""
         if self._metadata_cache is not None:
             return self._metadata_cache
 
+        # One read of the index instead of one file per snapshot
+        if self._index_path.exists():
+            try:
+                async with aiofiles.open(self._index_path, 'rb') as f:
+                    records = msgpack.unpackb(await f.read(), raw=False)
+                # Written newest first
+                self._set_cache([self._metadata_from_dict(record) for record in records])
+                return self._metadata_cache
+            except Exception as e:
+                logger.error(f"Failed to read snapshot index, rescanning: {e}")
+
+        # No usable index (first boot or older layout): scan the .meta files
         snapshots = []
 
         for meta_file in self.snapshot_directory.glob("*.meta"):
             try:
-                metadata = await self._load_metadata(meta_file.stem)
+                metadata = self._read_metadata_file(meta_file)
                 snapshots.append(metadata)
             except Exception as e:
                 logger.error(f"Failed to load metadata for {meta_file}: {e}")
                 continue
 
-        # Sort by timestamp (newest first)
-        snapshots.sort(key=lambda s: s.timestamp, reverse=True)
-
-        self._metadata_cache = snapshots
-        return snapshots
+        snapshots.sort(key=self._newest_first)
+        await self._write_index(snapshots)
+        return self._metadata_cache
 
     async def delete_snapshot(self, snapshot_id: str) -> bool:
         """Delete a snapshot."""
@@ -182,19 +519,46 @@ class FileSnapshotManager(ISnapshotManager):
                     deleted = True
                     break
 
+            # Delete vectors stored beside it
+            vector_file = self.snapshot_directory / f"{snapshot_id}.vec"
+            if vector_file.exists():
+                vector_file.unlink()
+
             # Delete metadata
             meta_file = self.snapshot_directory / f"{snapshot_id}.meta"
             if meta_file.exists():
                 meta_file.unlink()
                 deleted = True
 
-            # Invalidate cache
+            # Drop it from the index
             if deleted:
-                self._metadata_cache = None
+                snapshots = list(await self.list_snapshots())
+                if snapshot_id in self._metadata_by_id:
+                    snapshots.remove(self._metadata_by_id[snapshot_id])
+                    await self._write_index(snapshots)
                 logger.info("Snapshot deleted", snapshot_id=snapshot_id)
 
             return deleted
 
+    async def compact_snapshot(self, snapshot_id: str) -> SnapshotMetadata:
+        """Rewrite an incremental snapshot as a full one, dropping its parent link."""
+        metadata = await self._get_metadata(snapshot_id)
+        if not metadata.parent_id:
+            return metadata
+
+        state = await self.load_snapshot(snapshot_id)
+        async with self.write_lock:
+            compacted = await self._write_snapshot(
+                snapshot_id,
+                metadata.sequence_number,
+                state,
+                metadata.description,
+                timestamp=metadata.timestamp
+            )
+
+        logger.info("Snapshot compacted", snapshot_id=snapshot_id)
+        return compacted
+
     async def get_latest_snapshot(self) -> Optional[SnapshotMetadata]:
         """Get the most recent snapshot."""
         snapshots = await self.list_snapshots()
@@ -207,6 +571,17 @@ class FileSnapshotManager(ISnapshotManager):
         if len(snapshots) <= keep_count:
             return 0
 
+        # Kept deltas that build on a snapshot about to be removed are first
+        # rolled up into full snapshots under their own ids
+        removed = {snapshot.snapshot_id for snapshot in snapshots[keep_count:]}
+        by_id = {snapshot.snapshot_id: snapshot for snapshot in snapshots}
+        for snapshot in snapshots[:keep_count]:
+            parent_id = snapshot.parent_id
+            while parent_id and parent_id not in removed:
+                parent_id = by_id[parent_id].parent_id if parent_id in by_id else None
+            if parent_id:
+                await self.compact_snapshot(snapshot.snapshot_id)
+
         # Delete old snapshots
         deleted_count = 0
         for snapshot in snapshots[keep_count:]:
@@ -216,16 +591,48 @@ class FileSnapshotManager(ISnapshotManager):
         logger.info(f"Cleaned up {deleted_count} old snapshots")
         return deleted_count
 
-    async def _load_metadata(self, snapshot_id: str) -> SnapshotMetadata:
-        """Load metadata for a snapshot."""
-        meta_file = self.snapshot_directory / f"{snapshot_id}.meta"
+    async def _write_index(self, snapshots: list[SnapshotMetadata]) -> None:
+        """Atomically rewrite the index file and refresh the in-memory cache.
 
-        if not meta_file.exists():
-            raise FileNotFoundError(f"Metadata for snapshot {snapshot_id} not found")
+        ``snapshots`` must already be ordered newest first.
+        """
+        temp_path = self._index_path.with_name(self._index_path.name + '.tmp')
+        async with aiofiles.open(temp_path, 'wb') as f:
+            await f.write(msgpack.packb(
+                [self._metadata_to_dict(s) for s in snapshots], use_bin_type=True
+            ))
+        os.replace(temp_path, self._index_path)
 
-        async with aiofiles.open(meta_file) as f:
-            data = json.loads(await f.read())
+        self._set_cache(snapshots)
 
+    def _set_cache(self, snapshots: list[SnapshotMetadata]) -> None:
+        """Replace the in-memory index (ordered newest first)."""
+        self._metadata_cache = snapshots
+        self._metadata_by_id = {s.snapshot_id: s for s in snapshots}
+
+    @staticmethod
+    def _newest_first(metadata: SnapshotMetadata) -> float:
+        """Sort key ordering snapshots by timestamp, newest first."""
+        return -metadata.timestamp.timestamp()
+
+    @staticmethod
+    def _metadata_to_dict(metadata: SnapshotMetadata) -> dict[str, Any]:
+        """Convert metadata to its JSON/msgpack-friendly form."""
+        return {
+            "snapshot_id": metadata.snapshot_id,
+            "sequence_number": metadata.sequence_number,
+            "timestamp": metadata.timestamp.isoformat(),
+            "size_bytes": metadata.size_bytes,
+            "checksum": metadata.checksum,
+            "description": metadata.description,
+            "parent_id": metadata.parent_id,
+            "deleted_keys": metadata.deleted_keys,
+            "vectors_checksum": metadata.vectors_checksum
+        }
+
+    @staticmethod
+    def _metadata_from_dict(data: dict[str, Any]) -> SnapshotMetadata:
+        """Rebuild metadata from its dict form."""
         # Parse timestamp and ensure it's timezone-aware
         timestamp = datetime.fromisoformat(data["timestamp"])
         if timestamp.tzinfo is None:
@@ -238,5 +645,33 @@ class FileSnapshotManager(ISnapshotManager):
             timestamp=timestamp,
             size_bytes=data["size_bytes"],
             checksum=data["checksum"],
-            description=data.get("description")
+            description=data.get("description"),
+            parent_id=data.get("parent_id"),
+            deleted_keys=data.get("deleted_keys", []),
+            vectors_checksum=data.get("vectors_checksum")
         )
+
+    async def _get_metadata(self, snapshot_id: str) -> SnapshotMetadata:
+        """Look up a snapshot's metadata in the index, falling back to its .meta file."""
+        await self.list_snapshots()
+        metadata = self._metadata_by_id.get(snapshot_id)
+        if metadata is not None:
+            return metadata
+        return await self._load_metadata(snapshot_id)
+
+    async def _load_metadata(self, snapshot_id: str) -> SnapshotMetadata:
+        """Load metadata for a snapshot."""
+        meta_file = self.snapshot_directory / f"{snapshot_id}.meta"
+
+        if not meta_file.exists():
+            raise FileNotFoundError(f"Metadata for snapshot {snapshot_id} not found")
+
+        return self._read_metadata_file(meta_file)
+
+    def _read_metadata_file(self, meta_file: Path) -> SnapshotMetadata:
+        """Parse a .meta file.
+
+        These are a few hundred bytes, so a direct read is cheaper than
+        handing each one to a worker thread through aiofiles.
+        """
+        return self._metadata_from_dict(json.loads(meta_file.read_bytes()))
@@ -1,6 +1,6 @@
 """Snapshot interface for state persistence."""
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, Optional
 
@@ -14,6 +14,13 @@ class SnapshotMetadata:
     size_bytes: int
     checksum: str
     description: Optional[str] = None
+    # Incremental snapshots only: the snapshot this delta applies on top of,
+    # and the top-level state keys it removes
+    parent_id: Optional[str] = None
+    deleted_keys: list[str] = field(default_factory=list)
+    # Checksum of the sibling vector file, for snapshots that store their
+    # ``*_vectors`` entries apart from the rest of the state
+    vectors_checksum: Optional[str] = None
 
 
 class ISnapshotManager(ABC):
@@ -29,6 +36,18 @@ class ISnapshotManager(ABC):
         """Create a new snapshot of the current state."""
         pass
 
+    @abstractmethod
+    async def create_incremental_snapshot(
+        self,
+        base_id: str,
+        sequence_number: int,
+        state_subset: dict[str, Any],
+        deleted_keys: Optional[list[str]] = None,
+        description: Optional[str] = None
+    ) -> SnapshotMetadata:
+        """Create a delta snapshot of the state keys changed since ``base_id``."""
+        pass
+
     @abstractmethod
     async def load_snapshot(self, snapshot_id: str) -> dict[str, Any]:
         """Load a snapshot by ID."""
@@ -1,13 +1,21 @@
 """File-based Write-Ahead Log implementation."""
 import asyncio
-import hashlib
+import bisect
+import ctypes
+import ctypes.util
+import functools
 import json
+import mmap
 import os
 import struct
+import sys
 import uuid
+import zlib
 from asyncio import Lock
+from collections.abc import Callable
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import Literal
 
 import aiofiles
 
@@ -18,26 +26,335 @@ from .interface import IWriteAheadLog, OperationType, WALEntry
 logger = get_logger(__name__)
 
 
+# Most buffers one writev call accepts
+_IOV_MAX = os.sysconf('SC_IOV_MAX') if hasattr(os, 'sysconf') else 1024
+
+# fallocate(2) mode releasing a byte range's blocks without resizing the file
+_FALLOC_FL_KEEP_SIZE = 0x01
+_FALLOC_FL_PUNCH_HOLE = 0x02
+
+
+def _load_fallocate() -> Callable | None:
+    """Bind libc's fallocate (Linux only), or return None where unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        fallocate = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True).fallocate
+    except (OSError, AttributeError):
+        return None
+    fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    fallocate.restype = ctypes.c_int
+    return fallocate
+
+
+_fallocate = _load_fallocate()
+
+# Small-int codes stored for operation types in entry bodies. They are part
+# of the segment format: add new ones, never renumber
+_OPERATION_CODES = {
+    OperationType.CREATE_LIBRARY: 1,
+    OperationType.UPDATE_LIBRARY: 2,
+    OperationType.DELETE_LIBRARY: 3,
+    OperationType.CREATE_CHUNK: 4,
+    OperationType.UPDATE_CHUNK: 5,
+    OperationType.DELETE_CHUNK: 6,
+    OperationType.CREATE_DOCUMENT: 7,
+    OperationType.UPDATE_DOCUMENT: 8,
+    OperationType.DELETE_DOCUMENT: 9,
+    OperationType.INDEX_UPDATE: 10,
+}
+
+# Operation types by code, and by value for bodies written before the codes
+# (and JSON bodies): a dict lookup is far cheaper than calling the Enum,
+# which replay would do once per entry
+_OPERATION_TYPES = {
+    **{op.value: op for op in OperationType},
+    **{code: op for op, code in _OPERATION_CODES.items()},
+}
+
+
+@functools.cache
+def _serializers():
+    """The serialization module, imported once on first use.
+
+    Decoding an entry body would otherwise repeat the lazy import for
+    every entry replayed.
+    """
+    from src.infrastructure.persistence.serialization import serializers
+    return serializers
+
+
+class _SegmentWriter:
+    """Append-only writer for the active segment over a raw descriptor.
+
+    Writes accumulate as a list of chunks. Once they pass ``FLUSH_THRESHOLD``
+    and no write is in flight, they are swapped out and written in the
+    background while appends keep filling a fresh list. Every write goes out
+    as one gathering ``writev`` in a single worker-thread call (with the
+    fsync, for ``sync``), chained behind the one before it so the file keeps
+    append order.
+    """
+
+    FLUSH_THRESHOLD = 256 * 1024
+
+    def __init__(self, fd: int):
+        self._fd = fd
+        self._chunks: list[bytes | memoryview] = []
+        self._buffered = 0
+        self._inflight: asyncio.Future | None = None
+
+    @classmethod
+    def open(cls, path: Path, truncate: bool = False) -> "_SegmentWriter":
+        """Open ``path`` for appending, optionally emptying it first."""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        if truncate:
+            flags |= os.O_TRUNC
+        return cls(os.open(path, flags, 0o644))
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def write(self, data: bytes | memoryview) -> None:
+        """Buffer data, writing out once enough is buffered.
+
+        The writer keeps a reference to ``data`` rather than a copy, so a
+        view must not be modified once handed over. Runs inline on the event
+        loop: it only buffers, or starts a background write, so callers need
+        not await anything per write.
+        """
+        self._chunks.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.FLUSH_THRESHOLD and (
+                self._inflight is None or self._inflight.done()):
+            self.submit()
+
+    async def flush(self) -> None:
+        """Write buffered data to the file."""
+        await self.submit()
+
+    async def sync(self) -> None:
+        """Write buffered data and fsync it."""
+        await self.submit(fsync=True)
+
+    def submit(self, fsync: bool = False) -> asyncio.Future:
+        """Start writing the buffered data, after any write already in flight.
+
+        Returns the write as a future; once it completes, everything buffered
+        before the call is in the file (and on disk, with ``fsync``).
+        """
+        chunks, self._chunks, self._buffered = self._chunks, [], 0
+        self._inflight = asyncio.ensure_future(
+            self._write_after(self._inflight, chunks, fsync)
+        )
+        return self._inflight
+
+    async def close(self) -> None:
+        """Flush and close the descriptor."""
+        await self.flush()
+        os.close(self._fd)
+
+    async def _write_after(
+        self,
+        previous: asyncio.Future | None,
+        chunks: list[bytes | memoryview],
+        fsync: bool
+    ) -> None:
+        if previous is not None:
+            await previous
+        if chunks or fsync:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._write_all, chunks, fsync
+            )
+
+    def _write_all(self, chunks: list[bytes | memoryview], fsync: bool = False) -> None:
+        """Write all chunks, IOV_MAX at a time, then optionally fsync."""
+        for i in range(0, len(chunks), _IOV_MAX):
+            batch = chunks[i:i + _IOV_MAX]
+            written = os.writev(self._fd, batch)
+            if written < sum(map(len, batch)):
+                # Short write: finish the rest with plain writes
+                rest = memoryview(b''.join(batch))[written:]
+                while rest:
+                    rest = rest[os.write(self._fd, rest):]
+        if fsync:
+            os.fsync(self._fd)
+
+
+class _DirectSegmentWriter(_SegmentWriter):
+    """Segment writer over an O_DIRECT descriptor, bypassing the page cache.
+
+    O_DIRECT needs block-aligned memory, offsets and lengths. Writes are
+    staged in a page-aligned anonymous map that starts with the segment's
+    last, partial block, and go out from that block on, zero-padded to a
+    whole block; the partial block stays staged for the next write. Until
+    ``close`` trims it, the file runs on past its logical end in zeros,
+    which parse as (empty) padding records.
+    """
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, fd: int, size: int, tail: bytes):
+        super().__init__(fd)
+        # File offset of the staged partial block, and its staged length
+        self._block_offset = size - len(tail)
+        self._tail_len = len(tail)
+        self._staging = mmap.mmap(-1, self.FLUSH_THRESHOLD + self.BLOCK_SIZE)
+        self._staging[:len(tail)] = tail
+
+    @classmethod
+    def open(cls, path: Path, truncate: bool = False) -> "_DirectSegmentWriter":
+        """Open ``path`` for direct appending, optionally emptying it first."""
+        flags = os.O_WRONLY | os.O_CREAT | os.O_DIRECT
+        if truncate:
+            flags |= os.O_TRUNC
+        fd = os.open(path, flags, 0o644)
+
+        size = os.fstat(fd).st_size
+        tail = b''
+        if size % cls.BLOCK_SIZE:
+            with open(path, 'rb') as f:
+                f.seek(size - size % cls.BLOCK_SIZE)
+                tail = f.read()
+        return cls(fd, size, tail)
+
+    async def close(self) -> None:
+        """Flush, trim the block padding and close the descriptor."""
+        await self.flush()
+        os.ftruncate(self._fd, self._block_offset + self._tail_len)
+        self._staging.close()
+        os.close(self._fd)
+
+    def _write_all(self, chunks: list[bytes | memoryview], fsync: bool = False) -> None:
+        """Write the staged block plus chunks as whole blocks, then optionally fsync."""
+        if chunks:
+            block = self.BLOCK_SIZE
+            end = self._tail_len + sum(map(len, chunks))
+            padded = -(-end // block) * block
+            if padded > len(self._staging):
+                grown = mmap.mmap(-1, padded)
+                grown[:self._tail_len] = self._staging[:self._tail_len]
+                self._staging.close()
+                self._staging = grown
+
+            position = self._tail_len
+            for chunk in chunks:
+                self._staging[position:position + len(chunk)] = chunk
+                position += len(chunk)
+            self._staging[end:padded] = bytes(padded - end)
+
+            with memoryview(self._staging) as view:
+                written = 0
+                while written < padded:
+                    written += os.pwrite(
+                        self._fd, view[written:padded], self._block_offset + written
+                    )
+
+            # Keep the new partial block staged at the front
+            full = end - end % block
+            self._staging[:end - full] = self._staging[full:end]
+            self._block_offset += full
+            self._tail_len = end - full
+        if fsync:
+            os.fsync(self._fd)
+
+
 class FileWAL(IWriteAheadLog):
     """File-based WAL implementation with async I/O."""
 
-    MAGIC_HEADER = b'VECWAL01'  # 8 bytes
-    ENTRY_HEADER_SIZE = 32  # 4 + 8 + 4 + 16 bytes
-
-    def __init__(self, wal_directory: Path, segment_size: int = 64 * 1024 * 1024):
+    MAGIC_HEADER = b'VECWAL03'  # 8 bytes
+    # sequence(4) + timestamp_us(8) + data_len(4), then a crc32(4) covering
+    # those fields and the body
+    ENTRY_FIELDS = struct.Struct('<IQI')
+    ENTRY_HEADER = struct.Struct('<IQII')
+    ENTRY_HEADER_SIZE = ENTRY_HEADER.size
+    # Sequence of padding records, whose body is skipped unread (real
+    # sequences start at 1)
+    PADDING_SEQUENCE = 0
+
+    # Older segment formats, still readable but never appended to. Both have
+    # JSON entry bodies; VECWAL01 headers carry the first 16 hex digits of an
+    # MD5 where later ones have a CRC32 (of the body alone, in VECWAL02)
+    JSON_MAGIC_HEADER = b'VECWAL02'
+    LEGACY_MAGIC_HEADER = b'VECWAL01'
+    LEGACY_ENTRY_HEADER = struct.Struct('<IQI16s')
+
+    # Adaptive group commit: with few requests waiting, commit at once (no
+    # batching to gain); with a moderate queue, wait up to the commit delay
+    # for more to join; a queue this long is already a full batch
+    GROUP_COMMIT_MIN_WAITERS = 12
+    GROUP_COMMIT_MAX_WAITERS = 4096
+    # Queued entries past which "async" appends wait for the writer too
+    MAX_PENDING_ENTRIES = 65536
+
+    def __init__(
+        self,
+        wal_directory: Path,
+        segment_size: int = 64 * 1024 * 1024,
+        commit_delay_us: int = 5000,
+        durability: Literal["sync", "group", "async"] = "group",
+        flush_interval_ms: int = 200,
+        use_direct_io: bool = False
+    ):
         """Initialize FileWAL.
 
         Args:
             wal_directory: Directory to store WAL files
             segment_size: Maximum size of a WAL segment (default 64MB)
+            commit_delay_us: Longest a group commit waits for more appends
+            durability: When appends reach the disk. "sync" flushes and
+                fsyncs every commit as soon as it is queued; "group" does the
+                same but lets a busy queue gather for up to the commit delay;
+                "async" only buffers, leaving a background task to flush
+                every ``flush_interval_ms`` and ``checkpoint`` to fsync
+            flush_interval_ms: Background flush period for "async" durability
+            use_direct_io: Write segments with O_DIRECT, bypassing the page
+                cache (Linux; the filesystem must support it)
         """
+        if durability not in ("sync", "group", "async"):
+            raise ValueError(f"Unknown WAL durability: {durability}")
+
         self.wal_directory = Path(wal_directory)
         self.segment_size = segment_size
+        self.commit_delay_us = commit_delay_us
+        self.durability = durability
+        self.flush_interval_ms = flush_interval_ms
+        self.use_direct_io = use_direct_io
+        self._writer_class = _DirectSegmentWriter if use_direct_io else _SegmentWriter
+        # Last sequence reserved by an append, and last one handed to the
+        # segment writer (the two differ while appends are queued)
         self.current_sequence = 0
+        self._written_sequence = 0
         self.current_segment = 0
         self.current_file = None
         self.current_file_path = None
+        # Bytes in the current segment, written or still buffered
+        self.current_segment_bytes = 0
         self.write_lock = Lock()
+        self._flusher: asyncio.Task | None = None
+        # First and last sequence in each segment holding entries, so reads
+        # and truncation can pass over segments without parsing them
+        self._segment_ranges: dict[Path, tuple[int, int]] = {}
+        # Segment files in order, kept in step with rotation and truncation
+        # instead of listing the directory on every read
+        self._segments: list[Path] = []
+
+        # Batches are serialized into a scratch buffer (only touched under
+        # write_lock) that is handed to the segment writer as it is, their
+        # bodies through one packer whose output is copied straight in
+        from src.infrastructure.persistence.serialization.serializers import (
+            MessagePackSerializer,
+        )
+        self._scratch = bytearray(4096)
+        self._body_packer = MessagePackSerializer.packer(autoreset=False)
+
+        # Appends waiting for the next group commit as (first sequence,
+        # entries, future to answer or None), how many entries that is, and
+        # the task that commits them (one leader at a time)
+        self._pending: list[
+            tuple[int, list[tuple[OperationType, uuid.UUID, dict]], asyncio.Future | None]
+        ] = []
+        self._pending_entries = 0
+        self._leader: asyncio.Task | None = None
 
         # Create directory if it doesn't exist
         self.wal_directory.mkdir(parents=True, exist_ok=True)
@@ -47,6 +364,9 @@ class FileWAL(IWriteAheadLog):
         await self._recover_state()
         await self._open_current_segment()
 
+        if self.durability == "async":
+            self._flusher = asyncio.create_task(self._background_flush())
+
     async def append(
         self,
         operation_type: OperationType,
@@ -54,68 +374,187 @@ class FileWAL(IWriteAheadLog):
         data: dict
     ) -> int:
         """Append an entry to the WAL."""
-        async with self.write_lock:
-            self.current_sequence += 1
-
-            entry = WALEntry(
-                sequence_number=self.current_sequence,
-                timestamp=datetime.now(UTC),
-                operation_type=operation_type,
-                resource_id=resource_id,
-                data=data,
-                checksum=""
-            )
+        sequences = await self.append_batch([(operation_type, resource_id, data)])
+        return sequences[0]
+
+    async def append_batch(
+        self,
+        entries: list[tuple[OperationType, uuid.UUID, dict]]
+    ) -> list[int]:
+        """Append entries as part of the next group commit.
+
+        Sequence numbers are reserved as entries are queued, so the queue
+        order is the log order. A single leader task drains the queue, with
+        one write and one fsync per segment for everything queued meanwhile.
+        With "async" durability callers get their sequences back right away
+        (unless ``MAX_PENDING_ENTRIES`` are already queued); otherwise they
+        wait until their group is synced.
+        """
+        first_sequence = self.current_sequence + 1
+        self.current_sequence += len(entries)
+
+        future = None
+        if self.durability != "async" or self._pending_entries >= self.MAX_PENDING_ENTRIES:
+            future = asyncio.get_running_loop().create_future()
+        self._pending.append((first_sequence, entries, future))
+        self._pending_entries += len(entries)
+        if self._leader is None or self._leader.done():
+            self._leader = asyncio.create_task(self._lead_group_commits())
+
+        if future is not None:
+            await future
+        return list(range(first_sequence, first_sequence + len(entries)))
+
+    async def _lead_group_commits(self) -> None:
+        """Commit pending appends in groups until none are left.
+
+        Commits are pipelined: while one group is being written and synced,
+        the next is already serialized into the segment buffer, and each
+        group's callers are answered once its own sync has finished.
+        """
+        syncing = None
+        while self._pending or syncing is not None:
+            committed = None
+            if self._pending:
+                waiting = len(self._pending)
+                if (self.durability == "group"
+                        and self.GROUP_COMMIT_MIN_WAITERS <= waiting < self.GROUP_COMMIT_MAX_WAITERS):
+                    await asyncio.sleep(self.commit_delay_us / 1_000_000)
+
+                group, self._pending = self._pending, []
+                try:
+                    await self._write_batch(
+                        [entry for _, entries, _ in group for entry in entries],
+                        group[0][0]
+                    )
+                    committed = group
+                except Exception as e:
+                    self._fail_group(group, e)
+                finally:
+                    self._pending_entries -= sum(len(entries) for _, entries, _ in group)
+
+            if syncing is not None:
+                group, sync = syncing
+                syncing = None
+                try:
+                    await sync
+                except Exception as e:
+                    self._fail_group(group, e)
+                else:
+                    self._resolve_group(group)
 
-            # Calculate checksum
-            entry.checksum = self._calculate_checksum(entry)
+            if committed is not None:
+                if self.durability == "async":
+                    self._resolve_group(committed)
+                else:
+                    syncing = committed, self.current_file.submit(fsync=True)
+
+    @staticmethod
+    def _resolve_group(group: list) -> None:
+        """Release the callers waiting on a committed group."""
+        for _, _, future in group:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    @staticmethod
+    def _fail_group(group: list, error: Exception) -> None:
+        """Raise ``error`` in every caller of a failed group."""
+        for first_sequence, entries, future in group:
+            if future is None:
+                # Nobody is waiting ("async" durability): the error is all
+                # there is to report
+                logger.error(
+                    f"Failed to write WAL entries {first_sequence}-"
+                    f"{first_sequence + len(entries) - 1}: {error}"
+                )
+            elif not future.done():
+                future.set_exception(error)
 
-            # Serialize entry
-            serialized = self._serialize_entry(entry)
+    async def _write_batch(
+        self,
+        entries: list[tuple[OperationType, uuid.UUID, dict]],
+        first_sequence: int
+    ) -> None:
+        """Serialize entries into the segment buffer, rotating as needed.
+
+        Entries take consecutive sequence numbers from ``first_sequence``.
+        Syncing the last segment is left to the caller; segments rotated out
+        along the way are synced (unless durability is "async") and closed.
+        """
+        async with self.write_lock:
+            if not self.current_file:
+                await self._open_current_segment()
+            scratch = self._scratch
+            end = 0
+
+            for sequence, (operation_type, resource_id, data) in enumerate(entries, first_sequence):
+                entry = WALEntry(
+                    sequence_number=sequence,
+                    timestamp=datetime.now(UTC),
+                    operation_type=operation_type,
+                    resource_id=resource_id,
+                    data=data,
+                    checksum=""
+                )
 
-            # Check if we need a new segment
-            if await self._should_rotate_segment(len(serialized)):
-                await self._rotate_segment()
+                # Serialize entry after the previous ones (fills in its checksum)
+                start = end
+                end = self._serialize_entry_into(entry, scratch, start)
+
+                # Check if we need a new segment, writing out what belongs
+                # to the current one first and keeping just this entry. A
+                # segment with no entries is kept even for an entry too big
+                # to fit, which would not fit the next one either
+                segment_empty = not start and self.current_segment_bytes <= len(self.MAGIC_HEADER)
+                if self._should_rotate_segment(end) and not segment_empty:
+                    if start:
+                        # The written prefix now belongs to the writer; the
+                        # entry moves to the front of the fresh scratch
+                        self._write_scratch(start)
+                        self._scratch[:end - start] = scratch[start:end]
+                        scratch = self._scratch
+                        end -= start
+                    await self._rotate_segment()
+
+                segment_first = self._segment_ranges.get(self.current_file_path, (sequence,))[0]
+                self._segment_ranges[self.current_file_path] = (segment_first, sequence)
 
             # Write to file
-            await self._write_entry(serialized)
+            if end:
+                self._write_scratch(end)
+            if entries:
+                self._written_sequence = first_sequence + len(entries) - 1
 
             logger.debug(
-                "WAL entry appended",
-                sequence=entry.sequence_number,
-                operation=operation_type.value
+                "WAL entries appended",
+                count=len(entries),
+                last_sequence=self._written_sequence
             )
 
-            return entry.sequence_number
-
     async def read(self, from_sequence: int = 0) -> list[WALEntry]:
         """Read entries from the WAL."""
-        entries = []
-
-        # Find segments to read
-        segments = sorted([
-            f for f in self.wal_directory.glob("wal_*.log")
-            if f.is_file()
-        ])
-
-        for segment_file in segments:
-            segment_entries = await self._read_segment(segment_file)
-            for entry in segment_entries:
-                if entry.sequence_number >= from_sequence:
-                    entries.append(entry)
-
-        return entries
+        await self._flush_buffered()
+        segments = [
+            segment_file for segment_file in self._segments
+            if (seq_range := self._segment_ranges.get(segment_file)) is None
+            or seq_range[1] >= from_sequence
+        ]
+
+        # Segments are parsed concurrently on the executor and joined in order
+        parsed = await asyncio.gather(*(
+            self._read_segment(segment_file, from_sequence) for segment_file in segments
+        ))
+        return [entry for segment_entries in parsed for entry in segment_entries]
 
     async def checkpoint(self) -> int:
         """Create a checkpoint."""
+        await self._drain_pending()
         async with self.write_lock:
-            checkpoint_sequence = self.current_sequence
+            checkpoint_sequence = self._written_sequence
 
             # Flush current segment
             if self.current_file:
-                await self.current_file.flush()
-                await asyncio.get_event_loop().run_in_executor(
-                    None, os.fsync, self.current_file.fileno()
-                )
+                await self.current_file.sync()
 
             # Write checkpoint marker
             checkpoint_file = self.wal_directory / f"checkpoint_{checkpoint_sequence}"
@@ -131,46 +570,81 @@ class FileWAL(IWriteAheadLog):
 
     async def truncate(self, up_to_sequence: int) -> None:
         """Remove entries up to a sequence number."""
-        segments = sorted([
-            f for f in self.wal_directory.glob("wal_*.log")
-            if f.is_file()
-        ])
-
-        current_file_deleted = False
-
-        for segment_file in segments:
-            # Read segment to check sequences
-            entries = await self._read_segment(segment_file)
-            if not entries:
-                continue
-
-            # Check if we need to keep any entries
-            remaining = [e for e in entries if e.sequence_number > up_to_sequence]
-
-            if not remaining:
-                # All entries are before truncation point, delete segment
-
-                # Check if this is the current file
-                if self.current_file_path and segment_file == self.current_file_path:
-                    # Close current file before deleting
-                    if self.current_file:
-                        await self.current_file.close()
-                        self.current_file = None
-                    current_file_deleted = True
-
-                segment_file.unlink()
-                logger.info(f"Truncated entire segment {segment_file.name}")
-            elif len(remaining) < len(entries):
-                # Some entries need to be kept - rewrite segment
-                await self._rewrite_segment(segment_file, remaining)
-                logger.info(f"Partially truncated segment {segment_file.name}, kept {len(remaining)} entries")
-            else:
-                # All entries are after truncation point, keep segment as is
-                logger.info(f"Kept segment {segment_file.name} unchanged")
+        await self._drain_pending()
+
+        # Appends committed from here on wait for the segments to be
+        # rewritten, so none is dropped by a rewrite of a stale read
+        async with self.write_lock:
+            # Whatever the writer still buffers must be in the file to be read
+            if self.current_file:
+                await self.current_file.flush()
+            current_file_replaced = False
+
+            for segment_file in list(self._segments):
+                seq_range = await self._segment_range(segment_file)
+                if seq_range is None:
+                    continue
+
+                if seq_range[1] <= up_to_sequence:
+                    # All entries are before truncation point, delete segment
+
+                    # Check if this is the current file
+                    if self.current_file_path and segment_file == self.current_file_path:
+                        # Close current file before deleting
+                        if self.current_file:
+                            await self.current_file.close()
+                            self.current_file = None
+                        current_file_replaced = True
+
+                    segment_file.unlink()
+                    self._index_path(segment_file).unlink(missing_ok=True)
+                    self._segments.remove(segment_file)
+                    self._segment_ranges.pop(segment_file, None)
+                    logger.info(f"Truncated entire segment {segment_file.name}")
+                    continue
+
+                if seq_range[0] > up_to_sequence:
+                    # All entries are after truncation point, and so are those
+                    # of every later segment: keep them as they are
+                    logger.info(f"Kept segment {segment_file.name} and later unchanged")
+                    break
 
-        # If we deleted the current file, open a new one
-        if current_file_deleted:
-            await self._open_current_segment()
+                # The truncation point falls inside. Where possible the dropped
+                # entries are punched out in place; otherwise this segment is
+                # read and its surviving entries rewritten. A direct writer
+                # rewrites its staged block, so its segment is always rewritten
+                first_kept = None
+                if not (self.use_direct_io and segment_file == self.current_file_path):
+                    first_kept = await asyncio.get_running_loop().run_in_executor(
+                        None, self._punch_segment_prefix, segment_file, up_to_sequence
+                    )
+                if first_kept is not None:
+                    self._segment_ranges[segment_file] = (first_kept, seq_range[1])
+                    await self._write_segment_index(segment_file)
+                    logger.info(f"Punched truncated entries out of segment {segment_file.name}")
+                    continue
+
+                # Only the surviving entries are decoded; the range shows some
+                # before them are dropped
+                remaining = await self._read_segment(segment_file, up_to_sequence + 1)
+                if remaining:
+                    # Some entries need to be kept - rewrite segment. The rewrite
+                    # is a new file, so the current one must be reopened after
+                    if self.current_file_path and segment_file == self.current_file_path:
+                        if self.current_file:
+                            await self.current_file.close()
+                            self.current_file = None
+                        current_file_replaced = True
+                    await self._rewrite_segment(segment_file, remaining)
+                    self._segment_ranges[segment_file] = (
+                        remaining[0].sequence_number, remaining[-1].sequence_number
+                    )
+                    await self._write_segment_index(segment_file)
+                    logger.info(f"Partially truncated segment {segment_file.name}, kept {len(remaining)} entries")
+
+            # If we deleted or rewrote the current file, open it afresh
+            if current_file_replaced:
+                await self._open_current_segment()
 
     async def replay(self, from_sequence: int = 0) -> int:
         """Replay entries from a sequence number."""
@@ -184,6 +658,13 @@ class FileWAL(IWriteAheadLog):
 
     async def close(self) -> None:
         """Close the WAL."""
+        # Let appends already queued reach the file first
+        if self._leader is not None:
+            await self._leader
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+
         async with self.write_lock:
             if self.current_file:
                 await self.current_file.close()
@@ -202,133 +683,398 @@ class FileWAL(IWriteAheadLog):
                 self.current_sequence = checkpoint_data["sequence"]
                 self.current_segment = checkpoint_data["segment"]
 
-        # Find highest sequence in WAL files
-        segments = sorted(self.wal_directory.glob("wal_*.log"))
-        for segment in segments:
-            entries = await self._read_segment(segment)
-            if entries:
-                max_seq = max(e.sequence_number for e in entries)
-                self.current_sequence = max(self.current_sequence, max_seq)
+        # Find highest sequence in WAL files, indexing their ranges on the way
+        self._segment_ranges.clear()
+        self._segments = sorted(
+            f for f in self.wal_directory.glob("wal_*.log") if f.is_file()
+        )
+        seq_ranges = await asyncio.gather(*(
+            self._segment_range(segment) for segment in self._segments
+        ))
+        for seq_range in seq_ranges:
+            if seq_range is not None:
+                self.current_sequence = max(self.current_sequence, seq_range[1])
+        self._written_sequence = self.current_sequence
 
     async def _open_current_segment(self) -> None:
         """Open the current segment for writing."""
         segment_path = self.wal_directory / f"wal_{self.current_segment:08d}.log"
         self.current_file_path = segment_path
+        self._track_segment(segment_path)
 
         # Check if file exists and has content
         if segment_path.exists() and segment_path.stat().st_size > 0:
             # Verify it has the magic header
             async with aiofiles.open(segment_path, 'rb') as f:
                 header = await f.read(8)
-                if header != self.MAGIC_HEADER:
-                    logger.warning(f"Invalid magic header in {segment_path}, creating new file")
-                    # Invalid file, recreate it
-                    self.current_file = await aiofiles.open(segment_path, 'wb')
-                    await self.current_file.write(self.MAGIC_HEADER)
-                else:
-                    # Valid file, open in append mode
-                    self.current_file = await aiofiles.open(segment_path, 'ab')
+            if header in (self.LEGACY_MAGIC_HEADER, self.JSON_MAGIC_HEADER):
+                # Keep the old-format segment for replay; append to a new one
+                self.current_segment += 1
+                await self._open_current_segment()
+                return
+            if header != self.MAGIC_HEADER:
+                logger.warning(f"Invalid magic header in {segment_path}, creating new file")
+                # Invalid file, recreate it
+                self.current_file = self._writer_class.open(segment_path, truncate=True)
+                self.current_file.write(self.MAGIC_HEADER)
+                self.current_segment_bytes = len(self.MAGIC_HEADER)
+                self._segment_ranges.pop(segment_path, None)
+            else:
+                # Valid file, open in append mode; appends extend its range
+                if self.use_direct_io:
+                    # Block padding left by a direct writer that never closed
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, self._trim_segment_padding, segment_path
+                    )
+                await self._segment_range(segment_path)
+                self.current_file = self._writer_class.open(segment_path)
+                self.current_segment_bytes = segment_path.stat().st_size
         else:
             # Create new file and write header
-            self.current_file = await aiofiles.open(segment_path, 'wb')
-            await self.current_file.write(self.MAGIC_HEADER)
-
-    async def _should_rotate_segment(self, entry_size: int) -> bool:
-        """Check if segment should be rotated."""
+            self._segment_ranges.pop(segment_path, None)
+            self.current_file = self._writer_class.open(segment_path, truncate=True)
+            self.current_file.write(self.MAGIC_HEADER)
+            self.current_segment_bytes = len(self.MAGIC_HEADER)
+
+    def _track_segment(self, segment_path: Path) -> None:
+        """Add a segment to the ordered segment list, if not there yet."""
+        i = bisect.bisect_left(self._segments, segment_path)
+        if i == len(self._segments) or self._segments[i] != segment_path:
+            self._segments.insert(i, segment_path)
+
+    def _should_rotate_segment(self, entry_size: int) -> bool:
+        """Check if segment should be rotated (from the tracked size, no stat)."""
         if not self.current_file_path:
             return True
 
-        current_size = self.current_file_path.stat().st_size if self.current_file_path.exists() else 0
-        return current_size + entry_size > self.segment_size
+        return self.current_segment_bytes + entry_size > self.segment_size
 
     async def _rotate_segment(self) -> None:
         """Rotate to a new segment."""
+        sealed_path = self.current_file_path
         if self.current_file:
+            if self.durability != "async":
+                await self.current_file.sync()
             await self.current_file.close()
 
         self.current_segment += 1
         await self._open_current_segment()
+        if sealed_path is not None:
+            await self._write_segment_index(sealed_path)
 
     def _serialize_entry(self, entry: WALEntry) -> bytes:
         """Serialize a WAL entry to bytes."""
-        # Use a custom JSON encoder that handles UUIDs and other types
-        from src.infrastructure.persistence.serialization.serializers import (
-            ExtendedJSONEncoder,
-        )
+        buffer = bytearray()
+        self._serialize_entry_into(entry, buffer, 0)
+        return bytes(buffer)
+
+    def _serialize_entry_into(self, entry: WALEntry, buffer: bytearray, offset: int) -> int:
+        """Serialize a WAL entry into ``buffer`` at ``offset``; return where it ends.
 
-        # Serialize data as JSON
-        data_json = json.dumps({
-            "operation_type": entry.operation_type.value,
-            "resource_id": str(entry.resource_id),
-            "timestamp": entry.timestamp.isoformat(),
-            "data": entry.data
-        }, cls=ExtendedJSONEncoder)
-        data_bytes = data_json.encode('utf-8')
-
-        # Create header: sequence(4) + timestamp(8) + data_len(4) + checksum(16)
-        header = struct.pack(
-            '<IQI16s',
+        The buffer at least doubles when it is too small, so a reused buffer
+        soon stops growing.
+        """
+        packer = self._body_packer
+        try:
+            # MessagePack body; the timestamp lives in the entry header and
+            # the resource id is packed as its 16 raw bytes
+            packer.pack({
+                "op": _OPERATION_CODES[entry.operation_type],
+                "rid": entry.resource_id.bytes,
+                "data": entry.data
+            })
+            with packer.getbuffer() as body:
+                start = offset + self.ENTRY_HEADER_SIZE
+                end = start + len(body)
+                if end > len(buffer):
+                    buffer.extend(bytes(max(end - len(buffer), len(buffer))))
+                buffer[start:end] = body
+        finally:
+            packer.reset()
+
+        self.ENTRY_FIELDS.pack_into(
+            buffer,
+            offset,
             entry.sequence_number,
             int(entry.timestamp.timestamp() * 1000000),  # microseconds
-            len(data_bytes),
-            entry.checksum[:16].encode('utf-8')
+            end - start
         )
+        with memoryview(buffer) as view:
+            checksum = self._calculate_checksum(
+                view[start:end], view[offset:offset + self.ENTRY_FIELDS.size]
+            )
+        struct.pack_into('<I', buffer, offset + self.ENTRY_FIELDS.size, checksum)
+        entry.checksum = format(checksum, '08x')
+        return end
+
+    def _write_scratch(self, length: int) -> None:
+        """Hand the first ``length`` bytes of the scratch buffer to the segment.
+
+        The writer keeps the buffer itself until it is written, so a fresh
+        scratch of the same size takes its place.
+        """
+        scratch, self._scratch = self._scratch, bytearray(len(self._scratch))
+        self._write_entry(memoryview(scratch)[:length])
+
+    def _write_entry(self, serialized: bytes | memoryview) -> None:
+        """Write serialized entries to the open current segment."""
+        # Buffered only: durability decides when it is flushed and synced
+        self.current_file.write(serialized)
+        self.current_segment_bytes += len(serialized)
+
+    async def _flush_buffered(self) -> None:
+        """Push buffered appends to the OS so the segment files show them."""
+        if self.durability != "async":
+            return
+        await self._drain_pending()
+        if self.current_file:
+            async with self.write_lock:
+                if self.current_file:
+                    await self.current_file.flush()
+
+    async def _drain_pending(self) -> None:
+        """Wait until queued appends have been handed to the segment writer."""
+        if self._leader is not None:
+            await self._leader
+
+    async def _background_flush(self) -> None:
+        """Flush buffered appends periodically ("async" durability)."""
+        while True:
+            await asyncio.sleep(self.flush_interval_ms / 1000)
+            try:
+                await self._flush_buffered()
+            except Exception as e:
+                logger.error(f"Background WAL flush failed: {e}")
+
+    async def _segment_range(self, segment_file: Path) -> tuple[int, int] | None:
+        """First and last sequence in a segment (None if it has no entries)."""
+        seq_range = self._segment_ranges.get(segment_file)
+        if seq_range is None:
+            seq_range = await asyncio.get_running_loop().run_in_executor(
+                None, self._load_segment_range, segment_file
+            )
+            if seq_range is not None:
+                self._segment_ranges[segment_file] = seq_range
+        return seq_range
+
+    @staticmethod
+    def _index_path(segment_file: Path) -> Path:
+        """Sidecar holding a sealed segment's sequence range."""
+        return segment_file.with_suffix(".idx")
+
+    async def _write_segment_index(self, segment_file: Path) -> None:
+        """Record a sealed segment's sequence range next to it.
+
+        The segment's size is stored alongside, so a sidecar left behind by
+        a segment that has since been appended to is ignored. The segment
+        being written to never gets one.
+        """
+        index_file = self._index_path(segment_file)
+        seq_range = self._segment_ranges.get(segment_file)
+        if seq_range is None or segment_file == self.current_file_path:
+            index_file.unlink(missing_ok=True)
+            return
+
+        async with aiofiles.open(index_file, 'w') as f:
+            await f.write(json.dumps({
+                "first_sequence": seq_range[0],
+                "last_sequence": seq_range[1],
+                "size": segment_file.stat().st_size
+            }, separators=(',', ':')))
+
+    def _load_segment_range(self, segment_file: Path) -> tuple[int, int] | None:
+        """Take a segment's sequence range from its sidecar, else scan for it."""
+        try:
+            index = json.loads(self._index_path(segment_file).read_bytes())
+            if index["size"] == segment_file.stat().st_size:
+                return index["first_sequence"], index["last_sequence"]
+        except (OSError, ValueError, KeyError):
+            pass
+        return self._scan_segment_range(segment_file)
+
+    def _scan_segment_range(self, segment_file: Path) -> tuple[int, int] | None:
+        """Find a segment's sequence range from its entry headers alone."""
+        if segment_file.stat().st_size == 0:
+            return None
+
+        with open(segment_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            segment_format = self._segment_format(mm[:8])
+            if segment_format is None:
+                return None
+            entry_header = segment_format[0]
+
+            first = last = None
+            offset = 8
+            while offset + entry_header.size <= len(mm):
+                seq, _, data_len, _ = entry_header.unpack_from(mm, offset)
+                offset += entry_header.size + data_len
+                if offset > len(mm):
+                    break
+                if seq == self.PADDING_SEQUENCE:
+                    continue
+                if first is None:
+                    first = seq
+                last = seq
 
-        return header + data_bytes
+        return None if first is None else (first, last)
 
-    async def _write_entry(self, serialized: bytes) -> None:
-        """Write serialized entry to current segment."""
-        if not self.current_file:
-            # If no current file, open one
-            await self._open_current_segment()
+    def _punch_segment_prefix(self, segment_file: Path, up_to_sequence: int) -> int | None:
+        """Drop a segment's entries up to a sequence in place; return the first kept.
+
+        The dropped range becomes one padding record whose body is released
+        with a hole punch, so the segment is neither rewritten nor resized
+        (and an open writer keeps appending to it). The padding header goes
+        in first: a crash before the punch leaves a valid, unpunched segment.
+        Returns None where this is not possible, for older formats or
+        without hole-punch support.
+        """
+        if _fallocate is None:
+            return None
+
+        fd = os.open(segment_file, os.O_RDWR)
+        try:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:8] != self.MAGIC_HEADER:
+                    return None
+
+                # Padding sorts before every sequence, so earlier holes are
+                # passed over along with the dropped entries
+                start = offset = len(self.MAGIC_HEADER)
+                first_kept = None
+                while offset + self.ENTRY_HEADER_SIZE <= len(mm):
+                    seq, _, data_len, _ = self.ENTRY_HEADER.unpack_from(mm, offset)
+                    if seq > up_to_sequence:
+                        first_kept = seq
+                        break
+                    offset += self.ENTRY_HEADER_SIZE + data_len
+            if first_kept is None:
+                return None
+            if offset == start:
+                return first_kept
+
+            body_start = start + self.ENTRY_HEADER_SIZE
+            os.pwrite(
+                fd,
+                self.ENTRY_HEADER.pack(self.PADDING_SEQUENCE, 0, offset - body_start, 0),
+                start
+            )
+            if offset > body_start:
+                # Nothing depends on this succeeding: the padding already
+                # hides the range, punching just returns its blocks
+                _fallocate(
+                    fd, _FALLOC_FL_PUNCH_HOLE | _FALLOC_FL_KEEP_SIZE,
+                    body_start, offset - body_start
+                )
+            return first_kept
+        finally:
+            os.close(fd)
+
+    def _trim_segment_padding(self, segment_file: Path) -> None:
+        """Cut a segment back to the end of its last entry, dropping zero padding."""
+        with open(segment_file, 'r+b') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                segment_format = self._segment_format(mm[:8])
+                if segment_format is None:
+                    return
+                entry_header = segment_format[0]
+
+                offset = 8
+                while offset + entry_header.size <= len(mm):
+                    seq, _, data_len, _ = entry_header.unpack_from(mm, offset)
+                    if seq == self.PADDING_SEQUENCE and not data_len:
+                        break
+                    if offset + entry_header.size + data_len > len(mm):
+                        break
+                    offset += entry_header.size + data_len
+                size = len(mm)
+            if offset < size:
+                f.truncate(offset)
+
+    def _segment_format(self, magic: bytes) -> tuple[struct.Struct, Callable] | None:
+        """Entry header layout and body decoder for a segment's magic header."""
+        if magic == self.MAGIC_HEADER:
+            return self.ENTRY_HEADER, self._decode_body
+        if magic == self.JSON_MAGIC_HEADER:
+            return self.ENTRY_HEADER, self._decode_json_body
+        if magic == self.LEGACY_MAGIC_HEADER:
+            return self.LEGACY_ENTRY_HEADER, self._decode_json_body
+        return None
+
+    async def _read_segment(self, segment_file: Path, from_sequence: int = 0) -> list[WALEntry]:
+        """Read the entries of a segment numbered ``from_sequence`` or later."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._parse_segment, segment_file, from_sequence
+        )
 
-        await self.current_file.write(serialized)
-        await self.current_file.flush()
+    def _parse_segment(self, segment_file: Path, from_sequence: int = 0) -> list[WALEntry]:
+        """Parse a segment from a read-only memory map.
 
-    async def _read_segment(self, segment_file: Path) -> list[WALEntry]:
-        """Read all entries from a segment."""
+        Headers are unpacked in place; only bodies of entries at or after
+        ``from_sequence`` are copied out, checked and decoded.
+        """
         entries = []
 
         # Check if file is empty
         if segment_file.stat().st_size == 0:
             return entries
 
-        async with aiofiles.open(segment_file, 'rb') as f:
+        with open(segment_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
             # Read and verify magic header
-            magic = await f.read(8)
-            if len(magic) < 8 or magic != self.MAGIC_HEADER:
+            magic = mm[:8]
+            segment_format = self._segment_format(magic)
+            if segment_format is None:
                 logger.error(f"Invalid or missing magic header in WAL segment: {segment_file}")
                 return entries
-
-            while True:
-                # Read header
-                header_data = await f.read(self.ENTRY_HEADER_SIZE)
-                if len(header_data) < self.ENTRY_HEADER_SIZE:
-                    break
-
+            entry_header, decode_body = segment_format
+            checksum_fields = self.ENTRY_FIELDS.size if magic == self.MAGIC_HEADER else 0
+            has_crc = entry_header is self.ENTRY_HEADER
+
+            # Everything the loop touches per entry is bound locally up front
+            unpack_header = entry_header.unpack_from
+            header_size = entry_header.size
+            padding = self.PADDING_SEQUENCE
+            calculate_checksum = self._calculate_checksum
+            from_timestamp = datetime.fromtimestamp
+            make_entry = WALEntry
+            append = entries.append
+
+            offset = len(magic)
+            size = len(mm)
+            while offset + header_size <= size:
                 # Unpack header
-                seq, timestamp_us, data_len, checksum = struct.unpack(
-                    '<IQI16s', header_data
-                )
-
-                # Read data
-                data_bytes = await f.read(data_len)
-                if len(data_bytes) < data_len:
+                seq, timestamp_us, data_len, checksum = unpack_header(mm, offset)
+                body_start = offset + header_size
+                body_end = body_start + data_len
+                if body_end > size:
                     logger.error(f"Truncated entry in {segment_file}")
                     break
+                header_start, offset = offset, body_end
+                if seq < from_sequence or seq == padding:
+                    continue
 
-                # Deserialize
+                data_bytes = mm[body_start:body_end]
+                if has_crc:
+                    fields = mm[header_start:header_start + checksum_fields]
+                    if calculate_checksum(data_bytes, fields) != checksum:
+                        logger.error(f"Checksum mismatch for entry {seq} in {segment_file}")
+                        continue
+                    checksum = format(checksum, '08x')
+                else:
+                    checksum = checksum.decode('utf-8').rstrip('\x00')
+
+                # Deserialize (WALEntry fields, positionally)
                 try:
-                    data_json = json.loads(data_bytes.decode('utf-8'))
-                    entry = WALEntry(
-                        sequence_number=seq,
-                        timestamp=datetime.fromtimestamp(timestamp_us / 1000000),
-                        operation_type=OperationType(data_json["operation_type"]),
-                        resource_id=uuid.UUID(data_json["resource_id"]),
-                        data=data_json["data"],
-                        checksum=checksum.decode('utf-8').rstrip('\x00')
-                    )
-                    entries.append(entry)
+                    operation_type, resource_id, data = decode_body(data_bytes)
+                    append(make_entry(
+                        seq,
+                        from_timestamp(timestamp_us / 1000000),
+                        operation_type,
+                        resource_id,
+                        data,
+                        checksum
+                    ))
                 except Exception as e:
                     logger.error(f"Failed to deserialize entry: {e}")
                     continue
@@ -339,22 +1085,40 @@ class FileWAL(IWriteAheadLog):
         """Rewrite a segment with given entries."""
         temp_file = segment_file.with_suffix('.tmp')
 
-        async with aiofiles.open(temp_file, 'wb') as f:
-            await f.write(self.MAGIC_HEADER)
-
+        # Entries are gathered into as few writev calls as the writer's
+        # flush threshold allows
+        writer = _SegmentWriter.open(temp_file, truncate=True)
+        try:
+            writer.write(self.MAGIC_HEADER)
             for entry in entries:
-                serialized = self._serialize_entry(entry)
-                await f.write(serialized)
+                writer.write(self._serialize_entry(entry))
+        finally:
+            await writer.close()
 
         # Atomic rename
         temp_file.rename(segment_file)
 
-    def _calculate_checksum(self, entry: WALEntry) -> str:
-        """Calculate checksum for an entry."""
-        # Use a custom JSON encoder that handles UUIDs and other types
-        from src.infrastructure.persistence.serialization.serializers import (
-            ExtendedJSONEncoder,
+    @staticmethod
+    def _decode_body(data_bytes: bytes) -> tuple[OperationType, uuid.UUID, dict]:
+        """Decode a MessagePack entry body."""
+        # Entity records stay encoded: replay rebuilds them from their fields
+        body = _serializers().MessagePackSerializer.decode(data_bytes, restore_entities=False)
+        return _OPERATION_TYPES[body["op"]], uuid.UUID(bytes=body["rid"]), body["data"]
+
+    @staticmethod
+    def _decode_json_body(data_bytes: bytes) -> tuple[OperationType, uuid.UUID, dict]:
+        """Decode a JSON entry body from a VECWAL01/02 segment."""
+        body = json.loads(
+            data_bytes.decode('utf-8'),
+            object_hook=_serializers().ExtendedJSONEncoder.object_hook
+        )
+        return (
+            _OPERATION_TYPES[body["operation_type"]],
+            uuid.UUID(body["resource_id"]),
+            body["data"]
         )
-        data_json = json.dumps(entry.data, cls=ExtendedJSONEncoder)
-        data = f"{entry.sequence_number}:{entry.operation_type.value}:{entry.resource_id}:{data_json}"
-        return hashlib.md5(data.encode()).hexdigest()
+
+    @staticmethod
+    def _calculate_checksum(data: bytes, fields: bytes = b'') -> int:
+        """CRC32 of an entry's packed header fields followed by its body."""
+        return zlib.crc32(data, zlib.crc32(fields))
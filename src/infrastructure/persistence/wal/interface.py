@@ -44,6 +44,20 @@ class IWriteAheadLog(ABC):
         """Append an entry to the WAL."""
         pass
 
+    async def append_batch(
+        self,
+        entries: list[tuple[OperationType, uuid.UUID, dict]]
+    ) -> list[int]:
+        """Append several entries as one group commit, returning their sequences.
+
+        Implementations should override this to flush once per batch; the
+        default falls back to one ``append`` per entry.
+        """
+        return [
+            await self.append(operation_type, resource_id, data)
+            for operation_type, resource_id, data in entries
+        ]
+
     @abstractmethod
     async def read(self, from_sequence: int = 0) -> list[WALEntry]:
         """Read entries from the WAL starting from a sequence number."""
@@ -1,4 +1,6 @@
 from copy import deepcopy
+from datetime import datetime
+from enum import Enum
 from typing import Any, Generic, Optional, TypeVar
 from uuid import UUID
 
@@ -11,6 +13,9 @@ from src.infrastructure.locks import ReadWriteLock
 T = TypeVar("T", bound=BaseModel)
 logger = get_logger(__name__)
 
+# Field values a copy can share with its original
+_IMMUTABLE_TYPES = (str, bytes, int, float, UUID, datetime, Enum, type(None))
+
 
 class InMemoryBaseRepository(BaseRepository[T], Generic[T]):
     """Base in-memory repository with thread-safe operations."""
@@ -21,29 +26,67 @@ class InMemoryBaseRepository(BaseRepository[T], Generic[T]):
         self._lock = ReadWriteLock()
         logger.info(f"Initialized in-memory repository for {entity_type.__name__}")
 
+    @staticmethod
+    def _clone(entity: T) -> T:
+        """Copy an entity so it shares no mutable state with the original.
+
+        Entities are frozen, so stored ones are handed out as they are; only
+        what comes in is copied, in case the caller still mutates a field
+        value such as its metadata dict.
+
+        A shallow ``model_copy`` carries immutable field values over as they
+        are; only the rest (metadata dicts, tag lists) are deep-copied,
+        rather than walking every field as ``deepcopy`` of the model would.
+        """
+        copied = entity.model_copy()
+        fields = copied.__dict__
+        for name, value in fields.items():
+            if not isinstance(value, _IMMUTABLE_TYPES):
+                fields[name] = deepcopy(value)
+        return copied
+
+    def _add_to_indexes(self, entity: T) -> None:
+        """Add a stored entity to any secondary indexes (write lock held).
+
+        Raises ``ValueError`` on a uniqueness conflict, before anything is
+        stored. Subclasses with indexes override this and
+        ``_remove_from_indexes``.
+        """
+
+    def _remove_from_indexes(self, entity: T) -> None:
+        """Drop a stored entity from any secondary indexes (write lock held)."""
+
+    def _replace_in_indexes(self, previous: T, entity: T) -> None:
+        """Re-index an updated entity, leaving the indexes as they were on conflict."""
+        self._remove_from_indexes(previous)
+        try:
+            self._add_to_indexes(entity)
+        except ValueError:
+            self._add_to_indexes(previous)
+            raise
+
     async def create(self, entity: T) -> T:
         """Create a new entity with thread safety."""
         async with self._lock.write():
             if hasattr(entity, 'id') and entity.id in self._storage:
                 raise ValueError(f"Entity with id {entity.id} already exists")
 
-            # Create a deep copy to ensure immutability
-            stored_entity = deepcopy(entity)
-            self._storage[stored_entity.id] = stored_entity
+            # Store a copy so the caller cannot mutate it in place; the
+            # caller's own instance is what it gets back, so one copy does
+            stored_entity = self._clone(entity)
+            self._add_to_indexes(stored_entity)
+            self._storage[entity.id] = stored_entity
 
             logger.info(
                 f"Created {self._entity_type.__name__}",
-                entity_id=str(stored_entity.id)
+                entity_id=str(entity.id)
             )
-            return deepcopy(stored_entity)
+            return entity
 
     async def get(self, id: UUID) -> Optional[T]:
         """Get an entity by ID with read lock."""
         async with self._lock.read():
-            entity = self._storage.get(id)
-            if entity:
-                return deepcopy(entity)
-            return None
+            return self._storage.get(id)
 
     async def update(self, id: UUID, entity: T) -> Optional[T]:
         """Update an entity with write lock."""
@@ -52,21 +95,24 @@ class InMemoryBaseRepository(BaseRepository[T], Generic[T]):
                 return None
 
             # Ensure the ID matches
-            if hasattr(entity, 'id'):
-                entity.id = id
+            if hasattr(entity, 'id') and entity.id != id:
+                entity = entity.model_copy(update={"id": id})
 
-            self._storage[id] = deepcopy(entity)
+            # As in create, only the stored instance is a copy
+            stored_entity = self._clone(entity)
+            self._replace_in_indexes(self._storage[id], stored_entity)
+            self._storage[id] = stored_entity
             logger.info(
                 f"Updated {self._entity_type.__name__}",
                 entity_id=str(id)
             )
-            return deepcopy(entity)
+            return entity
 
     async def delete(self, id: UUID) -> bool:
         """Delete an entity with write lock."""
         async with self._lock.write():
             if id in self._storage:
-                del self._storage[id]
+                self._remove_from_indexes(self._storage.pop(id))
                 logger.info(
                     f"Deleted {self._entity_type.__name__}",
                     entity_id=str(id)
@@ -91,10 +137,7 @@ class InMemoryBaseRepository(BaseRepository[T], Generic[T]):
             # Apply pagination
             start = offset
             end = offset + limit
-            result = entities[start:end]
-
-            # Return deep copies
-            return [deepcopy(entity) for entity in result]
+            return entities[start:end]
 
     async def count(self, filters: Optional[dict[str, Any]] = None) -> int:
         """Count entities with optional filtering."""
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import bisect
 import builtins
 from copy import deepcopy
+from dataclasses import replace
+from itertools import islice
 from typing import Any, Optional
 from uuid import UUID
 
@@ -19,10 +22,63 @@ class InMemoryChunkRepository(ChunkRepository):
     def __init__(self):
         self._storage: dict[UUID, Chunk] = {}
         self._lock = ReadWriteLock()
-        # Additional index for document lookups
-        self._document_index: dict[UUID, list[UUID]] = {}
+        # Additional index for document lookups: (chunk_index, chunk id)
+        # per document, kept sorted so chunks come out in document order
+        self._document_index: dict[UUID, list[tuple[int, UUID]]] = {}
+        # Chunk ids by library as insertion-ordered sets, so pages keep
+        # creation order
+        self._library_index: dict[UUID, dict[UUID, None]] = {}
         logger.info("Initialized in-memory chunk repository")
 
+    @staticmethod
+    def _clone(chunk: Chunk) -> Chunk:
+        """Copy a chunk so it shares no mutable state with the original.
+
+        Chunks are frozen, so stored ones are handed out as they are; only
+        what comes in is copied. The embedding holds only floats, so a list
+        copy isolates it; only metadata needs a deep copy. ``deepcopy`` of
+        the whole chunk would visit every float of the embedding instead.
+        """
+        return replace(
+            chunk, embedding=list(chunk.embedding), metadata=deepcopy(chunk.metadata)
+        )
+
+    def _add_to_indexes(self, chunk: Chunk) -> None:
+        """Add a stored chunk to the document and library indexes."""
+        if chunk.document_id:
+            bisect.insort(
+                self._document_index.setdefault(chunk.document_id, []),
+                (chunk.chunk_index, chunk.id)
+            )
+        self._library_index.setdefault(chunk.library_id, {})[chunk.id] = None
+
+    def _remove_from_indexes(self, chunk: Chunk) -> None:
+        """Drop a stored chunk from the document and library indexes."""
+        entries = self._document_index.get(chunk.document_id)
+        if entries is not None:
+            key = (chunk.chunk_index, chunk.id)
+            i = bisect.bisect_left(entries, key)
+            if i < len(entries) and entries[i] == key:
+                del entries[i]
+                if not entries:
+                    del self._document_index[chunk.document_id]
+        library_chunks = self._library_index.get(chunk.library_id)
+        if library_chunks is not None:
+            library_chunks.pop(chunk.id, None)
+            if not library_chunks:
+                del self._library_index[chunk.library_id]
+
+    def _candidates(self, filters: dict[str, Any] | None) -> builtins.list[Chunk]:
+        """Chunks that can match ``filters``, narrowed by an index where one applies.
+
+        A ``document_id`` filter is answered from the document index; the
+        filters are still applied to the candidates afterwards.
+        """
+        if filters and "document_id" in filters:
+            entries = self._document_index.get(filters["document_id"], ())
+            return [self._storage[chunk_id] for _, chunk_id in entries]
+        return builtins.list(self._storage.values())
+
     async def create(self, entity: Chunk) -> Chunk:
         """Create a chunk and update indices."""
         async with self._lock.write():
@@ -30,26 +86,18 @@ class InMemoryChunkRepository(ChunkRepository):
             if entity.id in self._storage:
                 raise ValueError(f"Chunk with id {entity.id} already exists")
 
-            # Store the chunk
-            stored_chunk = deepcopy(entity)
-            self._storage[stored_chunk.id] = stored_chunk
-
-            # Update document index
-            if entity.document_id:
-                if entity.document_id not in self._document_index:
-                    self._document_index[entity.document_id] = []
-                self._document_index[entity.document_id].append(entity.id)
+            # Store a copy; the caller keeps its own instance, returned below
+            stored_chunk = self._clone(entity)
+            self._storage[entity.id] = stored_chunk
+            self._add_to_indexes(stored_chunk)
 
-            logger.info("Created chunk", chunk_id=str(stored_chunk.id))
-            return deepcopy(stored_chunk)
+            logger.info("Created chunk", chunk_id=str(entity.id))
+            return entity
 
     async def get(self, id: UUID) -> Chunk | None:
         """Get a chunk by ID."""
         async with self._lock.read():
-            chunk = self._storage.get(id)
-            if chunk:
-                return deepcopy(chunk)
-            return None
+            return self._storage.get(id)
 
     async def update(self, id: UUID, entity: Chunk) -> Chunk | None:
         """Update a chunk."""
@@ -58,28 +106,25 @@ class InMemoryChunkRepository(ChunkRepository):
                 return None
 
             # Ensure the ID matches
-            entity.id = id
-
-            # Update storage
-            self._storage[id] = deepcopy(entity)
+            if entity.id != id:
+                entity = replace(entity, id=id)
+
+            # Update storage with a copy, handing back the caller's instance
+            stored_chunk = self._clone(entity)
+            self._remove_from_indexes(self._storage[id])
+            self._storage[id] = stored_chunk
+            self._add_to_indexes(stored_chunk)
             logger.info("Updated chunk", chunk_id=str(id))
-            return deepcopy(entity)
+            return entity
 
     async def delete(self, id: UUID) -> bool:
         """Delete a chunk and update indices."""
         async with self._lock.write():
-            chunk = self._storage.get(id)
+            chunk = self._storage.pop(id, None)
             if not chunk:
                 return False
 
-            # Update document index
-            if chunk.document_id and chunk.document_id in self._document_index:
-                self._document_index[chunk.document_id].remove(id)
-                if not self._document_index[chunk.document_id]:
-                    del self._document_index[chunk.document_id]
-
-            # Delete the chunk
-            del self._storage[id]
+            self._remove_from_indexes(chunk)
             logger.info("Deleted chunk", chunk_id=str(id))
             return True
 
@@ -91,7 +136,7 @@ class InMemoryChunkRepository(ChunkRepository):
     ) -> list[Chunk]:
         """list chunks with optional filtering."""
         async with self._lock.read():
-            chunks = list(self._storage.values())
+            chunks = self._candidates(filters)
 
             # Apply filters
             if filters:
@@ -100,10 +145,7 @@ class InMemoryChunkRepository(ChunkRepository):
             # Apply pagination
             start = offset
             end = offset + limit
-            result = chunks[start:end]
-
-            # Return deep copies
-            return [deepcopy(chunk) for chunk in result]
+            return chunks[start:end]
 
     async def list(                    # ③ mismo nombre que en ChunkRepository
         self,
@@ -121,7 +163,7 @@ class InMemoryChunkRepository(ChunkRepository):
     async def count(self, filters: dict[str, Any] | None = None) -> int:
         """Count chunks with optional filtering."""
         async with self._lock.read():
-            chunks = list(self._storage.values())
+            chunks = self._candidates(filters)
 
             if filters:
                 chunks = self._apply_filters(chunks, filters)
@@ -137,16 +179,11 @@ class InMemoryChunkRepository(ChunkRepository):
                 if chunk.id in self._storage:
                     raise ValueError(f"Chunk with id {chunk.id} already exists")
 
-                # Store chunk
-                stored_chunk = deepcopy(chunk)
-                self._storage[stored_chunk.id] = stored_chunk
-                created_chunks.append(deepcopy(stored_chunk))
-
-                # Update document index
-                if chunk.document_id:
-                    if chunk.document_id not in self._document_index:
-                        self._document_index[chunk.document_id] = []
-                    self._document_index[chunk.document_id].append(chunk.id)
+                # Store a copy of the chunk, returning the caller's instance
+                stored_chunk = self._clone(chunk)
+                self._storage[chunk.id] = stored_chunk
+                self._add_to_indexes(stored_chunk)
+                created_chunks.append(chunk)
 
             logger.info(f"Created {len(created_chunks)} chunks in bulk")
             return created_chunks
@@ -154,17 +191,9 @@ class InMemoryChunkRepository(ChunkRepository):
     async def get_by_document(self, document_id: UUID) -> list[Chunk]:
         """Get all chunks for a document."""
         async with self._lock.read():
-            chunk_ids = self._document_index.get(document_id, [])
-            chunks = []
-
-            for chunk_id in chunk_ids:
-                chunk = self._storage.get(chunk_id)
-                if chunk:
-                    chunks.append(deepcopy(chunk))
-
-            # Sort by chunk_index
-            chunks.sort(key=lambda x: x.chunk_index)
-            return chunks
+            # Already in chunk_index order
+            entries = self._document_index.get(document_id, ())
+            return [self._storage[chunk_id] for _, chunk_id in entries]
 
     async def get_by_library(
         self,
@@ -172,27 +201,27 @@ class InMemoryChunkRepository(ChunkRepository):
         limit: int = 100,
         offset: int = 0
     ) -> list[Chunk]:
-        """Get chunks by library ID through document relationship."""
-        # This would require a library-document mapping in a real implementation
-        # For now, we'll filter by metadata if library_id is stored there
-        filters = {"library_id": str(library_id)}
-        return await self.list_chunks(filters=filters, limit=limit, offset=offset)
+        """Get chunks by library ID, in creation order."""
+        async with self._lock.read():
+            chunk_ids = self._library_index.get(library_id, {})
+            return [
+                self._storage[chunk_id]
+                for chunk_id in islice(chunk_ids, offset, offset + limit)
+            ]
 
     async def delete_by_document(self, document_id: UUID) -> int:
         """Delete all chunks for a document."""
         async with self._lock.write():
-            chunk_ids = self._document_index.get(document_id, []).copy()
+            entries = self._document_index.get(document_id, []).copy()
             deleted_count = 0
 
-            for chunk_id in chunk_ids:
-                if chunk_id in self._storage:
-                    del self._storage[chunk_id]
+            # Removing the last chunk also clears the document's index entry
+            for _, chunk_id in entries:
+                chunk = self._storage.pop(chunk_id, None)
+                if chunk is not None:
+                    self._remove_from_indexes(chunk)
                     deleted_count += 1
 
-            # Clear document index
-            if document_id in self._document_index:
-                del self._document_index[document_id]
-
             logger.info(
                 f"Deleted {deleted_count} chunks for document",
                 document_id=str(document_id)
@@ -209,14 +238,13 @@ class InMemoryChunkRepository(ChunkRepository):
         async with self._lock.read():
             matching_chunks = []
 
-            for chunk in self._storage.values():
-                # Check library association (would need proper implementation)
-                if not self._matches_library(chunk, library_id):
-                    continue
+            # Only the library's chunks are visited
+            for chunk_id in self._library_index.get(library_id, {}):
+                chunk = self._storage[chunk_id]
 
                 # Check metadata filters
                 if self._matches_metadata(chunk.metadata, metadata_filters):
-                    matching_chunks.append(deepcopy(chunk))
+                    matching_chunks.append(chunk)
 
                     if len(matching_chunks) >= limit:
                         break
@@ -247,11 +275,6 @@ class InMemoryChunkRepository(ChunkRepository):
                 filtered.append(entity)
         return filtered
 
-    def _matches_library(self, chunk: Chunk, library_id: UUID) -> bool:
-        """Check if chunk belongs to library (simplified)."""
-        # In a real implementation, this would check through document relationships
-        return chunk.metadata.get("library_id") == str(library_id)
-
     def _matches_metadata(
         self,
         chunk_metadata: dict[str, Any],
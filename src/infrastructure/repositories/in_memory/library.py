@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import builtins
-from copy import deepcopy
+from collections import defaultdict
 from datetime import datetime
 from typing import Optional, Any
 from uuid import UUID
@@ -17,6 +17,37 @@ class InMemoryLibraryRepository(InMemoryBaseRepository[Library], LibraryReposito
 
     def __init__(self):
         super().__init__(Library)
+        # Library names are unique; get_by_name looks them up here
+        self._name_index: dict[str, UUID] = {}
+        # Library ids by index type as insertion-ordered sets, so
+        # list_by_index_type keeps creation order
+        self._index_type_index: dict[str, dict[UUID, None]] = defaultdict(dict)
+
+    def _add_to_indexes(self, library: Library) -> None:
+        """Index a library by name, rejecting a name already taken."""
+        if library.name in self._name_index:
+            raise ValueError(f"Library with name '{library.name}' already exists")
+        self._name_index[library.name] = library.id
+        self._index_type_index[library.index_type][library.id] = None
+
+    def _remove_from_indexes(self, library: Library) -> None:
+        """Drop a library from the name and index type indexes."""
+        self._name_index.pop(library.name, None)
+        library_ids = self._index_type_index.get(library.index_type)
+        if library_ids is not None:
+            library_ids.pop(library.id, None)
+            if not library_ids:
+                del self._index_type_index[library.index_type]
+
+    def _replace_in_indexes(self, previous: Library, library: Library) -> None:
+        """Re-index an updated library, keeping its place among its index type."""
+        if previous.index_type != library.index_type:
+            super()._replace_in_indexes(previous, library)
+        elif previous.name != library.name:
+            if library.name in self._name_index:
+                raise ValueError(f"Library with name '{library.name}' already exists")
+            del self._name_index[previous.name]
+            self._name_index[library.name] = library.id
 
     async def list(
         self,
@@ -35,25 +66,20 @@ class InMemoryLibraryRepository(InMemoryBaseRepository[Library], LibraryReposito
                 libs = self._apply_filters(libs, filters)
 
             start, end = offset, offset + limit
-            return [deepcopy(library) for library in libs[start:end]]
+            return libs[start:end]
 
     async def get_by_name(self, name: str) -> Library | None:
         """Get a library by name."""
         async with self._lock.read():
-            for library in self._storage.values():
-                if library.name == name:
-                    return deepcopy(library)
-            return None
+            library_id = self._name_index.get(name)
+            return self._storage.get(library_id) if library_id else None
 
     async def list_by_index_type(self, index_type: str) -> list[Library]:
         """list libraries by index type."""
         async with self._lock.read():
-            libraries = [
-                deepcopy(library)
-                for library in self._storage.values()
-                if library.index_type == index_type
-            ]
-            return libraries
+            # IndexType is a str enum, so either form finds the bucket
+            library_ids = self._index_type_index.get(index_type, ())
+            return [self._storage[library_id] for library_id in library_ids]
 
     async def update_stats(
         self,
@@ -67,16 +93,13 @@ class InMemoryLibraryRepository(InMemoryBaseRepository[Library], LibraryReposito
             if not library:
                 return None
 
-            # Create a copy for modification
-            updated_library = deepcopy(library)
-
+            # Libraries are frozen: store an updated copy
+            stats: dict[str, Any] = {"updated_at": datetime.utcnow()}
             if total_documents is not None:
-                updated_library.total_documents = total_documents
+                stats["total_documents"] = total_documents
             if total_chunks is not None:
-                updated_library.total_chunks = total_chunks
-
-            # Trigger timestamp update
-            updated_library.updated_at = datetime.utcnow()
+                stats["total_chunks"] = total_chunks
 
+            updated_library = library.model_copy(update=stats)
             self._storage[id] = updated_library
-            return deepcopy(updated_library)
+            return updated_library
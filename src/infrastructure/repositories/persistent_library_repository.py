@@ -170,14 +170,15 @@ class PersistentLibraryRepository(LibraryRepository):  # Changed from ILibraryRe
         if not library:
             return None
 
-        # Update stats
+        # Update stats on a new instance (libraries are frozen)
+        stats = {}
         if total_documents is not None:
-            library.total_documents = total_documents
+            stats["total_documents"] = total_documents
         if total_chunks is not None:
-            library.total_chunks = total_chunks
+            stats["total_chunks"] = total_chunks
 
         # Use regular update to persist
-        return await self.update(id, library)
+        return await self.update(id, library.model_copy(update=stats))
 
     async def count(self, filters: dict[str, Any] | None = None) -> int:
         """Count total libraries."""
@@ -207,7 +208,9 @@ class PersistentLibraryRepository(LibraryRepository):  # Changed from ILibraryRe
             # Restore libraries
             if 'libraries' in state:
                 for lib_id_str, lib_data in state['libraries'].items():
-                    library = Library(**lib_data)
+                    # Snapshots decode straight to entities; plain dicts
+                    # come from older or hand-built states
+                    library = lib_data if isinstance(lib_data, Library) else Library(**lib_data)
                     self._libraries[UUID(lib_id_str)] = library
 
             # Restore name index
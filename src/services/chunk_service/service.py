@@ -1,9 +1,8 @@
+from dataclasses import replace
 from datetime import datetime
 from typing import Any, Optional
 from uuid import UUID, uuid4
 
-import numpy as np
-
 from src.core.exceptions import NotFoundError, ValidationError
 from src.core.logging import get_logger
 from src.domain.entities.chunk import Chunk
@@ -66,7 +65,7 @@ class ChunkService(IChunkService):
 
             index = self.library_service.get_index(library_id)
             if index:
-                await index.add(created_chunk.id, np.array(embedding, dtype=np.float32))
+                await index.add(created_chunk.id, created_chunk.to_numpy())
 
             await self.library_service.repository.update_stats(
                 library_id,
@@ -114,7 +113,7 @@ class ChunkService(IChunkService):
             )
 
             new_chunks.append(chunk)
-            index_data.append((chunk.id, np.array(embedding, dtype=np.float32)))
+            index_data.append((chunk.id, chunk.to_numpy()))
 
         created_chunks = await self.repository.create_bulk(new_chunks)
 
@@ -159,8 +158,9 @@ class ChunkService(IChunkService):
             if not library:
                 raise ValidationError(f"Associated library {chunk.library_id} not found for chunk {chunk_id}")
 
+            changes: dict[str, Any] = {"updated_at": datetime.utcnow()}
             if content is not None:
-                chunk.content = content
+                changes["content"] = content
 
             if embedding is not None:
                 if len(embedding) != library.dimension:
@@ -168,17 +168,17 @@ class ChunkService(IChunkService):
                         f"Embedding dimension {len(embedding)} != library dimension {library.dimension}",
                         field="embedding"
                     )
-                chunk.embedding = embedding
+                changes["embedding"] = embedding
+
+            if metadata is not None:
+                changes["metadata"] = {**chunk.metadata, **metadata}
 
+            chunk = replace(chunk, **changes)
+            if embedding is not None:
                 index = self.library_service.get_index(library.id)
                 if index:
                     await index.remove(chunk_id)
-                    await index.add(chunk_id, np.array(embedding, dtype=np.float32))
-
-            if metadata is not None:
-                chunk.metadata.update(metadata)
-
-            chunk.updated_at = datetime.utcnow()
+                    await index.add(chunk_id, chunk.to_numpy())
 
             updated_chunk = await self.repository.update(chunk_id, chunk)
 
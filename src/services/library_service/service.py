@@ -137,6 +137,7 @@ class LibraryService(ILibraryService):
         if not library:
             raise NotFoundError("Library", str(library_id))
 
+        changes: dict[str, Any] = {"updated_at": datetime.utcnow()}
         if name and name != library.name:
             existing = await self.repository.get_by_name(name)
             if existing and existing.id != library_id:
@@ -144,17 +145,15 @@ class LibraryService(ILibraryService):
                     f"Library with name '{name}' already exists",
                     conflict_type="duplicate_name"
                 )
-            library.name = name
+            changes["name"] = name
 
         if description is not None:
-            library.description = description
+            changes["description"] = description
 
         if metadata is not None:
-            library.metadata.update(metadata)
+            changes["metadata"] = {**library.metadata, **metadata}
 
-        library.updated_at = datetime.utcnow()
-
-        updated = await self.repository.update(library_id, library)
+        updated = await self.repository.update(library_id, library.model_copy(update=changes))
         logger.info("Updated library", library_id=str(library_id))
         return updated
 
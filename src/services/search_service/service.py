@@ -2,8 +2,6 @@ import asyncio
 from typing import Any, Optional
 from uuid import UUID
 
-import numpy as np
-
 from src.core.exceptions import NotFoundError, ValidationError
 from src.core.logging import get_logger
 from src.domain.repositories.chunk import ChunkRepository
@@ -68,7 +66,7 @@ class SearchService(ISearchService):
             return self._search_cache[cache_key]
 
         # Perform vector search
-        query_vector = np.array(embedding, dtype=np.float32)
+        query_vector = query.to_numpy()
 
         # Get candidate IDs from vector search
         if metadata_filters:
@@ -91,11 +89,10 @@ class SearchService(ISearchService):
         for chunk_id, distance in vector_results:
             chunk = await self.chunk_repository.get(chunk_id)
             if chunk:
-                result = SearchResult(
+                result = SearchResult.from_trusted(
                     chunk_id=chunk_id,
                     content=chunk.content,
                     distance=distance,
-                    score=1.0 / (1.0 + distance),  # Convert distance to similarity score
                     metadata=chunk.metadata
                 )
                 results.append(result)
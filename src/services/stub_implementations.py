@@ -1,3 +1,4 @@
+from dataclasses import replace
 from datetime import datetime
 from typing import Any, Optional
 from uuid import UUID, uuid4
@@ -71,19 +72,20 @@ class StubLibraryService(ILibraryService):
         if not library:
             return None
 
+        changes: dict[str, Any] = {"updated_at": datetime.utcnow()}
         if name and name != library.name:
             # Check for duplicate names
             for lib in self._libraries.values():
                 if lib.name == name and lib.id != library_id:
                     raise ConflictError(f"Library with name '{name}' already exists")
-            library.name = name
+            changes["name"] = name
 
         if description is not None:
-            library.description = description
+            changes["description"] = description
         if metadata is not None:
-            library.metadata = metadata
+            changes["metadata"] = metadata
 
-        library.updated_at = datetime.utcnow()
+        library = self._libraries[library_id] = library.model_copy(update=changes)
         return library
 
     async def delete_library(self, library_id: UUID) -> bool:
@@ -174,14 +176,15 @@ class StubChunkService(IChunkService):
         if not chunk:
             return None
 
+        changes: dict[str, Any] = {"updated_at": datetime.utcnow()}
         if content is not None:
-            chunk.content = content
+            changes["content"] = content
         if embedding is not None:
-            chunk.embedding = embedding
+            changes["embedding"] = embedding
         if metadata is not None:
-            chunk.metadata = metadata
+            changes["metadata"] = metadata
 
-        chunk.updated_at = datetime.utcnow()
+        chunk = self._chunks[chunk_id] = replace(chunk, **changes)
         return chunk
 
     async def delete_chunk(self, chunk_id: UUID) -> bool:
@@ -143,3 +143,146 @@ async def test_persistence_manager_snapshot_cleanup():
         assert len(snapshots) <= 5  # Default keep count
 
         await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_persistence_manager_coalesces_checkpoints():
+    """Test a burst of operations never runs overlapping checkpoints."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+
+        manager = PersistenceManager(
+            wal=FileWAL(tmppath / "wal"),
+            snapshot_manager=FileSnapshotManager(tmppath / "snapshots"),
+            auto_checkpoint_interval=2
+        )
+        await manager.initialize()
+
+        in_flight = 0
+        peak = 0
+        checkpoint = manager.wal.checkpoint
+
+        async def tracked_checkpoint():
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            try:
+                await asyncio.sleep(0.01)
+                return await checkpoint()
+            finally:
+                in_flight -= 1
+
+        manager.wal.checkpoint = tracked_checkpoint
+
+        await asyncio.gather(*(
+            manager.log_operation(OperationType.CREATE_CHUNK, uuid4(), {"index": i})
+            for i in range(20)
+        ))
+        await asyncio.sleep(0.05)
+
+        assert peak == 1
+        assert manager.operations_since_checkpoint < 20
+
+        await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_persistence_manager_group_commit():
+    """Test concurrent operations are written in shared WAL batches."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+
+        manager = PersistenceManager(
+            wal=FileWAL(tmppath / "wal"),
+            snapshot_manager=FileSnapshotManager(tmppath / "snapshots")
+        )
+        await manager.initialize()
+
+        batch_sizes = []
+        append_batch = manager.wal.append_batch
+
+        async def tracked_append_batch(entries):
+            batch_sizes.append(len(entries))
+            return await append_batch(entries)
+
+        manager.wal.append_batch = tracked_append_batch
+
+        sequences = await asyncio.gather(*(
+            manager.log_operation(OperationType.CREATE_CHUNK, uuid4(), {"index": i})
+            for i in range(10)
+        ))
+
+        assert sorted(sequences) == list(range(1, 11))
+        assert sum(batch_sizes) == 10
+        assert len(batch_sizes) < 10
+
+        await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_persistence_manager_flusher_cancel_fails_pending():
+    """Test cancelling the flusher fails queued operations instead of hanging."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+
+        manager = PersistenceManager(
+            wal=FileWAL(tmppath / "wal"),
+            snapshot_manager=FileSnapshotManager(tmppath / "snapshots")
+        )
+        await manager.initialize()
+
+        started = asyncio.Event()
+
+        async def blocked_append_batch(entries):
+            started.set()
+            await asyncio.Event().wait()
+
+        manager.wal.append_batch = blocked_append_batch
+
+        in_flight = asyncio.create_task(
+            manager.log_operation(OperationType.CREATE_CHUNK, uuid4(), {})
+        )
+        await started.wait()
+        queued = asyncio.create_task(
+            manager.log_operation(OperationType.CREATE_CHUNK, uuid4(), {})
+        )
+        await asyncio.sleep(0)
+
+        manager._wal_flusher_task.cancel()
+        results = await asyncio.wait_for(
+            asyncio.gather(in_flight, queued, return_exceptions=True), timeout=1
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert manager._wal_queue.empty()
+
+        del manager.wal.append_batch
+        await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_persistence_manager_logs_directly_once_flusher_stops():
+    """Test operations logged while the flusher is being stopped still reach the WAL."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmppath = Path(tmpdir)
+
+        manager = PersistenceManager(
+            wal=FileWAL(tmppath / "wal"),
+            snapshot_manager=FileSnapshotManager(tmppath / "snapshots")
+        )
+        await manager.initialize()
+        await manager.log_operation(OperationType.CREATE_CHUNK, uuid4(), {})
+
+        # Runs inside shutdown, after the flusher was cancelled but before
+        # the cancellation was delivered to it
+        late = []
+        create_checkpoint = manager.create_checkpoint
+
+        async def checkpoint_after_late_operation():
+            late.append(await manager.log_operation(OperationType.CREATE_CHUNK, uuid4(), {}))
+            return await create_checkpoint()
+
+        manager.create_checkpoint = checkpoint_after_late_operation
+        await manager.shutdown()
+
+        assert late == [2]
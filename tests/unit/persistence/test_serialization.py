@@ -1,11 +1,15 @@
 """Tests for serialization utilities."""
+import json
 from datetime import datetime
 from uuid import uuid4
 
 import numpy as np
+import pytest
 
-from src.domain.entities.library import IndexType
+from src.domain.entities.chunk import Chunk
+from src.domain.entities.library import IndexType, Library
 from src.infrastructure.persistence.serialization.serializers import (
+   ExtendedJSONEncoder,
    MessagePackSerializer,
    StateSerializer,
    VectorSerializer,
@@ -43,6 +47,47 @@ def test_messagepack_serializer():
    assert deserialized["enum"] == custom_data["enum"]
 
 
+def test_entities_decode_to_instances():
+   """Test encoded entities come back as entity instances, fields intact."""
+   library = Library(name="lib", dimension=8, index_type=IndexType.LSH).model_copy(
+      update={"updated_at": datetime(2020, 1, 1)}
+   )
+   chunk = Chunk(id=uuid4(), library_id=library.id, content="text", embedding=[0.5, 1.0])
+
+   decoded = MessagePackSerializer.decode(MessagePackSerializer.encode({"l": library, "c": chunk}))
+
+   assert isinstance(decoded["l"], Library)
+   assert decoded["l"].model_dump() == library.model_dump()
+   assert isinstance(decoded["c"], Chunk)
+   assert decoded["c"] == chunk
+
+   # Left encoded on request, with the fields inside still decoded
+   raw = MessagePackSerializer.decode(
+      MessagePackSerializer.encode({"l": library}), restore_entities=False
+   )
+   assert raw["l"]["__entity__"] and raw["l"]["class"] == "Library"
+   assert raw["l"]["data"]["id"] == library.id
+   assert raw["l"]["data"]["index_type"] == IndexType.LSH
+
+
+def test_ndarray_encoding_uses_raw_buffer():
+   """Test arrays are encoded as raw bytes and restored with dtype and shape."""
+   array = np.arange(12, dtype=np.float32).reshape(3, 4)[:, ::2]
+
+   encoded = MessagePackSerializer._encode_custom(array)
+   assert isinstance(encoded["data"], bytes)
+
+   deserialized = MessagePackSerializer.decode(MessagePackSerializer.encode({"a": array}))
+   assert deserialized["a"].dtype == np.float32
+   assert np.array_equal(deserialized["a"], array)
+
+   restored = json.loads(
+       json.dumps({"a": array}, cls=ExtendedJSONEncoder),
+       object_hook=ExtendedJSONEncoder.object_hook
+   )
+   assert np.array_equal(restored["a"], array)
+
+
 def test_vector_serializer():
    """Test vector serialization."""
    vectors = [
@@ -59,9 +104,65 @@ def test_vector_serializer():
    for orig, deser in zip(vectors, deserialized):
        assert np.allclose(orig, deser)
 
+   # Layout is an int32 (count, dim) header followed by float32 rows
+   float64_vectors = [np.arange(4, dtype=np.float64), np.ones(4)]
+   raw = VectorSerializer.serialize_vectors(float64_vectors)
+   assert raw == np.array([2, 4], dtype=np.int32).tobytes() + np.vstack(float64_vectors).astype(np.float32).tobytes()
+   assert VectorSerializer.serialize_vectors_buffer(float64_vectors) == raw
+
+   # The matrix form comes back directly; a stacked input is accepted as is
+   matrix = VectorSerializer.deserialize_vectors(serialized)
+   assert matrix.shape == (10, 128)
+   assert VectorSerializer.serialize_vectors(np.stack(vectors)) == serialized
+   assert len(VectorSerializer.deserialize_vectors_as_list(serialized)) == len(vectors)
+
    empty_serialized = VectorSerializer.serialize_vectors([])
    empty_deserialized = VectorSerializer.deserialize_vectors(empty_serialized)
-   assert empty_deserialized == []
+   assert len(empty_deserialized) == 0
+
+   # An empty matrix keeps its dimension
+   empty_matrix = VectorSerializer.deserialize_vectors(
+       VectorSerializer.serialize_vectors(np.empty((0, 128), dtype=np.float32), quantization="int8")
+   )
+   assert empty_matrix.shape == (0, 128)
+
+
+def test_state_serializer_round_trips_empty_vectors():
+   """Test empty vector entries come back as before, with a matrix's dimension kept."""
+   state = {
+       "chunk_vectors": [],
+       "library_vectors": np.empty((0, 64), dtype=np.float32)
+   }
+
+   restored = StateSerializer.deserialize_state(StateSerializer.serialize_state(state))
+
+   assert restored["chunk_vectors"] == []
+   assert restored["library_vectors"].shape == (0, 64)
+
+
+def test_vector_serializer_quantization():
+   """Test fp16 and int8 blobs shrink the payload and decode to float32."""
+   vectors = [np.random.randn(64).astype(np.float32) for _ in range(20)]
+   vectors.append(np.zeros(64, dtype=np.float32))
+   full = VectorSerializer.serialize_vectors(vectors)
+
+   for quantization, max_size, tolerance in (("fp16", len(full) // 2 + 8, 1e-2), ("int8", len(full) // 3, 5e-2)):
+       blob = VectorSerializer.serialize_vectors(vectors, quantization=quantization)
+       assert len(blob) <= max_size
+
+       restored = VectorSerializer.deserialize_vectors(blob)
+       assert len(restored) == len(vectors)
+       for orig, deser in zip(vectors, restored):
+           assert deser.dtype == np.float32
+           assert np.allclose(orig, deser, atol=tolerance * np.abs(orig).max(initial=1))
+
+   state = StateSerializer.deserialize_state(
+       StateSerializer.serialize_state({"chunk_vectors": vectors}, quantization="int8")
+   )
+   assert len(state["chunk_vectors"]) == len(vectors)
+
+   with pytest.raises(ValueError):
+       VectorSerializer.serialize_vectors(vectors, quantization="bf16")
 
 
 def test_state_serializer():
@@ -94,3 +195,17 @@ def test_state_serializer():
    assert len(deserialized["chunk_vectors"]) == len(state["chunk_vectors"])
    for orig, deser in zip(state["chunk_vectors"], deserialized["chunk_vectors"]):
        assert np.allclose(orig, deser)
+
+
+def test_state_serializer_reads_hex_vectors():
+   """Test states written with hex-encoded vector blobs still load."""
+   vectors = [np.ones(4, dtype=np.float32), np.zeros(4, dtype=np.float32)]
+   legacy = MessagePackSerializer.encode({
+       "data": {"name": "legacy"},
+       "vectors": {"chunk_vectors": VectorSerializer.serialize_vectors(vectors).hex()},
+       "version": "1.0"
+   })
+
+   state = StateSerializer.deserialize_state(legacy)
+   assert state["name"] == "legacy"
+   assert all(np.array_equal(a, b) for a, b in zip(state["chunk_vectors"], vectors))
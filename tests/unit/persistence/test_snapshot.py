@@ -1,9 +1,13 @@
 """Tests for Snapshot Manager."""
+import gzip
 import tempfile
+import threading
 from pathlib import Path
 
+import numpy as np
 import pytest
 
+from src.infrastructure.persistence.serialization.serializers import StateSerializer
 from src.infrastructure.persistence.snapshot.file_snapshot import FileSnapshotManager
 
 
@@ -78,3 +82,175 @@ async def test_snapshot_compression():
 
        assert await compressed_mgr.load_snapshot(compressed_meta.snapshot_id) == large_state
        assert await uncompressed_mgr.load_snapshot(uncompressed_meta.snapshot_id) == large_state
+
+
+@pytest.mark.asyncio
+async def test_snapshot_chunked_checksum():
+   """Test multi-chunk snapshots round-trip and corruption is detected."""
+   with tempfile.TemporaryDirectory() as tmpdir:
+       snapshot_mgr = FileSnapshotManager(Path(tmpdir))
+       snapshot_mgr.WRITE_CHUNK_SIZE = 64
+
+       state = {"data": [f"value-{i}" for i in range(500)]}
+       metadata = await snapshot_mgr.create_snapshot(1, state)
+       assert await snapshot_mgr.load_snapshot(metadata.snapshot_id) == state
+
+       snapshot_file = Path(tmpdir) / f"{metadata.snapshot_id}.msgpack.gz"
+       contents = bytearray(snapshot_file.read_bytes())
+       contents[-10] ^= 0xFF
+       snapshot_file.write_bytes(bytes(contents))
+
+       with pytest.raises(ValueError, match="checksum mismatch"):
+           await snapshot_mgr.load_snapshot(metadata.snapshot_id)
+
+       # Damage inside the deflate stream is still reported as a mismatch
+       contents[-10] ^= 0xFF
+       contents[len(contents) // 2:len(contents) // 2 + 16] = b"\xff" * 16
+       snapshot_file.write_bytes(bytes(contents))
+
+       with pytest.raises(ValueError, match="checksum mismatch"):
+           await snapshot_mgr.load_snapshot(metadata.snapshot_id)
+
+
+@pytest.mark.asyncio
+async def test_incremental_snapshot_chain_and_compaction():
+   """Test deltas apply over their base and survive cleanup of the base."""
+   with tempfile.TemporaryDirectory() as tmpdir:
+       snapshot_mgr = FileSnapshotManager(Path(tmpdir))
+
+       base = await snapshot_mgr.create_snapshot(
+           1, {"libraries": {"a": 1}, "documents": {"d": 1}, "stale": True}
+       )
+       delta1 = await snapshot_mgr.create_incremental_snapshot(
+           base.snapshot_id, 2, {"libraries": {"a": 2}}, deleted_keys=["stale"]
+       )
+       delta2 = await snapshot_mgr.create_incremental_snapshot(
+           delta1.snapshot_id, 3, {"documents": {"d": 3}}
+       )
+
+       expected = {"libraries": {"a": 2}, "documents": {"d": 3}}
+       assert await snapshot_mgr.load_snapshot(delta2.snapshot_id) == expected
+       assert (await snapshot_mgr.get_latest_snapshot()).parent_id == delta1.snapshot_id
+
+       assert await snapshot_mgr.cleanup_old_snapshots(keep_count=1) == 2
+
+       compacted = await snapshot_mgr.get_latest_snapshot()
+       assert compacted.snapshot_id == delta2.snapshot_id
+       assert compacted.parent_id is None
+       assert await snapshot_mgr.load_snapshot(delta2.snapshot_id) == expected
+
+
+@pytest.mark.asyncio
+async def test_snapshot_metadata_index():
+   """Test listing reads the single index file and rebuilds it when missing."""
+   with tempfile.TemporaryDirectory() as tmpdir:
+       snapshot_mgr = FileSnapshotManager(Path(tmpdir))
+       first = await snapshot_mgr.create_snapshot(1, {"n": 1})
+       second = await snapshot_mgr.create_snapshot(2, {"n": 2})
+       await snapshot_mgr.delete_snapshot(first.snapshot_id)
+
+       # A fresh manager lists from the index without touching the .meta files
+       for meta_file in Path(tmpdir).glob("*.meta"):
+           meta_file.unlink()
+       reopened = FileSnapshotManager(Path(tmpdir))
+       assert [s.snapshot_id for s in await reopened.list_snapshots()] == [second.snapshot_id]
+       assert await reopened.load_snapshot(second.snapshot_id) == {"n": 2}
+
+       # Without the index, the .meta scan is the fallback and rewrites it
+       third = await reopened.create_snapshot(3, {"n": 3})
+       (Path(tmpdir) / "index.msgpack").unlink()
+       rescanned = FileSnapshotManager(Path(tmpdir))
+       assert [s.snapshot_id for s in await rescanned.list_snapshots()] == [third.snapshot_id]
+       assert (Path(tmpdir) / "index.msgpack").exists()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_multi_frame_compression():
+   """Test states spanning several gzip members round-trip and stay gzip-readable."""
+   with tempfile.TemporaryDirectory() as tmpdir:
+       snapshot_mgr = FileSnapshotManager(Path(tmpdir))
+       snapshot_mgr.COMPRESS_FRAME_SIZE = 1024
+
+       state = {"data": [f"value-{i}" for i in range(5000)]}
+       metadata = await snapshot_mgr.create_snapshot(1, state)
+       assert await snapshot_mgr.load_snapshot(metadata.snapshot_id) == state
+
+       snapshot_file = Path(tmpdir) / f"{metadata.snapshot_id}.msgpack.gz"
+       members = snapshot_file.read_bytes().count(b"\x1f\x8b\x08")
+       assert members > 1
+       assert StateSerializer.deserialize_state(gzip.decompress(snapshot_file.read_bytes())) == state
+
+
+@pytest.mark.asyncio
+async def test_snapshot_vectors_in_sibling_file():
+   """Test vector entries are stored in their own shuffled, compressed file."""
+   with tempfile.TemporaryDirectory() as tmpdir:
+       snapshot_mgr = FileSnapshotManager(Path(tmpdir))
+       vectors = np.random.default_rng(0).standard_normal((200, 32)).astype(np.float32)
+       state = {"libraries": {"a": 1}, "chunk_vectors": list(vectors), "empty_vectors": []}
+
+       metadata = await snapshot_mgr.create_snapshot(1, state)
+       vector_file = Path(tmpdir) / f"{metadata.snapshot_id}.vec"
+       assert metadata.vectors_checksum and vector_file.exists()
+       assert vector_file.stat().st_size < vectors.nbytes
+
+       loaded = await snapshot_mgr.load_snapshot(metadata.snapshot_id)
+       assert loaded["libraries"] == {"a": 1}
+       assert np.array_equal(loaded["chunk_vectors"], vectors)
+       assert len(loaded["empty_vectors"]) == 0
+
+       contents = bytearray(vector_file.read_bytes())
+       contents[-5] ^= 0xFF
+       vector_file.write_bytes(bytes(contents))
+       with pytest.raises(ValueError, match="checksum mismatch"):
+           await snapshot_mgr.load_snapshot(metadata.snapshot_id)
+
+       await snapshot_mgr.delete_snapshot(metadata.snapshot_id)
+       assert not vector_file.exists()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_uncompressed_vectors_outlive_mapping():
+   """Test vectors loaded from an uncompressed vector file own their memory."""
+   with tempfile.TemporaryDirectory() as tmpdir:
+       snapshot_mgr = FileSnapshotManager(Path(tmpdir), use_compression=False)
+       vectors = np.random.default_rng(1).standard_normal((50, 8)).astype(np.float32)
+
+       metadata = await snapshot_mgr.create_snapshot(1, {"chunk_vectors": list(vectors)})
+       loaded = await snapshot_mgr.load_snapshot(metadata.snapshot_id)
+
+       await snapshot_mgr.delete_snapshot(metadata.snapshot_id)
+       assert np.array_equal(loaded["chunk_vectors"], vectors)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_compressed_load_verifies_before_unpacking(monkeypatch):
+   """Test compressed contents are unpacked only once verified, off the event loop."""
+   with tempfile.TemporaryDirectory() as tmpdir:
+       snapshot_mgr = FileSnapshotManager(Path(tmpdir))
+       state = {"data": [f"value-{i}" for i in range(500)]}
+       metadata = await snapshot_mgr.create_snapshot(1, state)
+
+       restored_on = []
+       restore_contents = FileSnapshotManager._restore_contents
+       monkeypatch.setattr(
+           FileSnapshotManager, "_restore_contents",
+           staticmethod(lambda contents: restored_on.append(threading.current_thread())
+                        or restore_contents(contents))
+       )
+       assert await snapshot_mgr.load_snapshot(metadata.snapshot_id) == state
+       assert restored_on and restored_on[0] is not threading.main_thread()
+
+       unpacked = []
+       monkeypatch.setattr(
+           FileSnapshotManager, "_inflate_and_unpack",
+           lambda self, data: unpacked.append(data)
+       )
+       snapshot_file = Path(tmpdir) / f"{metadata.snapshot_id}.msgpack.gz"
+       contents = bytearray(snapshot_file.read_bytes())
+       contents[-10] ^= 0xFF
+       snapshot_file.write_bytes(bytes(contents))
+
+       with pytest.raises(ValueError, match="checksum mismatch"):
+           await snapshot_mgr.load_snapshot(metadata.snapshot_id)
+       assert unpacked == []
@@ -1,12 +1,16 @@
 """Tests for Write-Ahead Log."""
 
+import asyncio
+import json
+import os
 import tempfile
 from pathlib import Path
 from uuid import uuid4
 
 import pytest
 
-from src.infrastructure.persistence.wal.file_wal import FileWAL
+from src.infrastructure.persistence.wal import file_wal
+from src.infrastructure.persistence.wal.file_wal import FileWAL, _SegmentWriter
 from src.infrastructure.persistence.wal.interface import OperationType
 
 
@@ -113,3 +117,498 @@ async def test_wal_recovery():
         assert seq == 4
 
         await wal2.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_append_batch_across_segments():
+    """Test a batch append assigns consecutive sequences and rotates segments."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir), segment_size=512)
+        await wal.initialize()
+
+        sequences = await wal.append_batch([
+            (OperationType.CREATE_CHUNK, uuid4(), {"index": i})
+            for i in range(10)
+        ])
+        assert sequences == list(range(1, 11))
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.data["index"] for e in entries] == list(range(10))
+        assert len(list(Path(tmpdir).glob("wal_*.log"))) > 1
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_group_commit_batches_fsyncs(monkeypatch):
+    """Test concurrent appends share writes and fsyncs but keep their own sequences."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+
+        fsyncs = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+
+        results = await asyncio.gather(*(
+            wal.append(OperationType.CREATE_CHUNK, uuid4(), {"index": i})
+            for i in range(50)
+        ))
+
+        assert sorted(results) == list(range(1, 51))
+        assert 1 <= len(fsyncs) < 50
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.data["index"] for e in entries] == [
+            i for _, i in sorted(zip(results, range(50)))
+        ]
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_async_durability_defers_fsync(monkeypatch):
+    """Test async durability buffers appends and only fsyncs at checkpoint."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir), durability="async", flush_interval_ms=10)
+        await wal.initialize()
+
+        fsyncs = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+
+        for i in range(5):
+            await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"index": i})
+        assert fsyncs == []
+
+        # Buffered entries reach the segment through the background flusher
+        segment = next(Path(tmpdir).glob("wal_*.log"))
+        await asyncio.sleep(0.05)
+        assert segment.stat().st_size > len(FileWAL.MAGIC_HEADER)
+        assert len(await wal.read(from_sequence=0)) == 5
+
+        await wal.checkpoint()
+        assert len(fsyncs) == 1
+
+        await wal.close()
+
+        with pytest.raises(ValueError):
+            FileWAL(Path(tmpdir), durability="never")
+
+
+@pytest.mark.asyncio
+async def test_segment_writer_flushes_full_buffer_in_background(monkeypatch):
+    """Test a full buffer is written out while later writes keep buffering."""
+    monkeypatch.setattr(_SegmentWriter, "FLUSH_THRESHOLD", 16)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "segment"
+        writer = _SegmentWriter.open(path, truncate=True)
+
+        writer.write(b"a" * 16)
+        inflight = writer._inflight
+        assert inflight is not None
+        second = memoryview(bytearray(b"b" * 16))
+        writer.write(second)
+        # Only one write in flight at a time: the second buffer waits,
+        # referenced rather than copied
+        assert writer._inflight is inflight and writer._buffered == 16
+        assert writer._chunks == [second] and writer._chunks[0] is second
+
+        await inflight
+        writer.write(b"c")
+        await writer.close()
+
+        assert path.read_bytes() == b"a" * 16 + b"b" * 16 + b"c"
+
+
+@pytest.mark.asyncio
+async def test_wal_reads_legacy_segments_and_skips_corrupt_entries():
+    """Test VECWAL01 segments stay readable and CRC mismatches are dropped."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        body = json.dumps({
+            "operation_type": OperationType.CREATE_CHUNK.value,
+            "resource_id": str(uuid4()),
+            "timestamp": "2024-01-01T00:00:00+00:00",
+            "data": {"index": 0}
+        }).encode()
+        legacy = FileWAL.LEGACY_ENTRY_HEADER.pack(1, 0, len(body), b"0" * 16)
+        (Path(tmpdir) / "wal_00000000.log").write_bytes(
+            FileWAL.LEGACY_MAGIC_HEADER + legacy + body
+        )
+
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+        # Appends go to a fresh segment rather than into the old format
+        assert wal.current_segment == 1
+        await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"index": 1})
+        await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"index": 2})
+        await wal.close()
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.data["index"] for e in entries] == [0, 1, 2]
+
+        # Flip a byte in the first new entry's body
+        segment = Path(tmpdir) / "wal_00000001.log"
+        raw = bytearray(segment.read_bytes())
+        raw[len(FileWAL.MAGIC_HEADER) + FileWAL.ENTRY_HEADER_SIZE + 2] ^= 0xFF
+        segment.write_bytes(raw)
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.data["index"] for e in entries] == [0, 2]
+
+        # And one in the second entry's timestamp, which the CRC also covers
+        first_len = FileWAL.ENTRY_HEADER.unpack_from(raw, len(FileWAL.MAGIC_HEADER))[2]
+        second = len(FileWAL.MAGIC_HEADER) + FileWAL.ENTRY_HEADER_SIZE + first_len
+        raw[second + 4] ^= 0xFF
+        segment.write_bytes(raw)
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.data["index"] for e in entries] == [0]
+
+
+@pytest.mark.asyncio
+async def test_wal_stores_operation_codes_and_reads_named_operations(monkeypatch):
+    """Test bodies carry small-int operation codes; older named ones still read."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+
+        # An entry as written before operation codes: the enum value itself
+        with monkeypatch.context() as patch:
+            patch.setattr(
+                file_wal, "_OPERATION_CODES", {op: op.value for op in OperationType}
+            )
+            await wal.append(OperationType.DELETE_DOCUMENT, uuid4(), {"index": 0})
+        await wal.append(OperationType.DELETE_DOCUMENT, uuid4(), {"index": 1})
+        await wal.close()
+
+        raw = wal.current_file_path.read_bytes()
+        first_len = FileWAL.ENTRY_HEADER.unpack_from(raw, len(FileWAL.MAGIC_HEADER))[2]
+        second = len(FileWAL.MAGIC_HEADER) + FileWAL.ENTRY_HEADER_SIZE + first_len
+        assert FileWAL.ENTRY_HEADER.unpack_from(raw, second)[2] < first_len
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.operation_type for e in entries] == [OperationType.DELETE_DOCUMENT] * 2
+        assert [e.data["index"] for e in entries] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_wal_scratch_buffer_grows_and_is_handed_over():
+    """Test entries larger than the scratch buffer grow it once and round-trip."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+        initial = len(wal._scratch)
+
+        payload = "x" * (initial * 2)
+        await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"text": payload})
+        scratch = wal._scratch
+        assert len(scratch) > initial
+
+        # The written buffer went to the segment writer without a copy; its
+        # replacement keeps the grown size
+        await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"text": "small"})
+        assert wal._scratch is not scratch and len(wal._scratch) == len(scratch)
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.data["text"] for e in entries] == [payload, "small"]
+        assert all(len(e.checksum) == 8 for e in entries)
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_async_appends_reserve_sequences_without_waiting(monkeypatch):
+    """Test async appends return at once until the queue limit applies."""
+    monkeypatch.setattr(FileWAL, "MAX_PENDING_ENTRIES", 3)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir), durability="async")
+        await wal.initialize()
+
+        first = await wal.append_batch([
+            (OperationType.CREATE_CHUNK, uuid4(), {"index": i}) for i in range(3)
+        ])
+        # Sequences are handed out before the writer has run
+        assert first == [1, 2, 3]
+        assert wal._pending_entries == 3
+
+        # The queue is full, so this append waits until its group is written
+        assert await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"index": 3}) == 4
+        assert wal._pending_entries == 0
+
+        assert await wal.checkpoint() == 4
+        entries = await wal.read(from_sequence=0)
+        assert [e.sequence_number for e in entries] == [1, 2, 3, 4]
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_partial_truncate_of_current_segment_keeps_appending():
+    """Test appends after rewriting the current segment land in the new file."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+
+        await wal.append_batch([
+            (OperationType.CREATE_CHUNK, uuid4(), {"index": i}) for i in range(600)
+        ])
+        await wal.truncate(500)
+        await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"index": 600})
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.sequence_number for e in entries] == list(range(501, 602))
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_read_decodes_only_requested_entries(monkeypatch):
+    """Test entries before from_sequence are skipped without being decoded."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+        await wal.append_batch([
+            (OperationType.CREATE_CHUNK, uuid4(), {"index": i}) for i in range(10)
+        ])
+
+        decoded = []
+        real_decode = FileWAL._decode_body
+        monkeypatch.setattr(
+            FileWAL, "_decode_body",
+            staticmethod(lambda data: decoded.append(data) or real_decode(data))
+        )
+
+        entries = await wal.read(from_sequence=8)
+        assert [e.data["index"] for e in entries] == [7, 8, 9]
+        assert len(decoded) == 3
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_segment_ranges_skip_unneeded_segments(monkeypatch):
+    """Test reads and truncation only parse segments the sequence falls in."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir), segment_size=512)
+        await wal.initialize()
+        await wal.append_batch([
+            (OperationType.CREATE_CHUNK, uuid4(), {"index": i}) for i in range(20)
+        ])
+        await wal.close()
+
+        # Ranges are rebuilt from entry headers on recovery
+        wal = FileWAL(Path(tmpdir), segment_size=512)
+        await wal.initialize()
+        ranges = sorted(wal._segment_ranges.values())
+        assert len(ranges) > 2 and ranges[0][0] == 1 and ranges[-1][1] == 20
+
+        parsed = []
+        real_parse = FileWAL._parse_segment
+        monkeypatch.setattr(
+            FileWAL, "_parse_segment",
+            lambda self, path, *args: parsed.append(path) or real_parse(self, path, *args)
+        )
+
+        entries = await wal.read(from_sequence=20)
+        assert [e.sequence_number for e in entries] == [20]
+        assert len(parsed) == 1
+
+        parsed.clear()
+        await wal.truncate(ranges[1][1])
+        assert parsed == []
+        assert wal._segments == sorted(Path(tmpdir).glob("wal_*.log"))
+
+        # The segment list is kept in memory; reads never list the directory
+        monkeypatch.setattr(Path, "glob", lambda *args: pytest.fail("globbed"))
+        entries = await wal.read(from_sequence=0)
+        assert entries[0].sequence_number == ranges[2][0]
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_recovery_reads_ranges_from_segment_sidecars(monkeypatch):
+    """Test sealed segments are indexed by sidecar files, not rescanned."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir), segment_size=512)
+        await wal.initialize()
+        await wal.append_batch([
+            (OperationType.CREATE_CHUNK, uuid4(), {"index": i}) for i in range(20)
+        ])
+        ranges = dict(wal._segment_ranges)
+        await wal.close()
+
+        # Every segment but the open one has a sidecar
+        segments = sorted(Path(tmpdir).glob("wal_*.log"))
+        assert sorted(p.stem for p in Path(tmpdir).glob("wal_*.idx")) == [
+            p.stem for p in segments[:-1]
+        ]
+
+        scanned = []
+        real_scan = FileWAL._scan_segment_range
+        monkeypatch.setattr(
+            FileWAL, "_scan_segment_range",
+            lambda self, path: scanned.append(path) or real_scan(self, path)
+        )
+
+        # A sidecar that no longer matches its segment's size is ignored
+        with open(segments[0], "ab") as f:
+            f.write(bytes(FileWAL.ENTRY_HEADER_SIZE))
+        wal = FileWAL(Path(tmpdir), segment_size=512)
+        await wal.initialize()
+        assert wal._segment_ranges == ranges
+        assert scanned == [segments[0], segments[-1]]
+        assert wal.current_sequence == 20
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_oversized_entries_do_not_leave_empty_segments():
+    """Test an entry larger than a segment gets a segment of its own, once."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir), segment_size=256)
+        await wal.initialize()
+
+        for i in range(3):
+            await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"text": "x" * 512})
+
+        segments = sorted(Path(tmpdir).glob("wal_*.log"))
+        assert len(segments) == 3
+        assert all(s.stat().st_size > 512 for s in segments)
+        assert len(await wal.read(from_sequence=0)) == 3
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_truncate_punches_prefix_in_place():
+    """Test a partial truncate releases the prefix without rewriting the segment."""
+    if file_wal._fallocate is None:
+        pytest.skip("fallocate hole punching is Linux-only")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+        await wal.append_batch([
+            (OperationType.CREATE_CHUNK, uuid4(), {"text": "x" * 1024}) for _ in range(100)
+        ])
+
+        segment = wal.current_file_path
+        size = segment.stat().st_size
+        inode = segment.stat().st_ino
+        await wal.truncate(90)
+
+        # Same file, same size, only the tail left to read
+        assert segment.stat().st_ino == inode and segment.stat().st_size == size
+        assert wal._segment_ranges[segment] == (91, 100)
+        await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"text": "y"})
+        entries = await wal.read(from_sequence=0)
+        assert [e.sequence_number for e in entries] == list(range(91, 102))
+
+        await wal.close()
+
+        # The padding is passed over when ranges are rebuilt
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+        assert wal._segment_ranges[segment] == (91, 101)
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_truncate_rewrite_decodes_only_surviving_entries(monkeypatch):
+    """Test truncating without hole punching decodes just the kept entries."""
+    monkeypatch.setattr(file_wal, "_fallocate", None)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+        await wal.append_batch([
+            (OperationType.CREATE_CHUNK, uuid4(), {"index": i}) for i in range(10)
+        ])
+
+        decoded = []
+        real_decode = FileWAL._decode_body
+        monkeypatch.setattr(
+            FileWAL, "_decode_body",
+            staticmethod(lambda data: decoded.append(data) or real_decode(data))
+        )
+
+        await wal.truncate(7)
+        assert len(decoded) == 3
+        assert wal._segment_ranges[wal.current_file_path] == (8, 10)
+        entries = await wal.read(from_sequence=0)
+        assert [e.data["index"] for e in entries] == [7, 8, 9]
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_truncate_rewrite_keeps_concurrent_appends(monkeypatch):
+    """Test appends committed while the current segment is rewritten survive."""
+    monkeypatch.setattr(file_wal, "_fallocate", None)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        wal = FileWAL(Path(tmpdir))
+        await wal.initialize()
+        await wal.append_batch([
+            (OperationType.CREATE_CHUNK, uuid4(), {"index": i}) for i in range(10)
+        ])
+
+        # An append arrives between reading the segment and rewriting it
+        appended = []
+        real_read_segment = wal._read_segment
+
+        async def read_segment_then_append(segment_file, from_sequence=0):
+            entries = await real_read_segment(segment_file, from_sequence)
+            appended.append(asyncio.create_task(
+                wal.append(OperationType.CREATE_CHUNK, uuid4(), {"index": 10})
+            ))
+            await asyncio.sleep(0.05)
+            return entries
+
+        monkeypatch.setattr(wal, "_read_segment", read_segment_then_append)
+        await wal.truncate(7)
+        monkeypatch.undo()
+        await asyncio.gather(*appended)
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.data["index"] for e in entries] == [7, 8, 9, 10]
+
+        await wal.close()
+
+
+@pytest.mark.asyncio
+async def test_wal_direct_io_round_trip():
+    """Test O_DIRECT segments read back while open and are trimmed on close."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        try:
+            os.close(os.open(Path(tmpdir) / "probe", os.O_WRONLY | os.O_CREAT | os.O_DIRECT))
+        except (AttributeError, OSError):
+            pytest.skip("O_DIRECT is not supported here")
+
+        wal = FileWAL(Path(tmpdir), use_direct_io=True)
+        await wal.initialize()
+        for i in range(3):
+            await wal.append_batch([
+                (OperationType.CREATE_CHUNK, uuid4(), {"index": i * 10 + j}) for j in range(10)
+            ])
+
+        # Open segment: block-padded with zeros, which read as padding
+        segment = wal.current_file_path
+        assert segment.stat().st_size % 4096 == 0
+        assert len(await wal.read(from_sequence=0)) == 30
+
+        await wal.close()
+        logical_size = segment.stat().st_size
+        assert logical_size % 4096 != 0
+
+        # Reopening picks up after the last entry, left padding or not
+        with open(segment, "ab") as f:
+            f.write(bytes(100))
+        wal = FileWAL(Path(tmpdir), use_direct_io=True)
+        await wal.initialize()
+        assert segment.stat().st_size == logical_size
+        assert await wal.append(OperationType.CREATE_CHUNK, uuid4(), {"index": 30}) == 31
+        await wal.close()
+
+        entries = await wal.read(from_sequence=0)
+        assert [e.data["index"] for e in entries] == list(range(31))
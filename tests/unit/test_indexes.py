@@ -114,6 +114,48 @@ class TestLSHIndex:
         assert len(results) == 2
         assert results[0][0] == vec1_id  # Exact match first
 
+    @pytest.mark.asyncio
+    async def test_wide_hash_keys(self, sample_vectors):
+        """Test key sizes above 64 bits are packed into multi-limb keys."""
+        index = LSHIndex(LSHConfig(dimension=8, num_tables=3, key_size=70))
+        await index.add_batch(sample_vectors[:5])
+
+        key = next(iter(index._tables[0]))
+        assert isinstance(key, tuple) and len(key) == 2
+
+        vec_id, vector = sample_vectors[2]
+        results = await index.search(vector, k=1)
+        assert results[0][0] == vec_id
+
+        assert await index.remove(vec_id) is True
+        assert index.size == 4
+
+    @pytest.mark.asyncio
+    async def test_search_in_executor(self, index, sample_vectors, monkeypatch):
+        """Test searches off the event loop return the same results."""
+        await index.add_batch(sample_vectors)
+        inline = await index.search(sample_vectors[3][1], k=3)
+
+        monkeypatch.setattr(LSHIndex, "EXECUTOR_THRESHOLD", 0)
+        assert await index.search(sample_vectors[3][1], k=3) == inline
+
+    @pytest.mark.asyncio
+    async def test_multi_probe(self, sample_vectors):
+        """Test multi-probe visits at least the buckets of a single-probe search."""
+        single = LSHIndex(LSHConfig(dimension=8, num_tables=1, key_size=6))
+        multi = LSHIndex(LSHConfig(dimension=8, num_tables=1, key_size=6, num_probes=6))
+        await single.add_batch(sample_vectors)
+        await multi.add_batch(sample_vectors)
+
+        probes = multi._probe_keys(multi._project_all(sample_vectors[0][1]))
+        assert len(probes) == 1 and len(probes[0]) == 6
+
+        for _, vector in sample_vectors:
+            single_results = await single.search(vector, k=10)
+            multi_results = await multi.search(vector, k=10)
+            assert len(multi_results) >= len(single_results)
+            assert multi_results[0] == single_results[0]
+
 
 class TestHNSWIndex:
     """Test cases for HNSW index."""
@@ -259,12 +301,16 @@ class TestKDTreeIndex:
         await index.add_batch(sample_vectors)
 
         # Check tree properties
-        assert index._root is not None
-        assert not index._root.is_leaf  # Root should be internal node with enough data
+        assert len(index._split_dim) > 0
+        assert index._split_dim[0] >= 0  # Root should be internal node with enough data
+
+        # Check bounds are set and children sit at 2i+1 / 2i+2
+        assert np.all(index._min_bound[0] <= index._max_bound[0])
+        assert np.all(index._min_bound[0] <= index._min_bound[1])
+        assert np.all(index._max_bound[0] >= index._max_bound[2])
 
-        # Check bounds are set
-        assert index._root.min_bound is not None
-        assert index._root.max_bound is not None
+        # Every vector lives in exactly one leaf
+        assert np.sum(index._leaf_end - index._leaf_start) == len(sample_vectors)
 
     @pytest.mark.asyncio
     async def test_random_projection(self, index):
@@ -286,6 +332,55 @@ class TestKDTreeIndex:
             results = await index.search(vector, k=1)
             assert results[0][0] == vec_id
 
+    @pytest.mark.asyncio
+    async def test_rebuild_in_executor(self, index, sample_vectors, monkeypatch):
+        """Test a rebuild run in the thread pool builds the same tree."""
+        await index.add_batch(sample_vectors)
+        split_dim = index._split_dim.copy()
+
+        monkeypatch.setattr(KDTreeIndex, "EXECUTOR_THRESHOLD", 0)
+        await index._rebuild_tree()
+
+        assert np.array_equal(index._split_dim, split_dim)
+        results = await index.search(sample_vectors[2][1], k=1)
+        assert results[0][0] == sample_vectors[2][0]
+
+    @pytest.mark.asyncio
+    async def test_search_with_filter(self, index, sample_vectors):
+        """Test filtered search only returns allowed ids."""
+        await index.add_batch(sample_vectors)
+
+        filter_ids = frozenset(sample_vectors[i][0] for i in [1, 3, 5, 7])
+        results = await index.search(sample_vectors[5][1], k=3, filter_ids=filter_ids)
+
+        assert len(results) == 3
+        assert results[0][0] == sample_vectors[5][0]
+        assert all(vec_id in filter_ids for vec_id, _ in results)
+
+    @pytest.mark.asyncio
+    async def test_incremental_insert_and_tombstones(self, sample_vectors):
+        """Test inserts and removals between rebuilds stay searchable."""
+        index = KDTreeIndex(KDTreeConfig(
+            dimension=16, projection_dim=8, leaf_size=2, rebuild_threshold=10.0
+        ))
+        await index.add_batch(sample_vectors[:4])
+        for vec_id, vector in sample_vectors[4:]:
+            await index.add(vec_id, vector)
+
+        # No rebuild happened, so the extra points were placed (and split) incrementally
+        assert index._dirty == len(sample_vectors) - 4
+        assert index._leaf_extra
+
+        removed_id = sample_vectors[3][0]
+        assert await index.remove(removed_id) is True
+
+        for vec_id, vector in sample_vectors:
+            results = await index.search(vector, k=1)
+            if vec_id == removed_id:
+                assert results[0][0] != removed_id
+            else:
+                assert results[0][0] == vec_id
+
     @pytest.mark.asyncio
     async def test_empty_index(self, index):
         """Test searching in empty index."""
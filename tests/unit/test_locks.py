@@ -0,0 +1,157 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from src.infrastructure.locks import LockLevel, LockManager, ReadWriteLock
+
+
+class TestReadWriteLock:
+    """Test cases for the async read-write lock."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_readers(self):
+        """Test readers share the lock."""
+        lock = ReadWriteLock()
+        inside = 0
+        peak = 0
+
+        async def reader():
+            nonlocal inside, peak
+            async with lock.read():
+                inside += 1
+                peak = max(peak, inside)
+                await asyncio.sleep(0.01)
+                inside -= 1
+
+        await asyncio.gather(*(reader() for _ in range(5)))
+        assert peak == 5
+
+    @pytest.mark.asyncio
+    async def test_writer_waits_for_readers(self):
+        """Test a writer is woken once the last reader leaves."""
+        lock = ReadWriteLock()
+        events = []
+
+        async def reader():
+            async with lock.read():
+                await asyncio.sleep(0.01)
+                events.append("read")
+
+        async def writer():
+            await asyncio.sleep(0)
+            async with lock.write():
+                events.append("write")
+
+        await asyncio.wait_for(asyncio.gather(reader(), writer()), timeout=1)
+        assert events == ["read", "write"]
+
+    @pytest.mark.asyncio
+    async def test_fifo_handoff(self):
+        """Test queued readers behind a writer do not overtake it."""
+        lock = ReadWriteLock()
+        events = []
+
+        async def task(name, mode):
+            ctx = lock.write() if mode == "write" else lock.read()
+            async with ctx:
+                events.append(name)
+                await asyncio.sleep(0.01)
+
+        async with lock.write():
+            tasks = [
+                asyncio.create_task(task("r1", "read")),
+                asyncio.create_task(task("w1", "write")),
+                asyncio.create_task(task("r2", "read")),
+            ]
+            await asyncio.sleep(0)
+
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+        assert events == ["r1", "w1", "r2"]
+
+    @pytest.mark.asyncio
+    async def test_release_wakes_only_next_owner(self):
+        """Test a release resolves just the waiters that now own the lock."""
+        lock = ReadWriteLock()
+        loop = asyncio.get_running_loop()
+
+        await lock._acquire_write()
+        waiters = [(kind, loop.create_future()) for kind in (False, False, True, False)]
+        lock._waiters.extend(waiters)
+
+        lock._release_write()
+        assert [f.done() for _, f in waiters] == [True, True, False, False]
+        assert lock._read_count == 2 and not lock._write_locked
+
+        lock._release_read()
+        lock._release_read()
+        assert [f.done() for _, f in waiters] == [True, True, True, False]
+        assert lock._write_locked and lock._read_count == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_block(self):
+        """Test cancelling a queued writer lets later readers through."""
+        lock = ReadWriteLock()
+
+        async def write():
+            async with lock.write():
+                pass
+
+        async def read():
+            async with lock.read():
+                return True
+
+        async with lock.read():
+            writer = asyncio.create_task(write())
+            await asyncio.sleep(0)
+            reader = asyncio.create_task(read())
+            await asyncio.sleep(0)
+
+            writer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await writer
+
+            assert await asyncio.wait_for(reader, timeout=1) is True
+
+
+class TestLockManager:
+    """Test cases for the hierarchical lock manager."""
+
+    @pytest.mark.asyncio
+    async def test_lock_reuse_across_shards(self):
+        """Test each resource maps to one lock, spread over the shards."""
+        manager = LockManager()
+        keys = [manager._get_lock_key(LockLevel.CHUNK, uuid4()) for _ in range(64)]
+
+        locks = await asyncio.gather(*(manager._get_or_create_lock(key) for key in keys))
+        again = await asyncio.gather(*(manager._get_or_create_lock(key) for key in keys))
+
+        assert all(a is b for a, b in zip(locks, again))
+        assert len({id(lock) for lock in locks}) == len(keys)
+        assert sum(len(shard) for shard in manager._shards) == len(keys)
+        assert sum(1 for shard in manager._shards if shard) > 1
+
+    @pytest.mark.asyncio
+    async def test_hierarchical_dedupes_and_upgrades(self):
+        """Test a resource requested twice is locked once, as a writer."""
+        manager = LockManager()
+        library_id, chunk_id = uuid4(), uuid4()
+
+        locks = [
+            (LockLevel.CHUNK, chunk_id, "read"),
+            (LockLevel.LIBRARY, library_id, "read"),
+            (LockLevel.CHUNK, chunk_id, "write"),
+        ]
+        async with asyncio.timeout(1):
+            async with manager.acquire_hierarchical(locks):
+                chunk_lock = await manager._get_or_create_lock(
+                    manager._get_lock_key(LockLevel.CHUNK, chunk_id)
+                )
+                library_lock = await manager._get_or_create_lock(
+                    manager._get_lock_key(LockLevel.LIBRARY, library_id)
+                )
+                assert chunk_lock._write_locked
+                assert library_lock._read_count == 1
+
+        assert not chunk_lock._write_locked
+        assert library_lock._read_count == 0
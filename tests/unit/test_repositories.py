@@ -1,7 +1,9 @@
 import asyncio
+from dataclasses import replace
 from uuid import uuid4
 
 import pytest
+from pydantic import ValidationError
 
 from src.domain.entities.chunk import Chunk
 from src.domain.entities.library import IndexType, Library
@@ -60,8 +62,9 @@ class TestInMemoryLibraryRepository:
         created = await repository.create(sample_library)
 
         # Update the library
-        created.name = "Updated Library"
-        updated = await repository.update(created.id, created)
+        updated = await repository.update(
+            created.id, created.model_copy(update={"name": "Updated Library"})
+        )
 
         assert updated is not None
         assert updated.name == "Updated Library"
@@ -114,6 +117,26 @@ class TestInMemoryLibraryRepository:
         result = await repository.get_by_name("Does Not Exist")
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_name_index_follows_writes(self, repository):
+        """Test names stay unique and findable across rename and delete."""
+        lib = await repository.create(Library(name="First", dimension=128))
+        with pytest.raises(ValueError):
+            await repository.create(Library(name="First", dimension=128))
+
+        other = await repository.create(Library(name="Other", dimension=128))
+        with pytest.raises(ValueError):
+            await repository.update(lib.id, lib.model_copy(update={"name": "Other"}))
+        assert (await repository.get_by_name("First")).id == lib.id
+
+        await repository.update(lib.id, lib.model_copy(update={"name": "Renamed"}))
+        assert await repository.get_by_name("First") is None
+        assert (await repository.get_by_name("Renamed")).id == lib.id
+
+        await repository.delete(other.id)
+        assert await repository.get_by_name("Other") is None
+        await repository.create(Library(name="Other", dimension=128))
+
     @pytest.mark.asyncio
     async def test_list_by_index_type(self, repository):
         """Test listing libraries by index type."""
@@ -124,11 +147,44 @@ class TestInMemoryLibraryRepository:
 
         # list by index type
         lsh_libs = await repository.list_by_index_type(IndexType.LSH)
-        assert len(lsh_libs) == 2
+        assert [lib.name for lib in lsh_libs] == ["LSH 1", "LSH 2"]
 
         hnsw_libs = await repository.list_by_index_type(IndexType.HNSW)
         assert len(hnsw_libs) == 1
 
+        # Other updates keep a library's place; changing the index type
+        # moves it to the end of its new one, and deletes drop it
+        lsh = lsh_libs[0]
+        await repository.update(lsh.id, lsh.model_copy(update={"name": "LSH 0"}))
+        assert [lib.name for lib in await repository.list_by_index_type(IndexType.LSH)] == [
+            "LSH 0", "LSH 2"
+        ]
+        await repository.update(lsh.id, lsh.model_copy(update={"index_type": IndexType.HNSW}))
+        assert len(await repository.list_by_index_type("LSH")) == 1
+        assert [lib.name for lib in await repository.list_by_index_type(IndexType.HNSW)] == [
+            "HNSW 1", "LSH 1"
+        ]
+        await repository.delete(lsh_libs[1].id)
+        assert await repository.list_by_index_type(IndexType.LSH) == []
+        assert await repository.list_by_index_type(IndexType.KD_TREE) == []
+
+    @pytest.mark.asyncio
+    async def test_copies_do_not_share_mutable_fields(self, repository):
+        """Test stored libraries are copied on the way in only."""
+        lib = Library(name="Isolated", dimension=128, metadata={"tags": ["a"]})
+        created = await repository.create(lib)
+        # Only the stored instance is a copy; the caller gets its own back
+        assert created is lib
+
+        lib.metadata["tags"].append("b")
+        retrieved = await repository.get(lib.id)
+        assert retrieved.metadata == {"tags": ["a"]}
+
+        # Libraries are frozen, so reads share the stored instance
+        assert await repository.get(lib.id) is retrieved
+        with pytest.raises(ValidationError):
+            retrieved.name = "Renamed"
+
 
 class TestInMemoryChunkRepository:
     """Test cases for InMemoryChunkRepository."""
@@ -266,6 +322,101 @@ class TestInMemoryChunkRepository:
         )
         assert len(result) == 3  # Chunks 2, 3, 4
 
+    @pytest.mark.asyncio
+    async def test_indexed_lookups_follow_writes(self, repository):
+        """Test document and library lookups stay in step with updates and deletes."""
+        library_id, document_id = uuid4(), uuid4()
+        chunks = [
+            Chunk(
+                id=uuid4(),
+                library_id=library_id,
+                content=f"Chunk {i}",
+                embedding=[float(i)] * 3,
+                document_id=document_id if i < 3 else None,
+                chunk_index=i,
+                metadata={"library_id": str(library_id), "score": i * 10}
+            )
+            for i in range(5)
+        ]
+        await repository.create_bulk(chunks)
+
+        assert len(await repository.list(filters={"document_id": document_id})) == 3
+        assert await repository.count(filters={"document_id": document_id, "score": 10}) == 1
+        result = await repository.search_by_metadata(library_id, {}, limit=2)
+        assert [c.chunk_index for c in result] == [0, 1]
+
+        # Moving a chunk to another library re-indexes it
+        other_library_id = uuid4()
+        moved = replace(
+            chunks[4],
+            library_id=other_library_id,
+            metadata={"library_id": str(other_library_id), "score": 40}
+        )
+        await repository.update(moved.id, moved)
+        result = await repository.search_by_metadata(library_id, {"score": {"$gte": 20}})
+        assert [c.chunk_index for c in result] == [2, 3]
+        result = await repository.search_by_metadata(other_library_id, {})
+        assert [c.chunk_index for c in result] == [4]
+
+        assert await repository.delete_by_document(document_id) == 3
+        assert [c.chunk_index for c in await repository.search_by_metadata(library_id, {})] == [3]
+        assert await repository.list(filters={"document_id": document_id}) == []
+
+    @pytest.mark.asyncio
+    async def test_library_lookups_use_chunk_library(self, repository):
+        """Test chunks are found by their library_id, not by metadata."""
+        library_id = uuid4()
+        chunks = [
+            Chunk(
+                id=uuid4(),
+                library_id=library_id,
+                content=f"Chunk {i}",
+                embedding=[float(i)] * 3,
+                chunk_index=i,
+                metadata={"score": i * 10}
+            )
+            for i in range(4)
+        ]
+        # Metadata naming the library does not make a chunk part of it
+        chunks.append(Chunk(
+            id=uuid4(),
+            library_id=uuid4(),
+            content="Elsewhere",
+            embedding=[1.0] * 3,
+            metadata={"library_id": str(library_id), "score": 40}
+        ))
+        await repository.create_bulk(chunks)
+
+        page = await repository.get_by_library(library_id, limit=2, offset=1)
+        assert [c.chunk_index for c in page] == [1, 2]
+        assert len(await repository.get_by_library(library_id)) == 4
+
+        result = await repository.search_by_metadata(library_id, {"score": {"$gte": 20}})
+        assert [c.chunk_index for c in result] == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_document_chunks_come_back_in_order(self, repository):
+        """Test document chunks are returned by chunk_index whatever the write order."""
+        document_id = uuid4()
+        chunks = [
+            Chunk(
+                id=uuid4(),
+                library_id=uuid4(),
+                content=f"Chunk {i}",
+                embedding=[float(i)] * 3,
+                document_id=document_id,
+                chunk_index=i
+            )
+            for i in (3, 0, 2, 1)
+        ]
+        await repository.create_bulk(chunks)
+        assert [c.chunk_index for c in await repository.get_by_document(document_id)] == [0, 1, 2, 3]
+
+        # Re-indexing a chunk moves it within the document
+        await repository.update(chunks[1].id, replace(chunks[1], chunk_index=4))
+        await repository.delete(chunks[2].id)
+        assert [c.chunk_index for c in await repository.get_by_document(document_id)] == [1, 3, 4]
+
 
 class TestReadWriteLock:
     """Test cases for ReadWriteLock."""